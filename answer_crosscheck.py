@@ -0,0 +1,141 @@
+"""Cross-check of the answers in a compliance document against its citation report.
+
+`generate_compliance_doc` and `generate_source_report` receive their answers in
+separate calls, so the `answer` of a citation can drift from the value that was
+actually written into the DOCX. The server remembers the last compliance payload
+per client session and model in a ComplianceAnswerStore; when the citation report
+is generated in the same session, the two are compared by question id in one pass.
+Payloads are never looked up across sessions, so one client's answers are never
+compared with (or shown to) another client.
+
+Answers are compared as they appear in the document (yes/no become checkboxes),
+after normalization: Unicode compatibility forms (NFKC), case, whitespace runs and
+thousands separators are ignored, so "Yes" matches "yes" and "7,000 GPU hours"
+matches "7000 gpu  hours". Everything else counts, in particular decimal points:
+"1.5B" doesn't match "15B".
+
+Exports:
+    DEFAULT_PAYLOAD_TTL: Seconds a compliance payload is remembered
+    MAX_PAYLOADS: Maximum number of payloads (sessions and models) remembered at once
+    normalize_answer: Comparable form of an answer value
+    diff_answers: Mismatches between document answers and citation answers
+    ComplianceAnswerStore: In-memory store of the last compliance payload per session and model
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from docx_generator import build_display_data
+
+
+DEFAULT_PAYLOAD_TTL = 24 * 60 * 60
+MAX_PAYLOADS = 256
+
+# Digit group separators ("7,000", "7'000"); a decimal point is not one
+THOUSANDS_SEPARATOR_RE = re.compile(r"(?<=\d)[,'’](?=\d{3}(?!\d))")
+CHECKBOX_ANSWERS = {"☑": "yes", "☐": "no"}
+
+
+def normalize_answer(value) -> str:
+    """Return the comparable form of an answer value as shown in the document."""
+    text = build_display_data({"value": value})["value"]
+    text = CHECKBOX_ANSWERS.get(text, text)
+    text = THOUSANDS_SEPARATOR_RE.sub("", unicodedata.normalize("NFKC", text).casefold())
+    return " ".join(text.split())
+
+
+def diff_answers(answers: dict, citations: list[dict]) -> list[dict]:
+    """Compare the answers of a compliance document with the answers of its citations.
+
+    Only questions present in both are compared.
+
+    Args:
+        answers: Compliance answers keyed by question id, as written into the document
+        citations: Validated citation dicts
+
+    Returns:
+        One entry per mismatching question, in citation order:
+        {"question_id", "document" (document answer), "citation" (citation answer)}
+    """
+    mismatches = []
+    for citation in citations:
+        question_id = citation["question_id"]
+        if question_id not in answers:
+            continue
+        document_answer = answers[question_id]
+        if normalize_answer(document_answer) != normalize_answer(citation.get("answer", "")):
+            mismatches.append({
+                "question_id": question_id,
+                "document": str(document_answer),
+                "citation": citation.get("answer", ""),
+            })
+    return mismatches
+
+
+class ComplianceAnswerStore:
+    """The last compliance payload of each model, per client session."""
+
+    def __init__(self, ttl: float = DEFAULT_PAYLOAD_TTL, max_payloads: int = MAX_PAYLOADS):
+        self.ttl = ttl
+        self.max_payloads = max_payloads
+        # (session, model key) -> {"model_name", "document_id", "answers", "updated"}, least recently stored first
+        self._payloads: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_name: str) -> str:
+        return " ".join(model_name.split()).casefold()
+
+    def remember(self, session: str | None, model_name: str, answers: dict, document_id: str = "") -> None:
+        """Store the answers written into a model's compliance document, replacing the previous ones.
+
+        Args:
+            session: Client session the document was generated in; None (no session) stores nothing
+            model_name: Model name of the document
+            answers: Answers as written into the document
+            document_id: Id of the document, shown in the comparison
+        """
+        if session is None:
+            return
+        key = (session, self._key(model_name))
+        entry = {"model_name": model_name, "document_id": document_id, "answers": dict(answers),
+                 "updated": time.monotonic()}
+        with self._lock:
+            self._payloads.pop(key, None)
+            self._payloads[key] = entry
+            while len(self._payloads) > self.max_payloads:
+                self._payloads.popitem(last=False)
+
+    def lookup(self, session: str | None, model_name: str = "") -> dict | None:
+        """Return the last payload stored in a session for a model, or the session's most recent one.
+
+        Args:
+            session: Client session; payloads of other sessions are never returned
+            model_name: Model name as passed to remember(); empty for the session's most recent payload
+
+        Returns:
+            {"model_name", "document_id", "answers"}, or None if the session has no unexpired payload
+        """
+        if session is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, entry in self._payloads.items() if now - entry["updated"] > self.ttl]:
+                del self._payloads[key]
+            if model_name:
+                entry = self._payloads.get((session, self._key(model_name)))
+            else:
+                entry = next((entry for (entry_session, _), entry in reversed(self._payloads.items())
+                              if entry_session == session), None)
+            if entry is None:
+                return None
+            return {"model_name": entry["model_name"], "document_id": entry["document_id"],
+                    "answers": entry["answers"]}
+
+    def clear(self) -> None:
+        """Forget all payloads."""
+        with self._lock:
+            self._payloads.clear()
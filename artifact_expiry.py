@@ -0,0 +1,225 @@
+"""Expiry index of the artifacts in the storage directory.
+
+Every generated artifact (documents, reports, bundles, revision records) is
+registered with its expiry time when it is written. The index is a small SQLite
+table in the storage directory, indexed by expiry time, so:
+
+- cleanup deletes exactly the artifacts that are due, with work proportional to
+  their number instead of listing and stat-ing the whole directory
+- the cleanup thread can sleep until the next expiry instead of polling
+- the index survives restarts and is shared by all processes using the directory
+
+When the index is first created, it is seeded once: existing artifacts are
+registered by their modification time, so files written before the index existed
+still expire. The artifacts come from the directory, or from a listing function
+(e.g. of a storage bucket, so a replica that lost its disk still expires what it
+stored remotely). The index remembers that seeding completed; if the listing fails,
+seeding is retried later (see ExpiryIndex.seeded).
+
+Only one process per directory needs to run the cleanup. CleanupLock elects it:
+an exclusive lock on a file in the directory, held for the lifetime of the
+process and released by the operating system when it exits, so a standby
+process can take over.
+
+Exports:
+    DEFAULT_RETENTION: Seconds an artifact is kept by default (24 hours)
+    EXPIRY_INDEX_NAME: File name of the index in the storage directory
+    CLEANUP_LOCK_NAME: File name of the cleanup lock in the storage directory
+    ExpiryIndex: Expiry times of the artifacts in a directory
+    CleanupLock: Lock electing the process that runs the cleanup
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no election, every process cleans up
+    fcntl = None
+
+
+DEFAULT_RETENTION = 24 * 60 * 60
+EXPIRY_INDEX_NAME = ".expiry_index.sqlite3"
+CLEANUP_LOCK_NAME = ".cleanup.lock"
+# Expired artifacts deleted per transaction
+DELETE_BATCH_SIZE = 500
+
+
+def _list_directory(data_dir: str):
+    """Yield (file name, mtime) of the files in a directory."""
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry.name, entry.stat().st_mtime
+
+
+class ExpiryIndex:
+    """Expiry times of the artifacts in a directory, persisted in a SQLite table."""
+
+    def __init__(self, data_dir: str, retention: float = DEFAULT_RETENTION, suffixes: tuple[str, ...] = (),
+                 index_name: str = EXPIRY_INDEX_NAME, remove=None, list_files=None):
+        """
+        Args:
+            data_dir: Directory the artifacts are stored in (and the index)
+            retention: Seconds an artifact is kept after it was (last) written
+            suffixes: File name suffixes of the artifacts to register when a new index is
+                      seeded from the artifacts that already exist
+            index_name: File name of the index in data_dir
+            remove: Function deleting an artifact by file name (e.g. from remote storage);
+                    defaults to removing the file from data_dir
+            list_files: Function returning (file name, mtime) of the existing artifacts, to seed
+                        a new index (e.g. from remote storage); defaults to the files in data_dir
+        """
+        self.data_dir = data_dir
+        self.retention = retention
+        self.suffixes = suffixes
+        self.remove = remove or (lambda filename: os.remove(os.path.join(data_dir, filename)))
+        self.list_files = list_files or (lambda: _list_directory(data_dir))
+        self.path = os.path.join(data_dir, index_name)
+        self._lock = threading.Lock()
+
+        # One connection shared by the threads of this process, serialized by the lock;
+        # other processes using the directory are serialized by SQLite's file locking
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS artifacts (filename TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_expires_at ON artifacts (expires_at)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if suffixes and not self.seeded:
+            try:
+                self.seed()
+            except OSError as e:
+                print(f"CLEANUP ERROR: Could not list the existing artifacts, will retry: {e}")
+
+    @property
+    def seeded(self) -> bool:
+        """Whether the existing artifacts have been registered (seed() completed once)."""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is not None
+
+    def seed(self) -> int:
+        """Register the existing artifacts with a matching suffix, expiring `retention` after their mtime.
+
+        Artifacts that are already registered keep their expiry time.
+
+        Returns:
+            The number of artifacts registered
+
+        Raises:
+            OSError: If the artifacts can't be listed; the index stays unseeded
+        """
+        rows = [(name, mtime + self.retention) for name, mtime in self.list_files() if name.endswith(self.suffixes)]
+        with self._lock:
+            self._db.executemany("INSERT OR IGNORE INTO artifacts (filename, expires_at) VALUES (?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', ?)", (str(time.time()),))
+        return len(rows)
+
+    def register(self, filename: str, now: float | None = None) -> float:
+        """Register (or renew) an artifact, expiring `retention` seconds from now.
+
+        Returns:
+            The expiry time (seconds since the epoch)
+        """
+        expires_at = (time.time() if now is None else now) + self.retention
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO artifacts (filename, expires_at) VALUES (?, ?)",
+                             (filename, expires_at))
+        return expires_at
+
+    def expires_at(self, filename: str) -> float | None:
+        """Return the expiry time of an artifact, or None if it isn't registered."""
+        with self._lock:
+            row = self._db.execute("SELECT expires_at FROM artifacts WHERE filename = ?", (filename,)).fetchone()
+        return row[0] if row else None
+
+    def next_expiry(self) -> float | None:
+        """Return the earliest expiry time in the index, or None if it is empty."""
+        with self._lock:
+            return self._db.execute("SELECT MIN(expires_at) FROM artifacts").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+
+    def _claim_expired(self, now: float) -> list[str]:
+        """Remove a batch of due artifacts from the index and return their file names."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                names = [row[0] for row in self._db.execute(
+                    "SELECT filename FROM artifacts WHERE expires_at <= ? ORDER BY expires_at LIMIT ?",
+                    (now, DELETE_BATCH_SIZE))]
+                self._db.executemany("DELETE FROM artifacts WHERE filename = ?", [(name,) for name in names])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return names
+
+    def delete_expired(self, now: float | None = None) -> list[str]:
+        """Delete the artifacts that are due and remove them from the index.
+
+        Files that are already gone are just dropped from the index; files that can't be
+        deleted are reported and dropped as well, so they don't keep the cleanup busy.
+
+        Returns:
+            The file names that were deleted
+        """
+        now = time.time() if now is None else now
+        deleted = []
+        while True:
+            names = self._claim_expired(now)
+            for name in names:
+                try:
+                    self.remove(name)
+                    deleted.append(name)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"CLEANUP ERROR: Could not delete {name}: {e}")
+            if len(names) < DELETE_BATCH_SIZE:
+                return deleted
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            self._db.close()
+
+
+class CleanupLock:
+    """Exclusive lock on a file in a directory; its holder is the process that runs the cleanup."""
+
+    def __init__(self, data_dir: str, lock_name: str = CLEANUP_LOCK_NAME):
+        self.path = os.path.join(data_dir, lock_name)
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Try to take the lock without waiting.
+
+        Returns:
+            True if this process holds the lock (now or already), False if another one does
+        """
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Give up the lock (closing the file releases it)."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,384 @@
+"""Storage backends for generated artifacts (documents, reports, bundles).
+
+The tools render every artifact into a local scratch file and then hand it to the
+storage backend; the download route asks the backend how to serve it:
+
+- LocalStorage keeps artifacts in the storage directory and serves them from disk.
+  The scratch file is simply renamed into place.
+- S3Storage uploads artifacts to an S3-compatible bucket (AWS S3, MinIO, R2, ...),
+  streaming the scratch file, so every replica can serve every artifact. Downloads
+  redirect to a short-lived presigned URL, or are streamed through the server.
+
+Backends also list their artifacts with modification times, so a new expiry index
+(e.g. on a replica that restarted with an empty disk) is seeded from what is
+actually stored, bucket objects included.
+
+Requests to S3 are signed with AWS Signature Version 4 using `requests` (no AWS SDK
+needed). Objects are addressed path-style: {endpoint}/{bucket}/{prefix}{filename}.
+
+Configuration (environment variables, see storage_from_env):
+    ARTIFACT_STORAGE: "local" (default) or "s3"
+    S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_PREFIX: Bucket location
+    AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_SESSION_TOKEN: Credentials
+    S3_REDIRECT_DOWNLOADS: "false" to stream downloads through the server
+
+Exports:
+    STORAGE_BACKENDS: Names of the available backends
+    presign_url: Presigned (query-string authenticated) SigV4 URL
+    sign_request_headers: SigV4 Authorization headers for a request
+    ArtifactStorage: Interface of the backends
+    LocalStorage: Artifacts in a local directory
+    S3Storage: Artifacts in an S3-compatible bucket
+    storage_from_env: Backend configured by the environment
+"""
+
+import hashlib
+import hmac
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, quote, urlparse
+from xml.etree import ElementTree
+
+import requests
+
+
+STORAGE_BACKENDS = ("local", "s3")
+
+SIGNING_ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+DEFAULT_PRESIGN_EXPIRES = 15 * 60
+REQUEST_TIMEOUT = 60
+CHUNK_SIZE = 1024 * 1024
+
+
+# --- AWS Signature Version 4 ---
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _signing_key(secret_key: str, date: str, region: str, service: str) -> bytes:
+    key = _hmac(f"AWS4{secret_key}".encode("utf-8"), date)
+    for part in (region, service, "aws4_request"):
+        key = _hmac(key, part)
+    return key
+
+
+def _canonical_query(params: list[tuple[str, str]]) -> str:
+    encoded = sorted((quote(k, safe="-_.~"), quote(v, safe="-_.~")) for k, v in params)
+    return "&".join(f"{k}={v}" for k, v in encoded)
+
+
+def _signature(method: str, url: str, params: list[tuple[str, str]], headers: dict[str, str],
+               payload_hash: str, secret_key: str, region: str, timestamp: str, service: str) -> str:
+    """Signature of a request; `headers` are the signed headers, lowercase names."""
+    path = quote(urlparse(url).path or "/", safe="/-_.~")
+    signed_headers = ";".join(sorted(headers))
+    canonical_headers = "".join(f"{name}:{' '.join(headers[name].split())}\n" for name in sorted(headers))
+    canonical_request = "\n".join([method, path, _canonical_query(params), canonical_headers, signed_headers, payload_hash])
+
+    date = timestamp[:8]
+    scope = f"{date}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([SIGNING_ALGORITHM, timestamp, scope,
+                                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()])
+    return hmac.new(_signing_key(secret_key, date, region, service), string_to_sign.encode("utf-8"),
+                    hashlib.sha256).hexdigest()
+
+
+def _timestamp(now: datetime | None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def presign_url(method: str, url: str, access_key: str, secret_key: str, region: str,
+                expires_in: int = DEFAULT_PRESIGN_EXPIRES, session_token: str = "",
+                now: datetime | None = None, service: str = "s3") -> str:
+    """Return a presigned URL: the signature and its expiry travel in the query string.
+
+    Args:
+        method: HTTP method the URL is valid for
+        url: Object URL
+        access_key, secret_key, session_token: Credentials
+        region: Region of the bucket
+        expires_in: Seconds the URL stays valid
+        now: Signing time (UTC); defaults to the current time
+
+    Returns:
+        The URL with the X-Amz-* authentication parameters added
+    """
+    timestamp = _timestamp(now)
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True) + [
+        ("X-Amz-Algorithm", SIGNING_ALGORITHM),
+        ("X-Amz-Credential", f"{access_key}/{timestamp[:8]}/{region}/{service}/aws4_request"),
+        ("X-Amz-Date", timestamp),
+        ("X-Amz-Expires", str(expires_in)),
+        ("X-Amz-SignedHeaders", "host"),
+    ]
+    if session_token:
+        params.append(("X-Amz-Security-Token", session_token))
+    signature = _signature(method, url, params, {"host": parsed.netloc}, UNSIGNED_PAYLOAD,
+                           secret_key, region, timestamp, service)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{_canonical_query(params)}&X-Amz-Signature={signature}"
+
+
+def sign_request_headers(method: str, url: str, access_key: str, secret_key: str, region: str,
+                         headers: dict[str, str] | None = None, payload_hash: str = UNSIGNED_PAYLOAD,
+                         session_token: str = "", now: datetime | None = None, service: str = "s3") -> dict[str, str]:
+    """Return the headers to send with a request signed in the Authorization header.
+
+    Args:
+        method: HTTP method
+        url: Request URL (its query string is signed too)
+        headers: Extra headers to send and sign (e.g. Range, Content-Type)
+        payload_hash: Hex SHA-256 of the body, or UNSIGNED-PAYLOAD
+        now: Signing time (UTC); defaults to the current time
+
+    Returns:
+        `headers` plus x-amz-date, x-amz-content-sha256 and Authorization
+    """
+    timestamp = _timestamp(now)
+    parsed = urlparse(url)
+    signed = {name.lower(): str(value) for name, value in (headers or {}).items()}
+    signed.update({"host": parsed.netloc, "x-amz-date": timestamp, "x-amz-content-sha256": payload_hash})
+    if session_token:
+        signed["x-amz-security-token"] = session_token
+    signature = _signature(method, url, parse_qsl(parsed.query, keep_blank_values=True), signed, payload_hash,
+                           secret_key, region, timestamp, service)
+    credential = f"{access_key}/{timestamp[:8]}/{region}/{service}/aws4_request"
+    result = {name: value for name, value in signed.items() if name != "host"}
+    result["Authorization"] = (f"{SIGNING_ALGORITHM} Credential={credential}, "
+                               f"SignedHeaders={';'.join(sorted(signed))}, Signature={signature}")
+    return result
+
+
+# --- backends ---
+
+class ArtifactStorage(ABC):
+    """Interface of the artifact storage backends.
+
+    Artifacts are rendered into scratch_path(filename) and stored with put_file();
+    write() does both. Missing artifacts raise FileNotFoundError.
+    """
+
+    name = ""
+
+    def __init__(self, scratch_dir: str):
+        self.scratch_dir = scratch_dir
+
+    def scratch_path(self, filename: str) -> str:
+        """Local path to render an artifact into before put_file()."""
+        return os.path.join(self.scratch_dir, f"{filename}.part")
+
+    @abstractmethod
+    def put_file(self, filename: str, path: str) -> int:
+        """Store a finished local file as an artifact (the file is moved or removed).
+
+        Returns:
+            The size of the artifact in bytes
+        """
+
+    def write(self, filename: str, render) -> int:
+        """Render an artifact with `render(binary_file)` and store it; partial output is never stored.
+
+        Returns:
+            The size of the artifact in bytes
+        """
+        path = self.scratch_path(filename)
+        try:
+            with open(path, "wb") as f:
+                render(f)
+            return self.put_file(filename, path)
+        except BaseException:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            raise
+
+    @abstractmethod
+    def size(self, filename: str) -> int:
+        """Return the size of an artifact in bytes."""
+
+    @abstractmethod
+    def open(self, filename: str):
+        """Return a binary file object streaming the artifact (close it when done)."""
+
+    @abstractmethod
+    def delete(self, filename: str) -> None:
+        """Delete an artifact."""
+
+    @abstractmethod
+    def list_artifacts(self) -> Iterator[tuple[str, float]]:
+        """Yield (file name, modification time as unix time) of every stored artifact."""
+
+    def local_path(self, filename: str) -> str | None:
+        """Return the local path of an artifact if the backend keeps it on this machine."""
+        return None
+
+    def download_url(self, filename: str, expires_in: int = DEFAULT_PRESIGN_EXPIRES) -> str | None:
+        """Return a short-lived URL to redirect downloads to, or None to serve them from the server."""
+        return None
+
+
+class LocalStorage(ArtifactStorage):
+    """Artifacts stored in a local directory (the scratch directory)."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.root = root
+
+    def local_path(self, filename: str) -> str:
+        return os.path.join(self.root, filename)
+
+    def put_file(self, filename: str, path: str) -> int:
+        target = self.local_path(filename)
+        os.replace(path, target)
+        return os.path.getsize(target)
+
+    def size(self, filename: str) -> int:
+        return os.path.getsize(self.local_path(filename))
+
+    def open(self, filename: str):
+        return open(self.local_path(filename), "rb")
+
+    def delete(self, filename: str) -> None:
+        os.remove(self.local_path(filename))
+
+    def list_artifacts(self) -> Iterator[tuple[str, float]]:
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                # Hidden files (index, locks, keys) and unfinished scratch files aren't artifacts
+                if not entry.name.startswith(".") and not entry.name.endswith(".part") and entry.is_file():
+                    yield entry.name, entry.stat().st_mtime
+
+
+class S3Storage(ArtifactStorage):
+    """Artifacts stored in an S3-compatible bucket, addressed path-style."""
+
+    name = "s3"
+
+    def __init__(self, scratch_dir: str, bucket: str, endpoint_url: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", prefix: str = "", session_token: str = "", redirect: bool = True,
+                 session: requests.Session | None = None):
+        """
+        Args:
+            scratch_dir: Local directory for rendering artifacts before upload
+            bucket: Bucket name
+            endpoint_url: Base URL of the S3 API, e.g. https://s3.eu-central-1.amazonaws.com
+            access_key, secret_key, session_token: Credentials
+            region: Region used for signing
+            prefix: Key prefix of the artifacts, e.g. "artifacts/"
+            redirect: Redirect downloads to presigned URLs instead of streaming them through the server
+        """
+        super().__init__(scratch_dir)
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.session_token = session_token
+        self.redirect = redirect
+        self.session = session or requests.Session()
+
+    def object_url(self, filename: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(self.prefix + filename, safe='/-_.~')}"
+
+    def _send(self, method: str, url: str, subject: str, headers: dict | None = None, **kwargs) -> requests.Response:
+        """Send a signed request; `subject` names the object or listing in errors."""
+        signed = sign_request_headers(method, url, self.access_key, self.secret_key, self.region,
+                                      headers=headers, session_token=self.session_token)
+        response = self.session.request(method, url, headers=signed, timeout=REQUEST_TIMEOUT, **kwargs)
+        if response.status_code == 404:
+            response.close()
+            raise FileNotFoundError(f"{subject} not found in bucket '{self.bucket}'")
+        if response.status_code >= 300:
+            message = response.text[:200]
+            response.close()
+            raise OSError(f"S3 {method} of {subject} failed with HTTP {response.status_code}: {message}")
+        return response
+
+    def _request(self, method: str, filename: str, headers: dict | None = None, **kwargs) -> requests.Response:
+        return self._send(method, self.object_url(filename), f"Artifact '{filename}'", headers, **kwargs)
+
+    def put_file(self, filename: str, path: str) -> int:
+        size = os.path.getsize(path)
+        try:
+            with open(path, "rb") as f:
+                # Streams the file from disk; the body isn't hashed (UNSIGNED-PAYLOAD)
+                self._request("PUT", filename, headers={"Content-Length": str(size)}, data=f).close()
+        finally:
+            os.remove(path)
+        return size
+
+    def size(self, filename: str) -> int:
+        with self._request("HEAD", filename) as response:
+            return int(response.headers["Content-Length"])
+
+    def open(self, filename: str):
+        response = self._request("GET", filename, stream=True)
+        response.raw.decode_content = True
+        return response.raw
+
+    def delete(self, filename: str) -> None:
+        try:
+            self._request("DELETE", filename).close()
+        except FileNotFoundError:
+            pass
+
+    def list_artifacts(self) -> Iterator[tuple[str, float]]:
+        """Yield the objects under the prefix (ListObjectsV2, one request per 1000 objects)."""
+        params = [("list-type", "2"), ("prefix", self.prefix)]
+        while True:
+            url = f"{self.endpoint_url}/{self.bucket}?{_canonical_query(params)}"
+            with self._send("GET", url, f"Listing of '{self.prefix}'") as response:
+                root = ElementTree.fromstring(response.content)
+            for item in root.iterfind("{*}Contents"):
+                filename = item.findtext("{*}Key", "")[len(self.prefix):]
+                if filename and "/" not in filename:
+                    modified = datetime.strptime(item.findtext("{*}LastModified", "")[:19], "%Y-%m-%dT%H:%M:%S")
+                    yield filename, modified.replace(tzinfo=timezone.utc).timestamp()
+            token = root.findtext("{*}NextContinuationToken")
+            if root.findtext("{*}IsTruncated") != "true" or not token:
+                return
+            params = [("list-type", "2"), ("prefix", self.prefix), ("continuation-token", token)]
+
+    def download_url(self, filename: str, expires_in: int = DEFAULT_PRESIGN_EXPIRES) -> str | None:
+        if not self.redirect:
+            return None
+        return presign_url("GET", self.object_url(filename), self.access_key, self.secret_key, self.region,
+                           expires_in=expires_in, session_token=self.session_token)
+
+
+def storage_from_env(data_dir: str) -> ArtifactStorage:
+    """Return the storage backend configured by the environment (see module docstring).
+
+    Raises:
+        ValueError: If the backend is unknown or S3 settings are missing
+    """
+    backend = os.environ.get("ARTIFACT_STORAGE", "local").strip().lower()
+    if backend == "local":
+        return LocalStorage(data_dir)
+    if backend != "s3":
+        raise ValueError(f"Unknown ARTIFACT_STORAGE '{backend}'. Use one of: {', '.join(STORAGE_BACKENDS)}")
+
+    missing = [name for name in ("S3_BUCKET", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY") if not os.environ.get(name)]
+    if missing:
+        raise ValueError(f"ARTIFACT_STORAGE=s3 requires {', '.join(missing)}")
+    region = os.environ.get("S3_REGION") or os.environ.get("AWS_REGION") or "us-east-1"
+    return S3Storage(
+        data_dir,
+        bucket=os.environ["S3_BUCKET"],
+        endpoint_url=os.environ.get("S3_ENDPOINT_URL") or f"https://s3.{region}.amazonaws.com",
+        access_key=os.environ["AWS_ACCESS_KEY_ID"],
+        secret_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+        region=region,
+        prefix=os.environ.get("S3_PREFIX", ""),
+        session_token=os.environ.get("AWS_SESSION_TOKEN", ""),
+        redirect=os.environ.get("S3_REDIRECT_DOWNLOADS", "true").strip().lower() not in ("0", "false", "no"),
+    )
@@ -0,0 +1,75 @@
+"""Benchmark batch compliance document generation across process pool sizes.
+
+Renders 200 synthetic compliance payloads with `docx_generator.fill_template_xml`
+on a ProcessPoolExecutor (the same setup `generate_compliance_docs_batch` uses)
+and reports throughput in docs/sec for each worker count.
+
+Usage:
+    python benchmarks/bench_batch_generation.py [--payloads 200] [--workers 1 2 4 8]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx_generator import fill_template_xml
+
+TEMPLATE_PATH = os.path.join(ROOT, "templates", "default_template.docx")
+
+
+def synthetic_payloads(count: int) -> list[dict]:
+    """Build `count` payloads answering every question in questions.json."""
+    with open(os.path.join(ROOT, "questions.json")) as f:
+        questions = json.load(f)
+    payloads = []
+    for n in range(count):
+        data = {}
+        for i, q in enumerate(questions):
+            data[q["id"]] = "yes" if q["id"].endswith("_check") and (n + i) % 2 else f"Answer {n}.{i} for {q['id']}"
+        data["model_name"] = f"Synthetic Model {n}"
+        payloads.append(data)
+    return payloads
+
+
+def run_batch(payloads: list[dict], workers: int, output_dir: str) -> float:
+    """Render all payloads on a fresh pool and return the elapsed seconds (pool startup included)."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(fill_template_xml, TEMPLATE_PATH, os.path.join(output_dir, f"doc_{workers}_{i}.docx"), data)
+            for i, data in enumerate(payloads)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus} | ({8} if cpus >= 8 else set()))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payloads", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.payloads)
+    print(f"{args.payloads} payloads, {cpus} CPUs available")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            elapsed = run_batch(payloads, workers, tmp)
+            throughput = args.payloads / elapsed
+            baseline = baseline or throughput
+            print(f"  workers={workers:<3} {elapsed:7.2f} s  {throughput:8.1f} docs/sec  ({throughput / baseline:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark citation payload validation: model path vs the dict fast path.
+
+The model path is what the tools did before: validate_citation_json, then
+validate_report_coverage, then model_dump() per citation. The fast path is
+validate_citation_payload, which returns the same dicts in one pass.
+
+Time is the best of --runs. Memory is measured in separate runs with tracemalloc
+(which slows Python code down): "peak" is the peak traced memory during one
+validation, "kept" the memory still held by the returned citation dicts, both per
+citation.
+
+Usage:
+    python benchmarks/bench_citation_validation.py [--citations 10000] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from citation_schema import validate_citation_json, validate_citation_payload, validate_report_coverage  # noqa: E402
+
+CONFIDENCES = ["DIRECT", "INFERRED", "DEFAULT", "NOT FOUND", "HALLUCINATED"]
+
+
+def make_payload(count: int) -> tuple[str, list[str]]:
+    """Citation JSON with `count` citations, and the list of their ids."""
+    citations = [
+        {
+            "question_id": f"q_{i}",
+            "question_text": f"What is property {i} of the model?",
+            "answer": f"The model has property {i} as documented in the technical report.",
+            "source_quote": f"Section {i % 12}: the model was trained with setting {i}.",
+            "source_section": f"Section {i % 12}",
+            "confidence": CONFIDENCES[i % len(CONFIDENCES)],
+            "reasoning": "Stated directly in the model card.",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"citations": citations}), [c["question_id"] for c in citations]
+
+
+def model_path(payload: str, required_ids: list[str]) -> list[dict]:
+    report = validate_citation_json(payload)
+    validate_report_coverage(report, required_ids)
+    return [c.model_dump() for c in report.citations]
+
+
+def fast_path(payload: str, required_ids: list[str]) -> list[dict]:
+    return validate_citation_payload(payload, required_ids)
+
+
+def best_seconds(func, payload, required_ids, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(payload, required_ids)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def memory_bytes(func, payload, required_ids) -> tuple[int, int]:
+    """(peak, kept) traced bytes of one validation."""
+    tracemalloc.start()
+    result = func(payload, required_ids)
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--citations", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    payload, required_ids = make_payload(args.citations)
+    assert model_path(payload, required_ids) == fast_path(payload, required_ids)
+    print(f"{args.citations} citations, {len(payload) / 1024:.0f} KiB of JSON\n")
+    print(f"{'path':<8} {'time ms':>9} {'us/cit':>8} {'peak B/cit':>11} {'kept B/cit':>11}")
+    for name, func in (("model", model_path), ("fast", fast_path)):
+        seconds = best_seconds(func, payload, required_ids, args.runs)
+        peak, kept = memory_bytes(func, payload, required_ids)
+        print(f"{name:<8} {seconds * 1000:>9.1f} {seconds / args.citations * 1e6:>8.2f} "
+              f"{peak / args.citations:>11.0f} {kept / args.citations:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
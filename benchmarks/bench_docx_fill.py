@@ -0,0 +1,130 @@
+"""Benchmark DOCX template filling: per-key scan vs compiled placeholder index.
+
+Builds a synthetic template with hundreds of tables (each cell holding a
+placeholder) and times the original O(paragraphs x keys) fill loop against
+`docx_generator.fill_template`, which looks placeholders up in an index that
+is compiled once per template mtime.
+
+The indexed fill still parses the whole template with python-docx, which is
+proportional to the document size; only applying the values is proportional
+to the number of placeholder paragraphs. Both parts are reported separately
+(the XML streaming path in bench_docx_xml.py avoids the parse).
+
+Usage:
+    python benchmarks/bench_docx_fill.py [--tables 300] [--keys 80] [--runs 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from docx_generator import (
+    apply_compiled_template,
+    build_display_data,
+    fill_template,
+    get_compiled_template,
+    load_docx_from_template,
+)
+
+
+def build_large_template(path: str, tables: int, keys: int) -> None:
+    """Write a template with `tables` 4x3 tables whose cells cycle through `keys` placeholders."""
+    doc = Document()
+    key_index = 0
+    for t in range(tables):
+        doc.add_paragraph(f"Section {t}: {{{{key_{key_index % keys}}}}}")
+        table = doc.add_table(rows=4, cols=3)
+        for row in table.rows:
+            for cell in row.cells:
+                cell.text = f"Value: {{{{key_{key_index % keys}}}}}"
+                key_index += 1
+    doc.save(path)
+
+
+def legacy_fill(template_path, output_path, data: dict) -> None:
+    """The original fill loop: every paragraph and cell checks every key."""
+    doc = Document(template_path)
+    display_data = build_display_data(data)
+
+    def process_tables(tables):
+        for table in tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for paragraph in cell.paragraphs:
+                        for key, value in display_data.items():
+                            placeholder = f"{{{{{key}}}}}"
+                            if placeholder in paragraph.text:
+                                paragraph.text = paragraph.text.replace(placeholder, value)
+                    if cell.tables:
+                        process_tables(cell.tables)
+
+    for paragraph in doc.paragraphs:
+        for key, value in display_data.items():
+            placeholder = f"{{{{{key}}}}}"
+            if placeholder in paragraph.text:
+                paragraph.text = paragraph.text.replace(placeholder, value)
+    process_tables(doc.tables)
+    doc.save(output_path)
+
+
+def time_fill(fill, template_path: str, data: dict, runs: int) -> float:
+    """Return the mean wall time in seconds of `runs` fills."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        fill(template_path, io.BytesIO(), data)
+    return (time.perf_counter() - start) / runs
+
+
+def time_parse_and_apply(template_path: str, compiled, data: dict, runs: int) -> tuple[float, float]:
+    """Return the mean wall times in seconds of parsing the template and of applying the index."""
+    display_data = build_display_data(data)
+    parse = apply = 0.0
+    for _ in range(runs):
+        start = time.perf_counter()
+        doc = load_docx_from_template(template_path)
+        parse += time.perf_counter() - start
+        start = time.perf_counter()
+        apply_compiled_template(doc, compiled, display_data)
+        apply += time.perf_counter() - start
+    return parse / runs, apply / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=300)
+    parser.add_argument("--keys", type=int, default=80)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    data = {f"key_{i}": f"answer {i}" for i in range(args.keys)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = os.path.join(tmp, "large_template.docx")
+        build_large_template(template_path, args.tables, args.keys)
+
+        start = time.perf_counter()
+        compiled = get_compiled_template(template_path)
+        compile_time = time.perf_counter() - start
+
+        legacy = time_fill(legacy_fill, template_path, data, args.runs)
+        indexed = time_fill(fill_template, template_path, data, args.runs)
+        parse, apply = time_parse_and_apply(template_path, compiled, data, args.runs)
+
+    print(f"Template: {args.tables} tables, {args.keys} keys, {len(compiled.slots)} placeholder paragraphs")
+    print(f"One-off compile:         {compile_time * 1000:9.1f} ms")
+    print(f"Legacy fill (per doc):   {legacy * 1000:9.1f} ms")
+    print(f"Indexed fill (per doc):  {indexed * 1000:9.1f} ms")
+    print(f"  parse template:        {parse * 1000:9.1f} ms")
+    print(f"  apply index:           {apply * 1000:9.1f} ms")
+    print(f"Speedup:                 {legacy / indexed:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
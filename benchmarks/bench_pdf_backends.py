@@ -0,0 +1,64 @@
+"""Benchmark the PDF backends: throughput and peak memory per report size.
+
+Renders the same citation reports with every backend in PDF_BACKENDS and prints
+reports/second, citations/second and peak traced memory (measured in a separate
+run, since tracemalloc slows rendering down considerably). Use it to pick the
+PDF_BACKEND for a deployment.
+
+Usage:
+    python benchmarks/bench_pdf_backends.py [--sizes 80 1000] [--runs 5] [--backends reportlab fpdf2]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pdf_report import make_citations
+from pdf_generator import PDF_BACKENDS, generate_source_report_pdf
+
+GENERATED_AT = datetime(2025, 1, 1, 12, 0)
+
+
+def render(citations: list[dict], backend: str) -> int:
+    buf = BytesIO()
+    generate_source_report_pdf(buf, citations, model_card_id='bench/model', generated_at=GENERATED_AT, backend=backend)
+    return buf.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[80, 1000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=list(PDF_BACKENDS), choices=PDF_BACKENDS)
+    args = parser.parse_args()
+
+    # Warm up (font loading, lazy imports) so it isn't counted in the first size
+    for backend in args.backends:
+        render(make_citations(1), backend)
+
+    print(f"{'citations':>10} {'backend':<10} {'reports/s':>10} {'citations/s':>12} {'peak MiB':>9} {'PDF KiB':>8}")
+    for size in args.sizes:
+        citations = make_citations(size)
+        for backend in args.backends:
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                size_bytes = render(citations, backend)
+            elapsed = (time.perf_counter() - start) / args.runs
+
+            tracemalloc.start()
+            render(citations, backend)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+            print(f"{size:>10} {backend:<10} {1 / elapsed:10.2f} {size / elapsed:12.0f} {peak:9.1f} {size_bytes / 1024:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark citation report rendering for large reports.
+
+Renders reports of increasing size with a single citation table (chunk_rows=0)
+and with the default chunked tables, printing wall time and peak traced memory.
+
+Usage:
+    python benchmarks/bench_pdf_report.py [--sizes 80 1000 10000] [--skip-single-above 3000] [--memory-up-to 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pdf_generator import CHUNK_ROWS, generate_source_report_pdf
+
+CONFIDENCE_LEVELS = ['DIRECT', 'INFERRED', 'DEFAULT', 'NOT FOUND', 'HALLUCINATED']
+
+
+def make_citations(count: int) -> list[dict]:
+    """Build citations with realistic text lengths, confidence changing every few rows."""
+    return [
+        {
+            'question_id': f'Q{i}',
+            'question_text': f'Question {i}: What data was used to train the model and how was it collected?',
+            'answer': f'Answer {i}: web crawl, licensed datasets and synthetic data generated in-house.',
+            'source_quote': 'The model was pre-trained on a mixture of publicly available web data. ' * 2,
+            'source_section': f'Section {i % 12}.{i % 5}',
+            'source_document': 'Model Card',
+            'confidence': CONFIDENCE_LEVELS[(i // 7) % len(CONFIDENCE_LEVELS)],
+            'reasoning': 'Stated directly in the training data section of the model card.',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(citations: list[dict], chunk_rows: int, trace_memory: bool) -> tuple[float, float | None, int]:
+    """Render once untraced for timing, then (optionally) again under tracemalloc.
+
+    Returns:
+        (seconds, peak MiB or None, PDF bytes)
+    """
+    buf = BytesIO()
+    start = time.perf_counter()
+    generate_source_report_pdf(buf, citations, model_card_id='bench/model', chunk_rows=chunk_rows)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        # tracemalloc slows rendering down by an order of magnitude, so it gets its own run
+        tracemalloc.start()
+        generate_source_report_pdf(BytesIO(), citations, model_card_id='bench/model', chunk_rows=chunk_rows)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return elapsed, peak, buf.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[80, 1000, 10000])
+    parser.add_argument("--skip-single-above", type=int, default=None,
+                        help="Skip the single-table mode for larger reports (it is slow)")
+    parser.add_argument("--memory-up-to", type=int, default=1000,
+                        help="Only trace peak memory for reports up to this many citations")
+    args = parser.parse_args()
+
+    print(f"{'citations':>10} {'mode':<14} {'seconds':>9} {'peak MiB':>9} {'PDF KiB':>9}")
+    for size in args.sizes:
+        citations = make_citations(size)
+        modes = [("single table", 0), (f"chunks of {CHUNK_ROWS}", CHUNK_ROWS)]
+        for label, chunk_rows in modes:
+            if chunk_rows == 0 and args.skip_single_above is not None and size > args.skip_single_above:
+                print(f"{size:>10} {label:<14} {'skipped':>9}")
+                continue
+            elapsed, peak, size_bytes = measure(citations, chunk_rows, size <= args.memory_up_to)
+            peak_text = f"{peak:9.1f}" if peak is not None else f"{'-':>9}"
+            print(f"{size:>10} {label:<14} {elapsed:9.2f} {peak_text} {size_bytes / 1024:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
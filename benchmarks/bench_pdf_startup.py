@@ -0,0 +1,62 @@
+"""Benchmark server import time and per-report PDF render time.
+
+Import times are measured in fresh interpreters (the median of --imports runs),
+so they include everything `import server` / `import pdf_generator` pulls in.
+Render time is the mean over --runs 80-citation reports in this process, after
+one warm-up report (which includes the lazy font registration).
+
+Usage:
+    python benchmarks/bench_pdf_startup.py [--imports 7] [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_seconds(module: str, runs: int) -> float:
+    """Median wall time of importing a module in a fresh interpreter."""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(float(out.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--imports", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for module in ("pdf_generator", "server"):
+        print(f"  import {module:<14} {import_seconds(module, args.imports) * 1000:8.1f} ms")
+
+    from bench_pdf_report import make_citations
+    from pdf_generator import generate_source_report_pdf
+
+    citations = make_citations(80)
+    start = time.perf_counter()
+    generate_source_report_pdf(BytesIO(), citations)
+    print(f"  first report          {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        generate_source_report_pdf(BytesIO(), citations)
+    print(f"  report (80 citations) {(time.perf_counter() - start) / args.runs * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark quote verification against large fetched documents.
+
+Indexes a few hundred pages of synthetic text in a SourceTextCache (as the
+fetch tools do) and times `quote_verifier.verify_citations` for a report's
+worth of DIRECT quotes, most taken from the pages and some fabricated. Each
+quote is checked against the document it cites only, so the time per quote
+doesn't grow with the size of the sources.
+
+Usage:
+    python benchmarks/bench_quote_verifier.py [--pages 400] [--documents 10] [--quotes 80] [--runs 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quote_verifier import SourceTextCache, verify_citations
+
+
+def citation(question_id: str, quote: str, document: str) -> dict:
+    return {"question_id": question_id, "question_text": f"{question_id}?", "answer": "a", "source_quote": quote,
+            "source_section": "", "source_document": document, "confidence": "DIRECT", "reasoning": "Quoted"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--quotes", type=int, default=80)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    pages = [" ".join(rng.choice(vocabulary) for _ in range(500)) for _ in range(args.pages)]
+    pages_per_document = max(args.pages // args.documents, 1)
+
+    cache = SourceTextCache(max_documents=args.documents)
+    start = time.perf_counter()
+    for first in range(0, args.pages, pages_per_document):
+        cache.add(f"doc{first // pages_per_document}", "\n".join(pages[first:first + pages_per_document]))
+    index_time = time.perf_counter() - start
+
+    fabricated = args.quotes // 4
+    citations = []
+    for i in range(args.quotes - fabricated):
+        page = rng.randrange(args.pages)
+        words = pages[page].split()
+        begin = rng.randrange(len(words) - 30)
+        citations.append(citation(f"real{i}", "  ".join(words[begin:begin + 25]), f"doc{page // pages_per_document}"))
+    for i in range(fabricated):
+        quote = " ".join(rng.choice(vocabulary) for _ in range(25))
+        citations.append(citation(f"fake{i}", quote, f"doc{rng.randrange(args.documents)}"))
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        unverified, checked = verify_citations(citations, cache)
+    verify_time = (time.perf_counter() - start) / args.runs
+
+    characters = sum(len(page) for page in pages)
+    print(f"Sources: {args.pages} pages ({characters / 1e6:.1f}M characters) in {len(cache)} documents")
+    print(f"Index sources (once):    {index_time * 1000:9.1f} ms")
+    print(f"Verify {checked} quotes:       {verify_time * 1000:9.1f} ms ({len(unverified)} not found)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark response size and peak memory of embedded vs link response modes.
+
+Calls the `generate_source_report` and `generate_compliance_doc` tools in both
+response modes and reports the serialized tool-result size and the peak Python
+heap allocation (tracemalloc) during the call.
+
+Usage:
+    python benchmarks/bench_response_modes.py [--citations 80 1000 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # the tools read questions.json from the working directory
+
+import server
+
+
+def citation_payload(count: int) -> str:
+    """Citation JSON covering every question id, padded with extra citations up to `count`."""
+    with open("questions.json") as f:
+        ids = [q["id"] for q in json.load(f)]
+    citations = []
+    for i in range(max(count, len(ids))):
+        citations.append({
+            "question_id": ids[i] if i < len(ids) else f"extra_{i}",
+            "question_text": f"Question {i}: what does the documentation say about this topic?",
+            "answer": f"Answer {i} " * 8,
+            "source_quote": f"The technical report states detail {i} in full. " * 3,
+            "source_section": f"Section {i % 12}",
+            "confidence": ["DIRECT", "INFERRED", "DEFAULT", "NOT FOUND"][i % 4],
+            "reasoning": f"Reasoning for citation {i}.",
+        })
+    return json.dumps({"citations": citations})
+
+
+def measure(call) -> tuple[int, int, list]:
+    """Return (peak heap bytes, serialized response bytes, result) for one tool call."""
+    tracemalloc.start()
+    result = call()
+    response_size = len(json.dumps([item.model_dump(mode="json") for item in result]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, response_size, result
+
+
+def cleanup(result) -> None:
+    """Delete the artifact produced by a tool call."""
+    item = result[-1]
+    name = item.name if item.type == "resource_link" else str(item.resource.uri).rsplit("/", 1)[-1]
+    path = os.path.join(server.DATA_DIR, name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def report(label: str, call_for_mode) -> None:
+    print(label)
+    rows = {}
+    for mode in ("embedded", "link"):
+        peak, size, result = measure(lambda: call_for_mode(mode))
+        cleanup(result)
+        rows[mode] = (peak, size)
+        print(f"  {mode:<9} response {size / 1024:9.1f} KiB   peak heap {peak / 1024 / 1024:8.2f} MiB")
+    print(f"  link mode: response {rows['embedded'][1] / rows['link'][1]:.0f}x smaller, "
+          f"peak heap {100 * (1 - rows['link'][0] / rows['embedded'][0]):.0f}% lower")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--citations", type=int, nargs="+", default=[80, 1000, 5000])
+    args = parser.parse_args()
+
+    with open("questions.json") as f:
+        answers = json.dumps({q["id"]: f"Answer for {q['id']}" for q in json.load(f)})
+    report("generate_compliance_doc", lambda mode: server.generate_compliance_doc(answers, response_mode=mode))
+
+    for count in args.citations:
+        payload = citation_payload(count)
+        report(f"generate_source_report ({count} citations)",
+               lambda mode: server.generate_source_report(payload, response_mode=mode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark revising one answer: full re-render vs incremental re-render.
+
+Renders the default template with an answer for every question, then changes a
+single answer and compares:
+  * full:        render every dynamic paragraph again and write the package
+  * incremental: reuse the previous rendering for paragraphs whose
+                 placeholders did not change, then write the package
+
+Usage:
+    python benchmarks/bench_revisions.py [--runs 200]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx_generator import build_display_data, render_compiled_package, write_rendered_package
+from template_registry import DEFAULT_TEMPLATE_NAME, TemplateRegistry
+
+
+def mean_ms(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "questions.json")) as f:
+        data = {q["id"]: f"Answer for {q['id']}" for q in json.load(f)}
+    compiled = TemplateRegistry(os.path.join(ROOT, "templates")).get(DEFAULT_TEMPLATE_NAME)
+    previous = render_compiled_package(compiled, build_display_data(data))
+
+    changed_key = "legal_name"
+    revised = build_display_data({**data, changed_key: "Revised provider"})
+
+    def full():
+        write_rendered_package(compiled, render_compiled_package(compiled, revised), io.BytesIO())
+
+    def incremental():
+        rendered = render_compiled_package(compiled, revised, previous, {changed_key})
+        write_rendered_package(compiled, rendered, io.BytesIO())
+
+    def render_only(prev, keys):
+        return lambda: render_compiled_package(compiled, revised, prev, keys)
+
+    full_ms = mean_ms(full, args.runs)
+    incremental_ms = mean_ms(incremental, args.runs)
+    full_render_ms = mean_ms(render_only(None, None), args.runs)
+    incremental_render_ms = mean_ms(render_only(previous, {changed_key}), args.runs)
+
+    print(f"  full         {full_ms:8.2f} ms/revision  (render only {full_render_ms:6.3f} ms)")
+    print(f"  incremental  {incremental_ms:8.2f} ms/revision  (render only {incremental_render_ms:6.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
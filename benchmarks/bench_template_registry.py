@@ -0,0 +1,59 @@
+"""Benchmark filling from the template registry vs re-reading the template each call.
+
+Compares three ways of producing a filled compliance document from
+`templates/default_template.docx`:
+  * python-docx: parse the zip into an object tree on every call
+  * re-compile:  re-read and tokenize the zip on every call (no cache)
+  * registry:    fill from the cached compiled template (mtime check only)
+
+Usage:
+    python benchmarks/bench_template_registry.py [--runs 50]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx_generator import build_display_data, compile_package, fill_template, write_compiled_package
+from template_registry import DEFAULT_TEMPLATE_NAME, TemplateRegistry
+
+
+def mean_ms(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "questions.json")) as f:
+        data = {q["id"]: f"Answer for {q['id']}" for q in json.load(f)}
+    registry = TemplateRegistry(os.path.join(ROOT, "templates"))
+    template_path = registry.path(DEFAULT_TEMPLATE_NAME)
+    registry.preload()
+
+    results = {
+        "python-docx": mean_ms(lambda: fill_template(template_path, io.BytesIO(), data), args.runs),
+        "re-compile": mean_ms(
+            lambda: write_compiled_package(compile_package(template_path), io.BytesIO(), build_display_data(data)),
+            args.runs,
+        ),
+        "registry": mean_ms(lambda: registry.fill(DEFAULT_TEMPLATE_NAME, io.BytesIO(), data), args.runs),
+    }
+
+    for label, ms in results.items():
+        print(f"  {label:<12} {ms:8.2f} ms/doc  ({results['python-docx'] / ms:5.1f}x vs python-docx)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""ZIP bundles of generated compliance artifacts.
+
+A bundle holds the generated files plus a `manifest.json` listing each file's
+name, size, MIME type and SHA-256 hash, so a client can verify the contents
+after a single download. Files are streamed from disk into the archive in
+chunks and already-compressed formats (DOCX, PDF) are stored rather than
+deflated again, so building a bundle needs neither the files in memory nor
+much CPU.
+
+Exports:
+    MANIFEST_NAME: Name of the manifest inside the bundle
+    file_sha256: Hash a file in chunks
+    write_bundle: Write the ZIP bundle to a binary stream
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+
+MANIFEST_NAME = "manifest.json"
+
+CHUNK_SIZE = 1024 * 1024
+
+# Formats that are already ZIP/deflate-compressed gain nothing from another pass
+STORED_EXTENSIONS = (".docx", ".pdf", ".zip", ".png", ".jpg")
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_bundle(output_stream, files: list[tuple[str, str, str]], manifest: dict) -> dict:
+    """Write a ZIP bundle of files plus a manifest.json with their hashes.
+
+    Args:
+        output_stream: Seekable binary stream to write the ZIP to
+        files: (path on disk, name in the bundle, MIME type) per file
+        manifest: Extra manifest fields (e.g. model name); a "files" list is added
+
+    Returns:
+        The complete manifest as written to the bundle
+    """
+    manifest = dict(manifest)
+    manifest["files"] = [
+        {
+            "name": arcname,
+            "size": os.path.getsize(path),
+            "mime_type": mime_type,
+            "sha256": file_sha256(path),
+        }
+        for path, arcname, mime_type in files
+    ]
+
+    with zipfile.ZipFile(output_stream, "w") as bundle:
+        for path, arcname, _ in files:
+            compression = zipfile.ZIP_STORED if arcname.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, "rb") as source, bundle.open(info, "w") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+        bundle.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False),
+                        compress_type=zipfile.ZIP_DEFLATED)
+    return manifest
@@ -9,10 +9,14 @@ Exports:
     Citation: Model for a single question-answer citation
     CitationReport: Container for a list of citations
     validate_citation_json: Function to validate JSON string and return CitationReport
+    CoverageError: Raised when required questions have no citation
+    validate_citation_payload: Fast path returning renderer-ready citation dicts
 """
 
 from enum import Enum
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Annotated, Literal
+from typing_extensions import NotRequired, TypedDict
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints, TypeAdapter, ValidationError, field_validator
 
 
 class ConfidenceLevel(str, Enum):
@@ -59,6 +63,18 @@ class CitationReport(BaseModel):
     citations: list[Citation] = Field(min_length=1)
 
 
+def _format_validation_errors(error: ValidationError) -> str:
+    """Join field-level errors as "citations -> 0 -> confidence: message (type: ...)"."""
+    error_messages = []
+    for error in error.errors():
+        # Build field path (e.g., "citations -> 0 -> confidence")
+        field_path = " -> ".join(str(loc) for loc in error['loc'])
+        error_type = error['type']
+        msg = error['msg']
+        error_messages.append(f"{field_path}: {msg} (type: {error_type})")
+    return "; ".join(error_messages)
+
+
 def validate_citation_json(json_string: str) -> CitationReport:
     """Validate a JSON string and return a CitationReport instance.
 
@@ -75,16 +91,7 @@ def validate_citation_json(json_string: str) -> CitationReport:
         return CitationReport.model_validate_json(json_string)
     except ValidationError as e:
         # Format errors to show field paths
-        error_messages = []
-        for error in e.errors():
-            # Build field path (e.g., "citations -> 0 -> confidence")
-            field_path = " -> ".join(str(loc) for loc in error['loc'])
-            error_type = error['type']
-            msg = error['msg']
-            error_messages.append(f"{field_path}: {msg} (type: {error_type})")
-
-        error_string = "; ".join(error_messages)
-        raise ValueError(error_string)
+        raise ValueError(_format_validation_errors(e))
 
 
 def validate_report_coverage(report: CitationReport, required_ids: list[str]) -> None:
@@ -104,6 +111,85 @@ def validate_report_coverage(report: CitationReport, required_ids: list[str]) ->
     missing_ids = [qid for qid in required_ids if qid not in present_ids]
 
     if missing_ids:
-        missing_count = len(missing_ids)
-        missing_list_str = ", ".join(missing_ids)
-        raise ValueError(f"Missing citations for {missing_count} questions: [{missing_list_str}]")
+        raise CoverageError(_missing_ids_message(missing_ids))
+
+
+class CoverageError(ValueError):
+    """Raised when required question IDs have no citation."""
+
+
+def _missing_ids_message(missing_ids: list[str]) -> str:
+    """Format the coverage error for a list of missing question IDs."""
+    return f"Missing citations for {len(missing_ids)} questions: [{', '.join(missing_ids)}]"
+
+
+# Fast path: the same rules as Citation / CitationReport, expressed as TypedDicts so pydantic-core
+# validates the JSON straight into plain dicts (the renderer's input) without model instances.
+
+def _not_whitespace(field_name: str):
+    """After-validator rejecting whitespace-only strings, with the Citation model's message."""
+    def check(v: str) -> str:
+        if not v.strip():
+            raise ValueError(f"{field_name} cannot be whitespace-only")
+        return v
+    return check
+
+
+class CitationDict(TypedDict):
+    """Citation as accepted by validate_citation_payload (same fields and rules as Citation)."""
+    question_id: Annotated[str, StringConstraints(min_length=1)]
+    question_text: Annotated[str, StringConstraints(min_length=1), AfterValidator(_not_whitespace("question_text"))]
+    answer: NotRequired[str]
+    source_quote: NotRequired[str]
+    source_section: NotRequired[str]
+    source_document: NotRequired[str]
+    confidence: Literal[tuple(level.value for level in ConfidenceLevel)]
+    reasoning: Annotated[str, StringConstraints(min_length=1), AfterValidator(_not_whitespace("reasoning"))]
+
+
+# Fields with a default in Citation, filled with "" when omitted
+OPTIONAL_CITATION_FIELDS = ("answer", "source_quote", "source_section", "source_document")
+CITATION_FIELD_COUNT = len(CitationDict.__annotations__)
+
+
+class _CitationPayload(TypedDict):
+    citations: Annotated[list[CitationDict], Field(min_length=1)]
+
+
+# Built once: constructing a validator compiles its pydantic-core schema
+_citation_payload_adapter = TypeAdapter(_CitationPayload)
+
+
+def validate_citation_payload(json_string: str, required_ids=()) -> list[dict]:
+    """Validate a citation JSON string and return the citations as plain dicts.
+
+    Equivalent to validate_citation_json + validate_report_coverage + model_dump() per
+    citation, in one pass and without building model instances.
+
+    Args:
+        json_string: JSON string to validate ({"citations": [...]})
+        required_ids: Question IDs that MUST have a citation (in reporting order)
+
+    Returns:
+        Citation dicts with every Citation field present (omitted optional fields are "")
+
+    Raises:
+        ValueError: If validation fails, with formatted field-level error messages
+        CoverageError: If any required IDs are missing, listing them
+    """
+    try:
+        citations = _citation_payload_adapter.validate_json(json_string)["citations"]
+    except ValidationError as e:
+        raise ValueError(_format_validation_errors(e))
+
+    present_ids = set()
+    for citation in citations:
+        present_ids.add(citation["question_id"])
+        if len(citation) != CITATION_FIELD_COUNT:
+            for name in OPTIONAL_CITATION_FIELDS:
+                citation.setdefault(name, "")
+
+    missing_ids = [qid for qid in required_ids if qid not in present_ids]
+    if missing_ids:
+        raise CoverageError(_missing_ids_message(missing_ids))
+    return citations
@@ -0,0 +1,135 @@
+"""Staging area for citation reports submitted in chunks.
+
+Instead of sending every citation in one `generate_source_report` call, a client
+stages them in chunks: each chunk is validated on its own, so a malformed entry
+only costs resending that chunk. The client can ask which required questions are
+still missing and finally renders the report from everything staged.
+
+A staged report is identified by the id returned when it was started and lives in
+memory until it is finalized or has been idle for longer than the TTL.
+
+Exports:
+    DEFAULT_STAGING_TTL: Seconds a staged report is kept without activity
+    MAX_STAGED_REPORTS: Maximum number of staged reports kept at once
+    CitationStaging: In-memory store of staged reports
+"""
+
+import threading
+import time
+import uuid
+
+from citation_schema import validate_citation_payload
+
+
+DEFAULT_STAGING_TTL = 60 * 60
+MAX_STAGED_REPORTS = 256
+
+
+class CitationStaging:
+    """Staged citation reports, keyed by staging id."""
+
+    def __init__(self, ttl: float = DEFAULT_STAGING_TTL, max_reports: int = MAX_STAGED_REPORTS):
+        self.ttl = ttl
+        self.max_reports = max_reports
+        self._reports: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        """Drop expired reports, then the least recently used ones above max_reports. Call with the lock held."""
+        for staging_id in [sid for sid, report in self._reports.items() if now - report["updated"] > self.ttl]:
+            del self._reports[staging_id]
+        while len(self._reports) >= self.max_reports:
+            oldest = min(self._reports, key=lambda sid: self._reports[sid]["updated"])
+            del self._reports[oldest]
+
+    def _get(self, staging_id: str) -> dict:
+        """Return a staged report. Call with the lock held.
+
+        Raises:
+            KeyError: If there is no staged report with that id
+        """
+        report = self._reports.get(staging_id)
+        if report is None or time.monotonic() - report["updated"] > self.ttl:
+            self._reports.pop(staging_id, None)
+            raise KeyError(f"Staged report '{staging_id}' not found or expired")
+        return report
+
+    def create(self, model_name: str, model_card_id: str) -> str:
+        """Start a new staged report and return its id."""
+        now = time.monotonic()
+        staging_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge(now)
+            self._reports[staging_id] = {
+                "model_name": model_name,
+                "model_card_id": model_card_id,
+                # question_id -> citation; restaging a question replaces its citation
+                "citations": {},
+                "updated": now,
+            }
+        return staging_id
+
+    def append(self, staging_id: str, citations_json: str) -> list[str]:
+        """Validate a chunk of citations and add it to a staged report.
+
+        The chunk is all-or-nothing: if any entry is invalid, nothing is staged.
+
+        Args:
+            staging_id: Id returned by create()
+            citations_json: JSON string with a "citations" array, as for generate_source_report
+
+        Returns:
+            The question ids staged by this chunk
+
+        Raises:
+            KeyError: If there is no staged report with that id
+            ValueError: If the chunk is invalid, with formatted field-level error messages
+        """
+        with self._lock:
+            self._get(staging_id)
+        # Validate outside the lock: chunks of different reports don't wait on each other
+        citations = validate_citation_payload(citations_json)
+        with self._lock:
+            report = self._get(staging_id)
+            for citation in citations:
+                report["citations"][citation["question_id"]] = citation
+            report["updated"] = time.monotonic()
+        return [citation["question_id"] for citation in citations]
+
+    def info(self, staging_id: str) -> dict:
+        """Return model_name, model_card_id and the staged question ids of a report.
+
+        Raises:
+            KeyError: If there is no staged report with that id
+        """
+        with self._lock:
+            report = self._get(staging_id)
+            return {
+                "model_name": report["model_name"],
+                "model_card_id": report["model_card_id"],
+                "question_ids": list(report["citations"]),
+            }
+
+    def missing(self, staging_id: str, required_ids) -> list[str]:
+        """Return the required question ids that have no staged citation yet.
+
+        Raises:
+            KeyError: If there is no staged report with that id
+        """
+        with self._lock:
+            staged = self._get(staging_id)["citations"]
+            return [qid for qid in required_ids if qid not in staged]
+
+    def citations(self, staging_id: str) -> list[dict]:
+        """Return the staged citations, in order of first staging.
+
+        Raises:
+            KeyError: If there is no staged report with that id
+        """
+        with self._lock:
+            return list(self._get(staging_id)["citations"].values())
+
+    def discard(self, staging_id: str) -> None:
+        """Forget a staged report (e.g. after it was rendered)."""
+        with self._lock:
+            self._reports.pop(staging_id, None)
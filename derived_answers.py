@@ -0,0 +1,201 @@
+"""Server-side derivation of compliance answers that follow from other answers.
+
+Some questions in questions.json are mechanical consequences of others:
+
+- `total_model_size_500m` ... `total_model_size_max` (yes/no size brackets) follow
+  from the parameter count in `total_model_size`.
+- `input_modalities_*_check` / `output_modalities_*_check` follow from the matching
+  `*_max` field, which is 'N/A' exactly when the modality isn't used.
+
+`derive_answers` evaluates these rules before a document is filled. A derived value
+replaces whatever the caller sent for that field; when the caller's value differed,
+the disagreement is reported as a conflict. Rules whose source answer is missing or
+can't be interpreted leave the target untouched.
+
+Exports:
+    DERIVATION_RULES: All rules, in evaluation order
+    DERIVED_FIELDS: Ids of all fields that can be derived
+    DerivationRule: Target field, source field and derive function
+    DerivationResult: Completed answers, derived values and conflicts
+    parse_parameter_count: Parse a parameter count such as "7.3*10^10" or "70B"
+    derive_answers: Apply the rules to a dict of answers
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+# Size brackets of the model documentation form: (field, lower bound exclusive, upper bound inclusive)
+SIZE_BRACKETS = (
+    ("total_model_size_500m", 1, 500e6),
+    ("total_model_size_5b", 500e6, 5e9),
+    ("total_model_size_15b", 5e9, 15e9),
+    ("total_model_size_50b", 15e9, 50e9),
+    ("total_model_size_100b", 50e9, 100e9),
+    ("total_model_size_500b", 100e9, 500e9),
+    ("total_model_size_1t", 500e9, 1e12),
+    ("total_model_size_max", 1e12, math.inf),
+)
+
+MODALITIES = ("text", "images", "audio", "video", "other")
+
+# Answers meaning "not applicable" in a *_max field
+NOT_APPLICABLE = {"", "n/a", "na", "n.a.", "none", "no", "not applicable", "-", "—"}
+
+YES_VALUES = {"yes", "y", "true", "☑"}
+NO_VALUES = {"no", "n", "false", "☐", "n/a", "na", "none", "not applicable"}
+
+# Smallest parameter count accepted without a unit or exponent; smaller bare numbers
+# (e.g. the "12" in "12 layers") are not parameter counts
+MIN_BARE_COUNT = 1000
+
+UNIT_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "million": 1e6, "mn": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "t": 1e12, "trillion": 1e12,
+}
+
+# Mixture-of-experts notation ("8x7B", "8 × 22B"): the total isn't the product, so it isn't guessed
+EXPERT_COUNT_RE = re.compile(
+    r"\d\s*(?:x|×)\s*\d+(?:\.\d+)?\s*(?:thousand|million|billion|trillion|mn|bn|[kmbt])\b",
+    re.IGNORECASE,
+)
+
+PARAMETER_COUNT_RE = re.compile(
+    r"(\d+(?:\.\d+)?)"
+    r"(?:\s*(?:\*|x|×|·)\s*10\s*(?:\^|\*\*)\s*(\d+)|e\+?(\d+))?"
+    r"(?:\s*(thousand|million|billion|trillion|mn|bn|[kmbt])\b)?",
+    re.IGNORECASE,
+)
+
+
+def parse_parameter_count(text) -> float | None:
+    """Parse a parameter count from a free-text answer.
+
+    Accepts forms like "7.3*10^10 parameters", "7.3e10", "70B", "1.5 trillion" and
+    "7,000,000,000".
+
+    Args:
+        text: Answer text (non-strings are converted with str())
+
+    Returns:
+        The parameter count, or None if the text holds no count, several different ones
+        (e.g. "46.7B total, 12.9B active") or mixture-of-experts notation (e.g. "8x7B")
+    """
+    text = re.sub(r"(?<=\d),(?=\d{3}\b)", "", str(text))
+    if EXPERT_COUNT_RE.search(text):
+        return None
+    counts = set()
+    for match in PARAMETER_COUNT_RE.finditer(text):
+        mantissa, power, exponent, unit = match.groups()
+        value = float(mantissa)
+        if power or exponent:
+            value *= 10 ** int(power or exponent)
+        if unit:
+            value *= UNIT_MULTIPLIERS[unit.lower()]
+        elif not (power or exponent) and value < MIN_BARE_COUNT:
+            continue
+        counts.add(value)
+    return counts.pop() if len(counts) == 1 else None
+
+
+def _size_bracket(lower: float, upper: float) -> Callable[[str], str | None]:
+    """Rule function answering whether the source parameter count is in (lower, upper]."""
+    def derive(source_value: str) -> str | None:
+        count = parse_parameter_count(source_value)
+        if count is None:
+            return None
+        return "yes" if lower < count <= upper else "no"
+    return derive
+
+
+def _modality_check(modality: str) -> Callable[[str], str | None]:
+    """Rule function answering whether a modality is used, from its maximum size answer."""
+    def derive(source_value: str) -> str | None:
+        applicable = str(source_value).strip().lower() not in NOT_APPLICABLE
+        if modality == "other":
+            # The "other" check asks to specify the modality, which only the caller knows
+            return None if applicable else "N/A"
+        return "yes" if applicable else "no"
+    return derive
+
+
+@dataclass(frozen=True)
+class DerivationRule:
+    """Derive `target` from the answer to `source`; `derive` returns None if it can't tell."""
+    target: str
+    source: str
+    derive: Callable[[str], str | None]
+
+
+DERIVATION_RULES = tuple(
+    [DerivationRule(target, "total_model_size", _size_bracket(lower, upper)) for target, lower, upper in SIZE_BRACKETS]
+    + [
+        DerivationRule(f"{direction}_modalities_{modality}_check", f"{direction}_modalities_{modality}_max",
+                       _modality_check(modality))
+        for direction in ("input", "output")
+        for modality in MODALITIES
+    ]
+)
+
+DERIVED_FIELDS = tuple(rule.target for rule in DERIVATION_RULES)
+
+
+@dataclass
+class DerivationResult:
+    """Outcome of derive_answers.
+
+    Attributes:
+        answers: Input answers with every derivable field set to its derived value
+        derived: Field -> derived value, for every rule that could be evaluated
+        conflicts: One entry per field where the caller sent a different value, with
+                   question_id, given, derived and source keys
+    """
+    answers: dict
+    derived: dict = field(default_factory=dict)
+    conflicts: list = field(default_factory=list)
+
+
+def _normalize(value) -> str:
+    """Normalize an answer for comparison; yes/no spellings (and N/A as no) compare equal."""
+    text = str(value).strip().lower()
+    if text in YES_VALUES:
+        return "yes"
+    if text in NO_VALUES:
+        return "no"
+    return text
+
+
+def derive_answers(answers: dict, rules: tuple = DERIVATION_RULES) -> DerivationResult:
+    """Apply derivation rules to compliance answers.
+
+    Args:
+        answers: Answers keyed by question id (not modified)
+        rules: Rules to evaluate (default: DERIVATION_RULES)
+
+    Returns:
+        DerivationResult with the completed answers, derived values and conflicts
+    """
+    result = DerivationResult(answers=dict(answers))
+    for rule in rules:
+        source_value = answers.get(rule.source)
+        if source_value is None or str(source_value).strip() == "":
+            continue
+        value = rule.derive(source_value)
+        if value is None:
+            continue
+
+        given = answers.get(rule.target)
+        if given is not None and str(given).strip() != "" and _normalize(given) != _normalize(value):
+            result.conflicts.append({
+                "question_id": rule.target,
+                "given": given,
+                "derived": value,
+                "source": rule.source,
+            })
+        result.derived[rule.target] = value
+        result.answers[rule.target] = value
+    return result
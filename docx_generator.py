@@ -1,6 +1,36 @@
 from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from dataclasses import dataclass
+from xml.sax.saxutils import escape as escape_xml
 import zipfile
+import html
 import io
+import os
+import re
+import threading
+
+
+# Matches {{key}} placeholders in paragraph text
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(.+?)\}\}")
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Placeholder index for a template.
+    `slots` maps every paragraph (body and nested table cells alike) that contains
+    placeholders to the keys found in it. A paragraph is addressed by its path of
+    child indexes from the document body, so a fill reaches it without walking the
+    other paragraphs.
+    """
+    slots: tuple[tuple[tuple[int, ...], tuple[str, ...]], ...]
+    keys: frozenset[str]
+
+
+# Compiled indexes keyed by absolute template path -> (mtime, CompiledTemplate)
+_compiled_templates: dict[str, tuple[float, CompiledTemplate]] = {}
+_compiled_templates_lock = threading.Lock()
 
 
 def load_docx_from_template(path_or_file) -> Document:
@@ -9,33 +39,64 @@ def load_docx_from_template(path_or_file) -> Document:
     """
     return Document(path_or_file)
 
-def process_tables(tables, display_data):
+def iter_paragraph_elements(doc: Document):
     """
-    Recursively process tables to handle nested tables.
+    Yields every <w:p> element of the document body in document order,
+    including paragraphs inside (nested) table cells.
     """
-    for table in tables:
-        for row in table.rows:
-            for cell in row.cells:
-                # Process paragraphs in the cell
-                for paragraph in cell.paragraphs:
-                     for key, value in display_data.items():
-                        placeholder = f"{{{{{key}}}}}"
-                        if placeholder in paragraph.text:
-                            paragraph.text = paragraph.text.replace(placeholder, value)
-                
-                # Recursively process nested tables in the cell
-                if cell.tables:
-                    process_tables(cell.tables, display_data)
+    return doc.element.body.iter(qn("w:p"))
 
-def fill_template(template_path, output_path, data: dict):
+def compile_template(doc: Document) -> CompiledTemplate:
     """
-    Fills a docx template by replacing {{key}} with value from data.
-    template_path and output_path can be file paths (str) or file-like objects.
+    Scans a loaded template once and records which paragraphs contain which placeholders.
+    """
+    body = doc.element.body
+    slots = []
+    keys = set()
+    for p in iter_paragraph_elements(doc):
+        text = Paragraph(p, None).text
+        if "{{" not in text:
+            continue
+        found = tuple(dict.fromkeys(PLACEHOLDER_PATTERN.findall(text)))
+        if found:
+            slots.append((_element_path(body, p), found))
+            keys.update(found)
+    return CompiledTemplate(slots=tuple(slots), keys=frozenset(keys))
+
+def _element_path(root, element) -> tuple[int, ...]:
+    """
+    Returns the child indexes leading from `root` down to `element`.
+    """
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+def get_compiled_template(template_path: str, doc: Document = None) -> CompiledTemplate:
+    """
+    Returns the placeholder index for a template file, compiling it only when the
+    file is new or its mtime changed. `doc` may be passed to reuse an already
+    loaded copy of the template for compilation.
+    """
+    path = os.path.abspath(template_path)
+    mtime = os.path.getmtime(path)
+
+    with _compiled_templates_lock:
+        cached = _compiled_templates.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    compiled = compile_template(doc if doc is not None else load_docx_from_template(path))
+    with _compiled_templates_lock:
+        _compiled_templates[path] = (mtime, compiled)
+    return compiled
+
+def build_display_data(data: dict) -> dict:
+    """
+    Prepares visually friendly data map (converting yes/no to checkboxes).
     """
-    # Load template safely
-    doc = load_docx_from_template(template_path)
-    
-    # Prepare visually friendly data map (converting yes/no to checkboxes)
     display_data = {}
     for k, v in data.items():
         val_str = str(v).strip().lower()
@@ -45,17 +106,335 @@ def fill_template(template_path, output_path, data: dict):
             display_data[k] = "☐" # Unchecked box
         else:
             display_data[k] = str(v)
-    
-    # Process body paragraphs
-    for paragraph in doc.paragraphs:
-        for key, value in display_data.items():
-            placeholder = f"{{{{{key}}}}}"
-            if placeholder in paragraph.text:
-                paragraph.text = paragraph.text.replace(placeholder, value)
-    
-    # Process tables recursively
-    process_tables(doc.tables, display_data)
+    return display_data
+
+def apply_compiled_template(doc: Document, compiled: CompiledTemplate, display_data: dict):
+    """
+    Replaces placeholders in `doc`, following the indexed paths to the paragraphs that
+    contain them; the work is proportional to the number of placeholder paragraphs,
+    not to the size of the document (which `doc` has already been parsed into).
+    Placeholders whose key is missing from display_data are left untouched.
+    """
+    if not compiled.slots or compiled.keys.isdisjoint(display_data):
+        return
+
+    def substitute(match):
+        key = match.group(1)
+        return display_data[key] if key in display_data else match.group(0)
+
+    body = doc.element.body
+    for path, keys in compiled.slots:
+        if not any(key in display_data for key in keys):
+            continue
+        p = body
+        for index in path:
+            p = p[index]
+        paragraph = Paragraph(p, doc._body)
+        paragraph.text = PLACEHOLDER_PATTERN.sub(substitute, paragraph.text)
+
+def fill_template(template_path, output_path, data: dict):
+    """
+    Fills a docx template by replacing {{key}} with value from data.
+    template_path and output_path can be file paths (str) or file-like objects.
+    Template files are compiled into a placeholder index once and the index is
+    reused until the file's mtime changes.
+    """
+    # Load template safely
+    doc = load_docx_from_template(template_path)
+
+    if isinstance(template_path, (str, os.PathLike)):
+        compiled = get_compiled_template(template_path, doc)
+    else:
+        compiled = compile_template(doc)
+
+    apply_compiled_template(doc, compiled, build_display_data(data))
 
     doc.save(output_path)
 
 
+# --- XML streaming fast path ---
+# Works directly on the zipped package: every part except the document body,
+# headers and footers is copied unchanged, and those are rewritten from a
+# pre-tokenized segment list without building a python-docx object tree.
+
+# Parts whose text may contain placeholders
+TEXT_PART_PATTERN = re.compile(r"^word/(document|header\d*|footer\d*)\.xml$")
+
+# Splits XML into tags and character data
+XML_TOKEN_PATTERN = re.compile(r"<[^>]*>|[^<]+")
+
+# Characters that cannot appear in XML 1.0 documents
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _XmlParagraph:
+    """
+    A <w:p> containing placeholders, split into static markup and its <w:t> text slots.
+    `pieces` holds literal markup strings, slot indexes (int) into `texts`, and
+    nested _XmlParagraph objects (e.g. paragraphs inside text boxes). `raw_texts`
+    keeps each slot's original opening <w:t> tag and escaped text. `all_keys`
+    includes the keys of nested paragraphs.
+    """
+    __slots__ = ("pieces", "texts", "raw_texts", "keys", "all_keys")
+
+    def __init__(self, pieces, texts, raw_texts, keys):
+        self.pieces = pieces
+        self.texts = texts
+        self.raw_texts = raw_texts
+        self.keys = keys
+        self.all_keys = frozenset(keys).union(
+            *(p.all_keys for p in pieces if isinstance(p, _XmlParagraph))
+        )
+
+
+@dataclass(frozen=True)
+class CompiledPackage:
+    """
+    A template package pre-split for streaming fills.
+    `entries` keeps the original zip order; each is (ZipInfo, bytes) for parts
+    copied unchanged, or (ZipInfo, segments) for parts rewritten on fill.
+    """
+    entries: tuple
+    keys: frozenset[str]
+
+
+# Compiled packages keyed by absolute template path -> (mtime, CompiledPackage)
+_compiled_packages: dict[str, tuple[float, CompiledPackage]] = {}
+_compiled_packages_lock = threading.Lock()
+
+
+def _compact(pieces: list) -> list:
+    """
+    Merges adjacent literal strings so rendering joins as few pieces as possible.
+    """
+    compacted = []
+    for piece in pieces:
+        if isinstance(piece, str) and compacted and isinstance(compacted[-1], str):
+            compacted[-1] += piece
+        else:
+            compacted.append(piece)
+    return compacted
+
+def compile_xml_part(xml: str) -> tuple[list, set]:
+    """
+    Tokenizes an XML part once into literal markup and _XmlParagraph segments.
+    Only paragraphs whose combined <w:t> text contains a placeholder stay dynamic,
+    so placeholders split across several runs are still found.
+    Returns (segments, placeholder keys).
+    """
+    keys = set()
+    # Stack of open paragraphs: [pieces, texts, raw_texts]; index 0 is the part itself
+    stack = [[[], [], []]]
+    open_text_tag = None
+
+    for token in XML_TOKEN_PATTERN.findall(xml):
+        pieces, texts, raw_texts = stack[-1]
+        if open_text_tag is not None and not token.startswith("<"):
+            # Text slot: remembered with its opening tag so it can be re-emitted as-is
+            pieces.append(len(texts))
+            texts.append(html.unescape(token))
+            raw_texts.append(open_text_tag + token)
+            open_text_tag = None
+            continue
+        if open_text_tag is not None:
+            pieces.append(open_text_tag)
+            open_text_tag = None
+
+        if token.startswith(("<w:p>", "<w:p ")) and not token.endswith("/>"):
+            stack.append([[token], [], []])
+        elif token == "</w:p>" and len(stack) > 1:
+            pieces.append(token)
+            stack.pop()
+            parent = stack[-1][0]
+            found = tuple(dict.fromkeys(PLACEHOLDER_PATTERN.findall("".join(texts))))
+            has_nested = any(isinstance(p, _XmlParagraph) for p in pieces)
+            if found or has_nested:
+                keys.update(found)
+                parent.append(_XmlParagraph(_compact(pieces), texts, raw_texts, found))
+            else:
+                parent.extend(p if isinstance(p, str) else raw_texts[p] for p in pieces)
+        elif len(stack) > 1 and token.startswith(("<w:t>", "<w:t ")) and not token.endswith("/>"):
+            open_text_tag = token
+        else:
+            pieces.append(token)
+
+    # Unbalanced markup: treat anything left open as literal
+    while len(stack) > 1:
+        pieces, texts, raw_texts = stack.pop()
+        stack[-1][0].extend(p if isinstance(p, str) else raw_texts[p] for p in pieces)
+
+    return _compact(stack[0][0]), keys
+
+def _encode_text(value: str) -> str:
+    """
+    Escapes text for a <w:t> body, turning newlines and tabs into <w:br/> and <w:tab/>
+    the same way python-docx does when setting paragraph text.
+    """
+    if INVALID_XML_CHARS.search(value):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    encoded = escape_xml(value)
+    if "\n" in encoded or "\t" in encoded:
+        encoded = (encoded.replace("\r\n", "\n")
+                   .replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+                   .replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">'))
+    return encoded
+
+def _substitute_slots(texts: list[str], display_data: dict) -> list:
+    """
+    Replaces placeholders over the concatenated slot texts. Each replacement is
+    written into the slot where its placeholder starts and the placeholder's
+    remaining characters are removed from the following slots, so the formatting
+    of the first run is kept. Returns the new text per slot, or None if unchanged.
+    """
+    full_text = "".join(texts)
+    matches = [m for m in PLACEHOLDER_PATTERN.finditer(full_text) if m.group(1) in display_data]
+    if not matches:
+        return [None] * len(texts)
+
+    new_texts = []
+    offset = 0
+    match_iter = iter(matches)
+    match = next(match_iter)
+    for text in texts:
+        start, end = offset, offset + len(text)
+        offset = end
+        if match is None or match.start() >= end:
+            new_texts.append(None)
+            continue
+        parts = []
+        position = start
+        while match is not None and match.start() < end:
+            if match.start() >= position:
+                parts.append(full_text[position:match.start()])
+                parts.append(display_data[match.group(1)])
+            if match.end() > end:
+                position = end
+                break
+            position = match.end()
+            match = next(match_iter, None)
+        parts.append(full_text[position:end])
+        new_texts.append("".join(parts))
+    return new_texts
+
+def _render_segments(segments, display_data: dict, out: list) -> None:
+    """
+    Appends the rendered XML of compiled segments to `out`.
+    """
+    for segment in segments:
+        if isinstance(segment, str):
+            out.append(segment)
+            continue
+        if segment.keys and any(key in display_data for key in segment.keys):
+            new_texts = _substitute_slots(segment.texts, display_data)
+        else:
+            new_texts = [None] * len(segment.texts)
+        for piece in segment.pieces:
+            if isinstance(piece, str):
+                out.append(piece)
+            elif isinstance(piece, int):
+                new_text = new_texts[piece]
+                if new_text is None:
+                    out.append(segment.raw_texts[piece])
+                else:
+                    # Preserve leading/trailing spaces of substituted text
+                    out.append('<w:t xml:space="preserve">')
+                    out.append(_encode_text(new_text))
+            else:
+                _render_segments([piece], display_data, out)
+
+def compile_package(template_path) -> CompiledPackage:
+    """
+    Reads a template package once, keeping untouched parts as raw bytes and
+    pre-tokenizing the document body, headers and footers.
+    """
+    entries = []
+    keys = set()
+    with zipfile.ZipFile(template_path) as package:
+        for info in package.infolist():
+            data = package.read(info)
+            if TEXT_PART_PATTERN.match(info.filename):
+                segments, part_keys = compile_xml_part(data.decode("utf-8"))
+                keys.update(part_keys)
+                entries.append((info, segments))
+            else:
+                entries.append((info, data))
+    return CompiledPackage(entries=tuple(entries), keys=frozenset(keys))
+
+def get_compiled_package(template_path: str) -> CompiledPackage:
+    """
+    Returns the streaming-fill form of a template file, recompiling only when
+    the file is new or its mtime changed.
+    """
+    path = os.path.abspath(template_path)
+    mtime = os.path.getmtime(path)
+
+    with _compiled_packages_lock:
+        cached = _compiled_packages.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    compiled = compile_package(path)
+    with _compiled_packages_lock:
+        _compiled_packages[path] = (mtime, compiled)
+    return compiled
+
+def render_compiled_package(compiled: CompiledPackage, display_data: dict,
+                            previous: dict = None, changed_keys=None) -> dict:
+    """
+    Renders the rewritten parts of a package to {part name: [rendered top-level segments]}.
+    When `previous` (an earlier rendering of the same package) and `changed_keys` are
+    given, only paragraphs containing a changed key are re-rendered; all other
+    segments are reused from `previous`.
+    """
+    rendered = {}
+    for info, content in compiled.entries:
+        if isinstance(content, bytes):
+            continue
+        previous_part = previous.get(info.filename) if previous is not None else None
+        if previous_part is not None and len(previous_part) != len(content):
+            previous_part = None
+        part = []
+        for index, segment in enumerate(content):
+            if isinstance(segment, str):
+                part.append(segment)
+            elif previous_part is not None and segment.all_keys.isdisjoint(changed_keys):
+                part.append(previous_part[index])
+            else:
+                out = []
+                _render_segments([segment], display_data, out)
+                part.append("".join(out))
+        rendered[info.filename] = part
+    return rendered
+
+def write_rendered_package(compiled: CompiledPackage, rendered: dict, output_path):
+    """
+    Writes a package from render_compiled_package output: rewritten parts come from
+    `rendered`, all other parts are written back with their original content and zip metadata.
+    """
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as package:
+        for info, content in compiled.entries:
+            if isinstance(content, bytes):
+                package.writestr(info, content)
+            else:
+                package.writestr(info, "".join(rendered[info.filename]).encode("utf-8"))
+
+def write_compiled_package(compiled: CompiledPackage, output_path, display_data: dict):
+    """
+    Writes a filled package: rewritten parts are rendered from their segments,
+    all other parts are written back with their original content and zip metadata.
+    """
+    write_rendered_package(compiled, render_compiled_package(compiled, display_data), output_path)
+
+def fill_template_xml(template_path, output_path, data: dict):
+    """
+    Fills a docx template like fill_template, but at the zip/XML level.
+    Placeholders split across runs are replaced in place, keeping run formatting,
+    in the document body as well as headers and footers.
+    template_path and output_path can be file paths (str) or file-like objects.
+    """
+    if isinstance(template_path, (str, os.PathLike)):
+        compiled = get_compiled_package(template_path)
+    else:
+        compiled = compile_package(template_path)
+
+    write_compiled_package(compiled, output_path, build_display_data(data))
@@ -0,0 +1,121 @@
+"""Signed download URLs.
+
+Download links carry their expiry time and an HMAC-SHA256 signature over the file
+name and that expiry:
+
+    /download/{filename}?expires={unix time}&signature={base64url HMAC}
+
+The download route verifies a link with the key alone, so expired, forged or
+guessed links are rejected without touching the storage, and any replica that
+shares the key can verify links issued by another.
+
+The key comes from the DOWNLOAD_SIGNING_KEY environment variable. Several
+comma-separated keys can be given to rotate keys: the first one signs, all of
+them verify. Without the variable, a random key is generated once and kept in the
+storage directory, so links survive restarts and are shared by the processes
+using that directory.
+
+Exports:
+    SIGNING_KEY_NAME: File name of the generated key in the storage directory
+    InvalidSignature: A link whose signature doesn't verify
+    LinkExpired: A link whose expiry time has passed
+    DownloadSigner: Signs and verifies download links
+    load_or_create_key: Generated key kept in the storage directory
+    signer_from_env: Signer configured by the environment
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from urllib.parse import urlencode
+
+
+SIGNING_KEY_NAME = ".download_signing_key"
+
+
+class InvalidSignature(ValueError):
+    """The download link is forged, altered or unsigned."""
+
+
+class LinkExpired(ValueError):
+    """The download link's expiry time has passed."""
+
+
+class DownloadSigner:
+    """Signs and verifies download links with HMAC-SHA256."""
+
+    def __init__(self, keys: list[bytes]):
+        """
+        Args:
+            keys: Signing keys; the first signs new links, all of them verify
+        """
+        if not keys or not all(keys):
+            raise ValueError("At least one non-empty signing key is required")
+        self.keys = list(keys)
+
+    @staticmethod
+    def _signature(key: bytes, filename: str, expires: int) -> str:
+        digest = hmac.new(key, f"{filename}\n{expires}".encode("utf-8"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+    def sign(self, filename: str, expires: float) -> str:
+        """Return the query string authorizing downloads of a file until `expires` (unix time)."""
+        expires = int(expires)
+        return urlencode({"expires": expires, "signature": self._signature(self.keys[0], filename, expires)})
+
+    def verify(self, filename: str, expires: str | None, signature: str | None, now: float | None = None) -> None:
+        """Check the expiry and signature of a download link.
+
+        Args:
+            filename: Requested file name
+            expires, signature: The link's query parameters (None if missing)
+            now: Current unix time; defaults to time.time()
+
+        Raises:
+            InvalidSignature: If a parameter is missing or the signature doesn't match
+            LinkExpired: If the signature is valid but the expiry time has passed
+        """
+        # isdigit() alone accepts non-ASCII digits such as '²', which int() rejects
+        if not expires or not signature or not (expires.isascii() and expires.isdigit()):
+            raise InvalidSignature("Download link is not signed")
+        if not any(hmac.compare_digest(self._signature(key, filename, int(expires)), signature) for key in self.keys):
+            raise InvalidSignature("Invalid download link signature")
+        if int(expires) < (time.time() if now is None else now):
+            raise LinkExpired("Download link expired")
+
+
+def load_or_create_key(data_dir: str, key_name: str = SIGNING_KEY_NAME) -> bytes:
+    """Return the signing key kept in a directory, generating it on first use.
+
+    Processes starting at the same time agree on one key: it is written to a temporary
+    file and hard-linked into place, which fails if another process got there first.
+    """
+    path = os.path.join(data_dir, key_name)
+    try:
+        with open(path, "rb") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+
+    partial_path = f"{path}.{os.getpid()}.part"
+    with open(partial_path, "wb") as f:
+        f.write(secrets.token_hex(32).encode("ascii"))
+    os.chmod(partial_path, 0o600)
+    try:
+        os.link(partial_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(partial_path)
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+
+def signer_from_env(data_dir: str) -> DownloadSigner:
+    """Return the signer using DOWNLOAD_SIGNING_KEY, or the generated key in data_dir."""
+    configured = [key.strip().encode("utf-8") for key in os.environ.get("DOWNLOAD_SIGNING_KEY", "").split(",")]
+    keys = [key for key in configured if key]
+    return DownloadSigner(keys or [load_or_create_key(data_dir)])
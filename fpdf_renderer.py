@@ -0,0 +1,233 @@
+"""fpdf2 backend for citation report PDFs.
+
+Renders the same report as the ReportLab backend in pdf_generator (title,
+executive summary, citation table with confidence colors and header rows
+repeated on every page, footer with model card id and page number) using
+fpdf2's table layout, which places rows in a single pass without building a
+flowable tree first.
+
+Cell text is written with fpdf2's markdown so the Source/Details column can mix
+italic quotes with plain lines; all citation text is escaped first.
+
+Exports:
+    render_source_report_fpdf: Backend render function (see pdf_generator.get_pdf_renderer)
+"""
+
+import os
+from collections import Counter
+from datetime import datetime
+
+from fpdf import FPDF, FPDF_VERSION
+from fpdf.fonts import FontFace
+
+from pdf_generator import (
+    CHUNK_ROWS,
+    COLUMN_WIDTHS,
+    CONFIDENCE_COLORS,
+    FONT_DIR,
+    TABLE_HEADERS,
+    _format_timestamp,
+    citation_section_display,
+    citation_source_lines,
+)
+
+
+FONT_FAMILY = 'DejaVuSans'
+
+# Page geometry in points, matching the ReportLab backend (letter, 0.5" margins, 0.75" bottom)
+PAGE_MARGIN = 36
+BOTTOM_MARGIN = 54
+FOOTER_BASELINE = 21.6
+
+MARKDOWN_MARKERS = ('**', '__', '--', '~~')
+# Zero-width word joiner, used to break accidental markdown link syntax "[text](url)"
+WORD_JOINER = '\u2060'
+
+HEADER_FILL = (0x4A, 0x55, 0x68)
+GRID_GRAY = (128, 128, 128)
+
+
+def _rgb(color) -> tuple[int, int, int]:
+    """Convert a ReportLab color to an (r, g, b) tuple of 0-255 ints."""
+    return tuple(round(channel * 255) for channel in color.rgb())
+
+
+CONFIDENCE_FILLS = {level: _rgb(color) for level, color in CONFIDENCE_COLORS.items()}
+
+
+def _escape_markdown(text: str) -> str:
+    """Escape text so fpdf2's markdown parser renders it literally.
+
+    Args:
+        text: Raw text
+
+    Returns:
+        Text with every emphasis marker fpdf2 would act on preceded by an odd number
+        of backslashes, and link syntax broken with a zero-width word joiner
+    """
+    out = []
+    i = 0
+    while i < len(text):
+        pair = text[i:i + 2]
+        # fpdf2 only treats a pair as a marker if it isn't part of a longer run
+        if pair in MARKDOWN_MARKERS and (not out or out[-1][-1] != pair[0]) and text[i + 2:i + 3] != pair[0]:
+            backslashes = 0
+            while backslashes < len(out) and out[-1 - backslashes] == '\\':
+                backslashes += 1
+            out.append('\\' * (backslashes + 1))
+            out.append(pair)
+            i += 2
+            continue
+        out.append(text[i])
+        i += 1
+    return ''.join(out).replace('](', f']{WORD_JOINER}(')
+
+
+def _source_lines_markdown(lines: list[list[tuple[str, str]]]) -> str:
+    """Render citation_source_lines() output as fpdf2 markdown."""
+    markers = {'i': '__', 'b': '**', '': ''}
+    return "\n".join(
+        "".join(f"{markers[emphasis]}{_escape_markdown(text)}{markers[emphasis]}" for emphasis, text in line)
+        for line in lines
+    )
+
+
+class _ReportPDF(FPDF):
+    """FPDF document drawing the report footer on every page."""
+
+    def __init__(self, model_card_id: str, timestamp: str):
+        super().__init__(unit='pt', format='letter')
+        self.model_card_id = model_card_id
+        self.timestamp = timestamp
+
+    def footer(self):
+        """Draw footer with model card ID, timestamp and page number."""
+        self.set_font(FONT_FAMILY, size=8)
+        self.set_text_color(102)
+        baseline = self.h - FOOTER_BASELINE
+
+        # Left side: Model Card ID
+        self.text(PAGE_MARGIN, baseline, f"Model Card: {self.model_card_id}")
+
+        # Right side: Timestamp and page number
+        right_text = f"Generated: {self.timestamp} | Page {self.page_no()}"
+        self.text(self.w - PAGE_MARGIN - self.get_string_width(right_text), baseline, right_text)
+
+
+def _write_executive_summary(pdf: FPDF, citations: list[dict], model_card_id: str, timestamp: str) -> None:
+    """Write the executive summary section (see pdf_generator._build_executive_summary)."""
+    pdf.set_font(FONT_FAMILY, size=14)
+    pdf.set_text_color(0)
+    pdf.multi_cell(0, 17, "Executive Summary", new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(15.2)
+
+    pdf.set_font(FONT_FAMILY, size=10)
+    if not citations:
+        pdf.multi_cell(0, 14, "No citations provided.", new_x='LMARGIN', new_y='NEXT')
+        return
+
+    confidence_counts = Counter(c.get('confidence', 'UNKNOWN') for c in citations)
+    total = len(citations)
+
+    summary_lines = [
+        f"**Model Card:** {_escape_markdown(model_card_id)}",
+        f"**Generated:** {timestamp}",
+        f"**Total Questions:** {total}",
+        "",
+        "**Confidence Breakdown:**",
+    ]
+    for level in ['DIRECT', 'INFERRED', 'DEFAULT', 'NOT FOUND', 'HALLUCINATED']:
+        count = confidence_counts.get(level, 0)
+        percentage = (count / total * 100) if total > 0 else 0
+        summary_lines.append(f"  • {level}: {count} ({percentage:.1f}%)")
+
+    pdf.multi_cell(0, 14, "\n".join(summary_lines), markdown=True, new_x='LMARGIN', new_y='NEXT')
+
+
+def _write_citation_table(pdf: FPDF, citations: list[dict]) -> None:
+    """Write one citation table; its header row repeats at the top of every page."""
+    pdf.set_font(FONT_FAMILY, size=8)
+    pdf.set_draw_color(*GRID_GRAY)
+    pdf.set_line_width(0.5)
+
+    headings_style = FontFace(family=FONT_FAMILY, emphasis='', size_pt=9, color=(255, 255, 255), fill_color=HEADER_FILL)
+    with pdf.table(
+        col_widths=COLUMN_WIDTHS,
+        width=sum(COLUMN_WIDTHS),
+        align='LEFT',
+        text_align='LEFT',
+        v_align='TOP',
+        line_height=10,
+        padding=4,
+        markdown=True,
+        headings_style=headings_style,
+        repeat_headings=1,
+    ) as table:
+        header = table.row(v_align='MIDDLE')
+        for heading in TABLE_HEADERS:
+            header.cell(heading, align='CENTER')
+
+        for citation in citations:
+            confidence = citation.get('confidence', '')
+            fill = CONFIDENCE_FILLS.get(confidence, (255, 255, 255))
+            row = table.row(style=FontFace(fill_color=fill))
+            row.cell(_escape_markdown(citation.get('question_id', '')))
+            row.cell(_escape_markdown(citation.get('question_text', '')))
+            row.cell(_escape_markdown(citation.get('answer', '')))
+            row.cell(_source_lines_markdown(citation_source_lines(citation)))
+            row.cell(_escape_markdown(citation_section_display(citation)))
+            row.cell(_escape_markdown(confidence))
+            row.cell(_escape_markdown(citation.get('reasoning', '')))
+
+
+def render_source_report_fpdf(output_stream, citations: list[dict], model_card_id: str = "unknown",
+                              chunk_rows: int = CHUNK_ROWS, generated_at: datetime | None = None) -> None:
+    """Render a citation report PDF with fpdf2.
+
+    Args:
+        output_stream: Binary stream to write the PDF to
+        citations: List of citation dictionaries (pre-validated by citation_schema)
+        model_card_id: Model card identifier for footer and summary (default: "unknown")
+        chunk_rows: Maximum citation rows per table, as in the ReportLab backend;
+                    0 renders every citation in a single table
+        generated_at: Timestamp shown in the report. When given, the output is
+                      deterministic (fixed creation date and file ID)
+    """
+    deterministic = generated_at is not None
+    if generated_at is None:
+        generated_at = datetime.now()
+    timestamp = _format_timestamp(generated_at)
+
+    pdf = _ReportPDF(model_card_id, timestamp)
+    # Regular face doubles as bold, like the ReportLab family (no bold TTF is shipped)
+    pdf.add_font(FONT_FAMILY, '', os.path.join(FONT_DIR, 'DejaVuSans.ttf'))
+    pdf.add_font(FONT_FAMILY, 'B', os.path.join(FONT_DIR, 'DejaVuSans.ttf'))
+    pdf.add_font(FONT_FAMILY, 'I', os.path.join(FONT_DIR, 'DejaVuSans-Oblique.ttf'))
+    pdf.add_font(FONT_FAMILY, 'BI', os.path.join(FONT_DIR, 'DejaVuSans-Oblique.ttf'))
+    pdf.set_producer(f"fpdf2 {FPDF_VERSION}")
+    if deterministic:
+        pdf.set_creation_date(generated_at)
+    pdf.set_margins(PAGE_MARGIN, PAGE_MARGIN, PAGE_MARGIN)
+    pdf.set_auto_page_break(True, margin=BOTTOM_MARGIN)
+    pdf.add_page()
+
+    # Title and subtitle with timestamp
+    pdf.set_font(FONT_FAMILY, size=16)
+    pdf.multi_cell(0, 19.2, "AI Act Compliance - Source Citation Report", new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(12)
+    pdf.set_font(FONT_FAMILY, size=10)
+    pdf.set_text_color(128)
+    pdf.multi_cell(0, 12, f"Generated: {timestamp}", new_x='LMARGIN', new_y='NEXT')
+    pdf.ln(6 + 0.3 * 72)
+
+    _write_executive_summary(pdf, citations, model_card_id, timestamp)
+    pdf.ln(0.3 * 72)
+
+    if chunk_rows <= 0 or len(citations) <= chunk_rows:
+        chunks = [citations]
+    else:
+        chunks = [citations[i:i + chunk_rows] for i in range(0, len(citations), chunk_rows)]
+    for chunk in chunks:
+        _write_citation_table(pdf, chunk)
+
+    output_stream.write(pdf.output())
@@ -0,0 +1,326 @@
+"""Deterministic prefill of compliance answers from Hugging Face Hub metadata.
+
+Some answers can be read straight from a model repository without an LLM:
+
+- `license_link` from the card's YAML `license_link` (or a LICENSE file in the repo)
+- `model_dependencies` from the card's YAML `base_model`
+- `input_modalities_*_check` / `output_modalities_*_check` from the card's `pipeline_tag`
+- `total_model_size` from the tensor shapes in the safetensors file headers
+
+Safetensors headers are read with HTTP range requests: a safetensors file starts
+with an 8-byte little-endian header length followed by a JSON header listing every
+tensor's dtype and shape, so sizing a model needs a few KB per shard instead of the
+weights. The first request speculatively fetches HEADER_PREFETCH_BYTES, which covers
+the whole header of typical shards; larger headers take one more request. Shards are
+read in parallel.
+
+Tensor shapes count stored elements, which is the parameter count for float and
+8-bit weights but not for quantized weights packed into wider integers (e.g. the
+I32 `qweight` tensors of GPTQ/AWQ); the size is not prefilled for such repositories.
+
+Every answer comes with a citation (matching citation_schema.Citation) that quotes
+the metadata it was read from. Citations are DIRECT, except the "no" modality answers,
+which are INFERRED from the pipeline tag not listing that modality. Metadata fields
+of an unexpected type are ignored.
+
+Exports:
+    HF_ENDPOINT: Base URL of the Hub (HF_ENDPOINT environment variable)
+    PIPELINE_MODALITIES: pipeline_tag -> (input modalities, output modalities)
+    PACKED_DTYPES: Safetensors dtypes that hold packed quantized weights
+    repo_file_url: URL of a file in a Hub repository
+    read_safetensors_header: Read a safetensors header with range requests
+    count_safetensors_parameters: Parameter counts per dtype across shards
+    format_parameter_count: Format a count as e.g. 7.24*10^9 parameters
+    prefill_from_hub: Partial compliance answers and citations for a repository
+"""
+
+import json
+import math
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from huggingface_hub.utils import build_hf_headers
+
+
+HF_ENDPOINT = os.getenv("HF_ENDPOINT", "https://huggingface.co").rstrip("/")
+
+# Bytes fetched by the first range request; enough for the whole header of most shards
+HEADER_PREFETCH_BYTES = 100 * 1024
+# Safetensors caps headers at 100 MB; anything larger is not a valid file
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+MAX_SHARD_WORKERS = 16
+REQUEST_TIMEOUT = 15
+
+SAFETENSORS_INDEX = "model.safetensors.index.json"
+LICENSE_FILES = ("LICENSE", "LICENSE.md", "LICENSE.txt", "LICENCE", "LICENCE.md", "LICENCE.txt")
+
+MODALITIES = ("text", "images", "audio", "video")
+
+# Several quantized weights per element: GPTQ/AWQ/EXL2 pack into I32, bitsandbytes 4-bit into U8
+PACKED_DTYPES = frozenset({"I32", "U32", "U8"})
+
+PIPELINE_MODALITIES = {
+    "text-generation": (("text",), ("text",)),
+    "text2text-generation": (("text",), ("text",)),
+    "fill-mask": (("text",), ("text",)),
+    "summarization": (("text",), ("text",)),
+    "translation": (("text",), ("text",)),
+    "question-answering": (("text",), ("text",)),
+    "text-classification": (("text",), ("text",)),
+    "token-classification": (("text",), ("text",)),
+    "image-text-to-text": (("text", "images"), ("text",)),
+    "visual-question-answering": (("text", "images"), ("text",)),
+    "image-to-text": (("images",), ("text",)),
+    "image-classification": (("images",), ("text",)),
+    "text-to-image": (("text",), ("images",)),
+    "image-to-image": (("images",), ("images",)),
+    "automatic-speech-recognition": (("audio",), ("text",)),
+    "audio-text-to-text": (("text", "audio"), ("text",)),
+    "text-to-speech": (("text",), ("audio",)),
+    "text-to-audio": (("text",), ("audio",)),
+    "video-text-to-text": (("text", "video"), ("text",)),
+    "text-to-video": (("text",), ("video",)),
+    "image-to-video": (("text", "images"), ("video",)),
+}
+
+METADATA_SECTION = "Model card metadata (YAML)"
+SAFETENSORS_SECTION = "Safetensors file headers"
+
+
+def repo_file_url(repo_id: str, filename: str, revision: str = "main", endpoint: str | None = None) -> str:
+    """Return the download URL of a file in a Hub model repository."""
+    return f"{endpoint or HF_ENDPOINT}/{repo_id}/resolve/{quote(revision, safe='')}/{quote(filename)}"
+
+
+def _get_range(session: requests.Session, url: str, start: int, end: int) -> bytes:
+    """Fetch bytes start..end (inclusive) of a URL, reading no further even if the server ignores Range."""
+    wanted = end - start + 1
+    with session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        skip = start if response.status_code != 206 else 0
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            if skip:
+                dropped = min(skip, len(chunk))
+                chunk = chunk[dropped:]
+                skip -= dropped
+            data += chunk
+            if len(data) >= wanted:
+                break
+    return bytes(data[:wanted])
+
+
+def read_safetensors_header(url: str, session: requests.Session | None = None) -> dict:
+    """Read the JSON header of a remote safetensors file without downloading its tensors.
+
+    Args:
+        url: URL of the .safetensors file (the server should support HTTP range requests)
+        session: Requests session to use (default: a new one with Hub headers)
+
+    Returns:
+        The parsed header: tensor name -> {"dtype", "shape", "data_offsets"}, plus an
+        optional "__metadata__" entry
+
+    Raises:
+        ValueError: If the file is not a valid safetensors file
+        requests.RequestException: On network errors
+    """
+    session = session or _hub_session()
+    data = _get_range(session, url, 0, HEADER_PREFETCH_BYTES - 1)
+    if len(data) < 8:
+        raise ValueError(f"{url} is not a safetensors file (too short)")
+    (header_length,) = struct.unpack("<Q", data[:8])
+    if header_length > MAX_HEADER_BYTES:
+        raise ValueError(f"{url} is not a safetensors file (header length {header_length})")
+    if len(data) < 8 + header_length:
+        data += _get_range(session, url, len(data), 8 + header_length - 1)
+    if len(data) < 8 + header_length:
+        raise ValueError(f"{url} is not a safetensors file (truncated header)")
+    try:
+        header = json.loads(data[8:8 + header_length])
+    except ValueError as e:
+        raise ValueError(f"{url} has an invalid safetensors header: {e}")
+    if not isinstance(header, dict):
+        raise ValueError(f"{url} has an invalid safetensors header: not a JSON object")
+    return header
+
+
+def _tensor_size(name: str, tensor) -> tuple[str, int]:
+    """Return (dtype, number of elements) of a safetensors header entry."""
+    if not isinstance(tensor, dict) or not isinstance(tensor.get("dtype"), str):
+        raise ValueError(f"Invalid safetensors header entry for tensor '{name}'")
+    shape = tensor.get("shape")
+    if not isinstance(shape, list) or not all(type(n) is int and n >= 0 for n in shape):
+        raise ValueError(f"Invalid shape {shape!r} of tensor '{name}'")
+    return tensor["dtype"], math.prod(shape)
+
+
+def count_safetensors_parameters(urls: list[str], session: requests.Session | None = None,
+                                 max_workers: int = MAX_SHARD_WORKERS) -> dict[str, int]:
+    """Count the parameters of all tensors in a set of safetensors shards.
+
+    Args:
+        urls: URLs of the shards
+        session: Requests session to use (default: a new one with Hub headers)
+        max_workers: Maximum number of shards read in parallel
+
+    Returns:
+        dtype -> number of parameters stored with that dtype
+
+    Raises:
+        ValueError: If a header is invalid
+        requests.RequestException: On network errors
+    """
+    session = session or _hub_session()
+    counts: dict[str, int] = {}
+    if not urls:
+        return counts
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        for header in executor.map(lambda url: read_safetensors_header(url, session), urls):
+            for name, tensor in header.items():
+                if name == "__metadata__":
+                    continue
+                dtype, size = _tensor_size(name, tensor)
+                counts[dtype] = counts.get(dtype, 0) + size
+    return counts
+
+
+def _hub_session() -> requests.Session:
+    """Requests session sending the Hub user agent and token (if configured)."""
+    session = requests.Session()
+    session.headers.update(build_hf_headers())
+    return session
+
+
+def _weight_shards(repo_id: str, files: list[str], session: requests.Session, revision: str, endpoint: str | None) -> list[str]:
+    """Return the safetensors files holding the model weights.
+
+    Uses the shard index when there is one (repos may also carry e.g. a consolidated copy
+    of the same weights); otherwise the top-level .safetensors files, excluding adapters.
+    """
+    if SAFETENSORS_INDEX in files:
+        response = session.get(repo_file_url(repo_id, SAFETENSORS_INDEX, revision, endpoint), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        weight_map = response.json().get("weight_map")
+        if not isinstance(weight_map, dict) or not all(isinstance(f, str) for f in weight_map.values()):
+            raise ValueError(f"{SAFETENSORS_INDEX} has no valid weight_map")
+        return sorted(set(weight_map.values()))
+    return sorted(
+        f for f in files
+        if f.endswith(".safetensors") and "/" not in f and not f.startswith("adapter_")
+    )
+
+
+def format_parameter_count(count: int) -> str:
+    """Format a parameter count with three significant figures, e.g. 7.24*10^9 parameters."""
+    exponent = int(math.floor(math.log10(count))) if count > 0 else 0
+    return f"{count / 10 ** exponent:.2f}*10^{exponent} parameters"
+
+
+def _citation(question_id: str, question_text: str, answer: str, quote_text: str, section: str,
+              document: str, reasoning: str, confidence: str = "DIRECT") -> dict:
+    """Build a citation dict in the citation_schema.Citation format."""
+    return {
+        "question_id": question_id,
+        "question_text": question_text,
+        "answer": answer,
+        "source_quote": quote_text,
+        "source_section": section,
+        "source_document": document,
+        "confidence": confidence,
+        "reasoning": reasoning,
+    }
+
+
+def prefill_from_hub(repo_id: str, card_data: dict, files: list[str], question_texts: dict[str, str],
+                     revision: str = "main", endpoint: str | None = None,
+                     session: requests.Session | None = None) -> dict:
+    """Read the answers that follow from a repository's metadata and weight headers.
+
+    Args:
+        repo_id: Hub model id (e.g. "org/model")
+        card_data: The model card's YAML metadata (ModelCard.data.to_dict())
+        files: Files in the repository (list_repo_files)
+        question_texts: Question id -> question text; only these ids are prefilled
+        revision: Repository revision to read weights from
+        endpoint: Hub base URL (default: HF_ENDPOINT)
+        session: Requests session to use (default: a new one with Hub headers)
+
+    Returns:
+        {"answers": {question id: answer}, "citations": [citation dicts], "errors": [str]}.
+        Reading the weight headers is best effort; failures are listed in "errors".
+    """
+    if not isinstance(card_data, dict):
+        card_data = {}
+    endpoint = endpoint or HF_ENDPOINT
+    repo_url = f"{endpoint}/{repo_id}"
+    session = session or _hub_session()
+    answers = {}
+    citations = []
+    errors = []
+
+    def add(question_id, answer, quote_text, section, document, reasoning, confidence="DIRECT"):
+        if question_id not in question_texts:
+            return
+        answers[question_id] = answer
+        citations.append(_citation(question_id, question_texts[question_id], answer, quote_text, section,
+                                   document, reasoning, confidence))
+
+    # License link: explicit metadata, else a license file in the repository
+    license_link = card_data.get("license_link")
+    if isinstance(license_link, str) and license_link.strip():
+        license_link = license_link.strip()
+        link = license_link if "://" in license_link else f"{repo_url}/blob/{revision}/{license_link.lstrip('/')}"
+        add("license_link", link, f"license_link: {license_link}", METADATA_SECTION, repo_url,
+            "Read from the license_link field of the model card metadata.")
+    else:
+        license_file = next((f for f in LICENSE_FILES if f in files), None)
+        if license_file:
+            add("license_link", f"{repo_url}/blob/{revision}/{license_file}", f"Repository file: {license_file}",
+                "Repository files", repo_url, "The repository contains a license file.")
+
+    # Base models the model was fine-tuned or otherwise derived from
+    base_model = card_data.get("base_model")
+    base_models = [base_model] if isinstance(base_model, str) else base_model
+    if base_models and isinstance(base_models, list) and all(isinstance(m, str) and m for m in base_models):
+        add("model_dependencies", ", ".join(base_models), f"base_model: {json.dumps(base_model)}",
+            METADATA_SECTION, repo_url, "Read from the base_model field of the model card metadata.")
+
+    # Modalities implied by the pipeline tag
+    pipeline_tag = card_data.get("pipeline_tag")
+    if isinstance(pipeline_tag, str) and pipeline_tag in PIPELINE_MODALITIES:
+        for direction, used in zip(("input", "output"), PIPELINE_MODALITIES[pipeline_tag]):
+            for modality in MODALITIES:
+                if modality in used:
+                    add(f"{direction}_modalities_{modality}_check", "yes", f"pipeline_tag: {pipeline_tag}",
+                        METADATA_SECTION, repo_url,
+                        f"The {pipeline_tag} pipeline takes {', '.join(PIPELINE_MODALITIES[pipeline_tag][0])} "
+                        f"as input and produces {', '.join(PIPELINE_MODALITIES[pipeline_tag][1])}.")
+                else:
+                    add(f"{direction}_modalities_{modality}_check", "no", f"pipeline_tag: {pipeline_tag}",
+                        METADATA_SECTION, repo_url,
+                        f"The {pipeline_tag} pipeline does not use {modality} as {direction}.", "INFERRED")
+
+    # Parameter count from the tensor shapes in the safetensors headers
+    if "total_model_size" in question_texts:
+        try:
+            shards = _weight_shards(repo_id, files, session, revision, endpoint)
+            counts = count_safetensors_parameters([repo_file_url(repo_id, f, revision, endpoint) for f in shards], session)
+            total = sum(counts.values())
+            packed = sorted(PACKED_DTYPES & counts.keys())
+            if packed:
+                errors.append(f"Not counting parameters: the weights contain packed quantized tensors "
+                              f"({', '.join(packed)}), whose shapes don't give the parameter count")
+            elif total:
+                by_dtype = ", ".join(f"{dtype}: {count:,}" for dtype, count in sorted(counts.items()))
+                add("total_model_size", format_parameter_count(total),
+                    f"{total:,} parameters in {len(shards)} safetensors file(s) ({by_dtype})",
+                    SAFETENSORS_SECTION, repo_url,
+                    "Sum of the tensor shapes listed in the safetensors headers of the model weights.")
+        except (requests.RequestException, ValueError, KeyError) as e:
+            errors.append(f"Could not read safetensors headers: {e}")
+
+    return {"answers": answers, "citations": citations, "errors": errors}
@@ -3,14 +3,28 @@
 This module provides pure functions for generating PDF reports from citation data.
 All text rendering uses Unicode-compatible DejaVu Sans font to handle smart quotes,
 accented characters, and other special characters. Tables auto-wrap long text and
-repeat headers on multi-page reports.
+repeat headers on multi-page reports. Large reports are split into several
+tables of at most CHUNK_ROWS rows each, which keeps ReportLab's table layout
+and page splitting linear in the number of citations.
+
+Passing `generated_at` makes a report deterministic: the same citations,
+model card id and timestamp always produce byte-identical PDFs (fixed document
+metadata and file ID), so rendered reports can be cached by content hash.
+
+Rendering is pluggable: `generate_source_report_pdf` dispatches to a backend
+renderer, either the ReportLab implementation in this module or the lighter
+fpdf2 one in fpdf_renderer. Both produce the same layout.
 
 Exports:
     generate_source_report_pdf: Function to generate a PDF citation report
+    get_pdf_renderer: Look up the render function of a backend
+    write_source_report_pdf: Render a report straight to a file (process pool entry point)
+    PDF_BACKENDS: Names of the available backends
 """
 
 import os
 import html
+import threading
 from io import BytesIO
 from datetime import datetime
 
@@ -18,16 +32,16 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.styles import ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, LongTable, Table, TableStyle, Paragraph, Spacer
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
 
-# Register DejaVu Sans font at module load
+# DejaVu Sans is registered on first render (see _ensure_fonts_registered), so
+# processes that never render a PDF don't pay for loading the TTF files
 FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
-pdfmetrics.registerFont(TTFont('DejaVuSans', os.path.join(FONT_DIR, 'DejaVuSans.ttf')))
-pdfmetrics.registerFont(TTFont('DejaVuSans-Oblique', os.path.join(FONT_DIR, 'DejaVuSans-Oblique.ttf')))
-pdfmetrics.registerFontFamily('DejaVuSans', normal='DejaVuSans', italic='DejaVuSans-Oblique')
+_fonts_registered = False
+_font_lock = threading.Lock()
 
 # WCAG AA compliant confidence level colors (4.5:1+ contrast with black text)
 CONFIDENCE_COLORS = {
@@ -38,6 +52,109 @@ CONFIDENCE_COLORS = {
     'HALLUCINATED': colors.HexColor('#FF0000')  # Pure red
 }
 
+# Paragraph styles, built once and shared by every report (styles are read-only during rendering)
+TITLE_STYLE = ParagraphStyle(
+    'TitleStyle',
+    fontName='DejaVuSans',
+    fontSize=16,
+    spaceAfter=12
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'SubtitleStyle',
+    fontName='DejaVuSans',
+    fontSize=10,
+    spaceAfter=6,
+    textColor=colors.grey
+)
+
+CELL_TEXT_STYLE = ParagraphStyle(
+    'CellText',
+    fontName='DejaVuSans',
+    fontSize=8,
+    leading=10
+)
+
+HEADER_TEXT_STYLE = ParagraphStyle(
+    'HeaderText',
+    fontName='DejaVuSans',
+    fontSize=9,
+    textColor=colors.white
+)
+
+SUMMARY_HEADER_STYLE = ParagraphStyle(
+    'SummaryHeader',
+    fontName='DejaVuSans',
+    fontSize=14,
+    spaceAfter=8
+)
+
+SUMMARY_BODY_STYLE = ParagraphStyle(
+    'SummaryBody',
+    fontName='DejaVuSans',
+    fontSize=10,
+    leading=14
+)
+
+# Rendering backends (see get_pdf_renderer)
+PDF_BACKENDS = ('reportlab', 'fpdf2')
+DEFAULT_PDF_BACKEND = 'reportlab'
+
+# Maximum citation rows per table; larger reports are rendered as several tables
+CHUNK_ROWS = 100
+
+# Citation table column headers and widths
+TABLE_HEADERS = ['#', 'Question', 'Answer', 'Source/Details', 'Section', 'Confidence', 'Reasoning']
+COLUMN_WIDTHS = [
+    0.7 * inch,   # #
+    1.2 * inch,   # Question
+    1.3 * inch,   # Answer
+    1.55 * inch,  # Source/Details
+    0.8 * inch,   # Section (widened to prevent header wrapping)
+    1.0 * inch,   # Confidence (widened to prevent header wrapping)
+    0.95 * inch,  # Reasoning
+]
+
+# Base style shared by every citation table
+BASE_TABLE_STYLE = [
+    # Header row styling
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A5568')),  # Dark grey
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+
+    # Data rows styling
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+    ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
+
+    # Grid lines
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+
+    # Padding
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+]
+
+
+def _ensure_fonts_registered() -> None:
+    """Register the DejaVu Sans font family with ReportLab, once per process.
+
+    Safe to call from several threads; only the first call loads the TTF files.
+    """
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    with _font_lock:
+        if _fonts_registered:
+            return
+        pdfmetrics.registerFont(TTFont('DejaVuSans', os.path.join(FONT_DIR, 'DejaVuSans.ttf')))
+        pdfmetrics.registerFont(TTFont('DejaVuSans-Oblique', os.path.join(FONT_DIR, 'DejaVuSans-Oblique.ttf')))
+        pdfmetrics.registerFontFamily('DejaVuSans', normal='DejaVuSans', italic='DejaVuSans-Oblique')
+        _fonts_registered = True
+
 
 def _escape_xml(text: str) -> str:
     """Escape XML special characters in text before embedding in Paragraph markup.
@@ -51,11 +168,17 @@ def _escape_xml(text: str) -> str:
     return html.escape(text)
 
 
-def _create_footer_callback(model_card_id: str):
+def _format_timestamp(generated_at: datetime | None) -> str:
+    """Format the report timestamp shown in the title, summary and footer (now if None)."""
+    return (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M')
+
+
+def _create_footer_callback(model_card_id: str, generated_at: datetime | None = None):
     """Create a footer callback function for PDF pages.
 
     Args:
         model_card_id: Model card identifier to display in footer
+        generated_at: Report timestamp to display (default: current time)
 
     Returns:
         Callback function with signature (canvas, doc) for use with doc.build()
@@ -72,7 +195,7 @@ def _create_footer_callback(model_card_id: str):
         canvas.drawString(0.5 * inch, 0.3 * inch, f"Model Card: {model_card_id}")
 
         # Right side: Timestamp and page number
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+        timestamp = _format_timestamp(generated_at)
         right_text = f"Generated: {timestamp} | Page {doc.page}"
         canvas.drawRightString(doc.pagesize[0] - 0.5 * inch, 0.3 * inch, right_text)
 
@@ -81,42 +204,28 @@ def _create_footer_callback(model_card_id: str):
     return footer_callback
 
 
-def _build_executive_summary(citations: list[dict], model_card_id: str):
+def _build_executive_summary(citations: list[dict], model_card_id: str, generated_at: datetime | None = None):
     """Build executive summary flowables showing confidence breakdown.
 
     Args:
         citations: List of citation dictionaries
         model_card_id: Model card identifier string
+        generated_at: Report timestamp to display (default: current time)
 
     Returns:
         List of flowables (Paragraphs and Spacers) for executive summary section
     """
     from collections import Counter
 
-    # Define styles for summary
-    summary_header_style = ParagraphStyle(
-        'SummaryHeader',
-        fontName='DejaVuSans',
-        fontSize=14,
-        spaceAfter=8
-    )
-
-    summary_body_style = ParagraphStyle(
-        'SummaryBody',
-        fontName='DejaVuSans',
-        fontSize=10,
-        leading=14
-    )
-
     flowables = []
 
     # Add header
-    flowables.append(Paragraph("Executive Summary", summary_header_style))
+    flowables.append(Paragraph("Executive Summary", SUMMARY_HEADER_STYLE))
     flowables.append(Spacer(1, 0.1 * inch))
 
     # Handle zero citations
     if not citations:
-        flowables.append(Paragraph("No citations provided.", summary_body_style))
+        flowables.append(Paragraph("No citations provided.", SUMMARY_BODY_STYLE))
         return flowables
 
     # Count confidence levels
@@ -124,7 +233,7 @@ def _build_executive_summary(citations: list[dict], model_card_id: str):
     total = len(citations)
 
     # Build summary text
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+    timestamp = _format_timestamp(generated_at)
 
     summary_lines = [
         f"<b>Model Card:</b> {_escape_xml(model_card_id)}",
@@ -141,12 +250,142 @@ def _build_executive_summary(citations: list[dict], model_card_id: str):
         summary_lines.append(f"  • {level}: {count} ({percentage:.1f}%)")
 
     summary_text = "<br/>".join(summary_lines)
-    flowables.append(Paragraph(summary_text, summary_body_style))
+    flowables.append(Paragraph(summary_text, SUMMARY_BODY_STYLE))
 
     return flowables
 
 
-def generate_source_report_pdf(output_stream: BytesIO, citations: list[dict], model_card_id: str = "unknown") -> None:
+def citation_source_lines(citation: dict) -> list[list[tuple[str, str]]]:
+    """Build the Source/Details column of a citation, independent of the PDF backend.
+
+    Args:
+        citation: Citation dictionary
+
+    Returns:
+        Lines of (emphasis, text) segments, where emphasis is '' (plain), 'i' (italic)
+        or 'b' (bold). An empty list is a blank line. Text is not escaped.
+    """
+    confidence = citation.get('confidence', '')
+    source_quote = citation.get('source_quote', '')
+    source_section = citation.get('source_section', '')
+    source_document = citation.get('source_document', '')
+    reasoning = citation.get('reasoning', '')
+
+    # Format Source/Details column based on confidence level
+    if confidence == 'DIRECT':
+        # Build source details with optional document line
+        lines = [[('i', source_quote)]]
+        if source_document:
+            lines.append([('', f"Document: {source_document}")])
+        lines.append([('', f"Section: {source_section}")])
+    elif confidence == 'INFERRED':
+        lines = [[('', "Related: "), ('i', source_quote)]]
+        if source_document:
+            lines.append([('', f"Document: {source_document}")])
+        lines.append([('', f"Section: {source_section}")])
+        lines.append([('', f"Reasoning: {reasoning}")])
+    elif confidence == 'DEFAULT':
+        lines = [[('', "Standard value applied.")], [], [('', f"Rationale: {reasoning}")]]
+    elif confidence == 'NOT FOUND':
+        lines = [[('', "Information not found.")], [], [('', f"Searched: {reasoning}")]]
+    elif confidence == 'HALLUCINATED':
+        lines = [[('b', "WARNING: No supporting source found.")], [], [('', f"Reasoning: {reasoning}")]]
+    else:
+        # Fallback for unknown confidence levels
+        lines = [[('', source_quote)]]
+    return lines
+
+
+def citation_section_display(citation: dict) -> str:
+    """Return the Section column text (dash for DEFAULT/NOT FOUND/HALLUCINATED)."""
+    if citation.get('confidence', '') in ['DEFAULT', 'NOT FOUND', 'HALLUCINATED']:
+        return '-'
+    return citation.get('source_section', '')
+
+
+def _source_lines_markup(lines: list[list[tuple[str, str]]]) -> str:
+    """Render citation_source_lines() output as ReportLab Paragraph markup."""
+    tags = {'i': ('<i>', '</i>'), 'b': ('<b>', '</b>'), '': ('', '')}
+    return "<br/>".join(
+        "".join(f"{tags[emphasis][0]}{_escape_xml(text)}{tags[emphasis][1]}" for emphasis, text in line)
+        for line in lines
+    )
+
+
+def _format_citation_row(citation: dict, cell_text_style: ParagraphStyle) -> list:
+    """Build the table row for one citation.
+
+    Args:
+        citation: Citation dictionary
+        cell_text_style: Paragraph style for the cell text
+
+    Returns:
+        List of Paragraphs, one per column
+    """
+    return [
+        Paragraph(_escape_xml(citation.get('question_id', '')), cell_text_style),
+        Paragraph(_escape_xml(citation.get('question_text', '')), cell_text_style),
+        Paragraph(_escape_xml(citation.get('answer', '')), cell_text_style),
+        Paragraph(_source_lines_markup(citation_source_lines(citation)), cell_text_style),
+        Paragraph(_escape_xml(citation_section_display(citation)), cell_text_style),
+        Paragraph(_escape_xml(citation.get('confidence', '')), cell_text_style),
+        Paragraph(_escape_xml(citation.get('reasoning', '')), cell_text_style),
+    ]
+
+
+def _confidence_style_commands(citations: list[dict]) -> list[tuple]:
+    """Build row background commands, one per run of consecutive rows with the same confidence.
+
+    Args:
+        citations: Citations in table order (table row = index + 1, after the header)
+
+    Returns:
+        List of BACKGROUND style commands
+    """
+    commands = []
+    run_start = 0
+    for idx in range(1, len(citations) + 1):
+        confidence = citations[run_start].get('confidence', '')
+        if idx < len(citations) and citations[idx].get('confidence', '') == confidence:
+            continue
+        if confidence in CONFIDENCE_COLORS:
+            commands.append(('BACKGROUND', (0, run_start + 1), (-1, idx), CONFIDENCE_COLORS[confidence]))
+        run_start = idx
+    return commands
+
+
+def _build_citation_tables(citations: list[dict], header_row: list, cell_text_style: ParagraphStyle,
+                           chunk_rows: int = CHUNK_ROWS) -> list:
+    """Build the citation table flowables, splitting large reports into chunks.
+
+    Args:
+        citations: List of citation dictionaries
+        header_row: Header Paragraphs repeated at the top of each table (and page)
+        cell_text_style: Paragraph style for the cell text
+        chunk_rows: Maximum citation rows per table; 0 puts every citation in one table
+
+    Returns:
+        List of table flowables
+    """
+    if chunk_rows <= 0 or len(citations) <= chunk_rows:
+        chunks = [citations]
+        table_class = Table
+    else:
+        chunks = [citations[i:i + chunk_rows] for i in range(0, len(citations), chunk_rows)]
+        table_class = LongTable
+
+    tables = []
+    for chunk in chunks:
+        table_data = [header_row] + [_format_citation_row(c, cell_text_style) for c in chunk]
+        table = table_class(table_data, colWidths=COLUMN_WIDTHS, repeatRows=1, splitByRow=True)
+        table.setStyle(TableStyle(BASE_TABLE_STYLE + _confidence_style_commands(chunk)))
+        tables.append(table)
+    return tables
+
+
+def generate_source_report_pdf(output_stream: BytesIO, citations: list[dict], model_card_id: str = "unknown",
+                               chunk_rows: int = CHUNK_ROWS, generated_at: datetime | None = None,
+                               backend: str = DEFAULT_PDF_BACKEND) -> None:
     """Generate a PDF citation report from validated citation data.
 
     This function creates a multi-page PDF with a title, timestamp, executive summary,
@@ -159,6 +398,16 @@ def generate_source_report_pdf(output_stream: BytesIO, citations: list[dict], mo
                    Each citation should have: question_id, question_text, answer,
                    source_quote, source_section, confidence, reasoning
         model_card_id: Model card identifier for footer and summary (default: "unknown")
+        chunk_rows: Maximum citation rows per table (default: CHUNK_ROWS). Reports with
+                    more citations are rendered as consecutive tables of this size;
+                    0 renders every citation in a single table.
+        generated_at: Timestamp shown in the title, summary and footers. When given, the
+                      output is deterministic (invariant PDF metadata and file ID);
+                      when None, the current time is used.
+        backend: Rendering backend, one of PDF_BACKENDS (default: "reportlab")
+
+    Raises:
+        ValueError: If the backend is unknown
 
     Returns:
         None. The PDF is written to output_stream. Caller is responsible for
@@ -175,6 +424,53 @@ def generate_source_report_pdf(output_stream: BytesIO, citations: list[dict], mo
         >>> buf.seek(0)
         >>> pdf_bytes = buf.read()
     """
+    renderer = get_pdf_renderer(backend)
+    renderer(output_stream, citations, model_card_id, chunk_rows, generated_at)
+
+
+def write_source_report_pdf(output_path: str, citations: list[dict], model_card_id: str = "unknown",
+                            generated_at: datetime | None = None, backend: str = DEFAULT_PDF_BACKEND) -> None:
+    """Render a citation report to a file.
+
+    Module-level and picklable, so reports can be rendered on a process pool.
+
+    Args:
+        output_path: Path of the PDF file to write
+        citations: List of citation dictionaries (pre-validated by citation_schema)
+        model_card_id: Model card identifier for footer and summary (default: "unknown")
+        generated_at: Timestamp shown in the report (see generate_source_report_pdf)
+        backend: Rendering backend, one of PDF_BACKENDS (default: "reportlab")
+    """
+    with open(output_path, 'wb') as f:
+        generate_source_report_pdf(f, citations, model_card_id=model_card_id, generated_at=generated_at, backend=backend)
+
+def get_pdf_renderer(backend: str = DEFAULT_PDF_BACKEND):
+    """Return the render function of a PDF backend.
+
+    Render functions take (output_stream, citations, model_card_id, chunk_rows, generated_at)
+    and write a complete PDF to output_stream.
+
+    Args:
+        backend: Backend name, one of PDF_BACKENDS
+
+    Returns:
+        The backend's render function
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == 'reportlab':
+        return render_source_report_reportlab
+    if backend == 'fpdf2':
+        # Imported on first use; fpdf_renderer builds on this module's helpers
+        from fpdf_renderer import render_source_report_fpdf
+        return render_source_report_fpdf
+    raise ValueError(f"Unknown PDF backend '{backend}'. Use one of: {', '.join(PDF_BACKENDS)}")
+
+
+def render_source_report_reportlab(output_stream, citations: list[dict], model_card_id: str = "unknown",
+                                   chunk_rows: int = CHUNK_ROWS, generated_at: datetime | None = None) -> None:
+    """Render a citation report PDF with ReportLab platypus (see generate_source_report_pdf)."""
     # Create document with margins (increased bottom margin for footer)
     doc = SimpleDocTemplate(
         output_stream,
@@ -182,166 +478,40 @@ def generate_source_report_pdf(output_stream: BytesIO, citations: list[dict], mo
         topMargin=0.5 * inch,
         bottomMargin=0.75 * inch,
         leftMargin=0.5 * inch,
-        rightMargin=0.5 * inch
+        rightMargin=0.5 * inch,
+        # Fixed creation date and content-derived file ID for reproducible output
+        invariant=1 if generated_at is not None else None
     )
 
-    # Define paragraph styles using DejaVu Sans font
-    title_style = ParagraphStyle(
-        'TitleStyle',
-        fontName='DejaVuSans',
-        fontSize=16,
-        spaceAfter=12
-    )
-
-    subtitle_style = ParagraphStyle(
-        'SubtitleStyle',
-        fontName='DejaVuSans',
-        fontSize=10,
-        spaceAfter=6,
-        textColor=colors.grey
-    )
-
-    cell_text_style = ParagraphStyle(
-        'CellText',
-        fontName='DejaVuSans',
-        fontSize=8,
-        leading=10
-    )
-
-    header_text_style = ParagraphStyle(
-        'HeaderText',
-        fontName='DejaVuSans',
-        fontSize=9,
-        textColor=colors.white
-    )
+    # Fonts are registered on the first report rendered by this process
+    _ensure_fonts_registered()
 
     # Build story (list of flowables)
     story = []
 
     # Add title
-    story.append(Paragraph("AI Act Compliance - Source Citation Report", title_style))
+    story.append(Paragraph("AI Act Compliance - Source Citation Report", TITLE_STYLE))
 
-    # Add subtitle with timestamp
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    story.append(Paragraph(f"Generated: {timestamp}", subtitle_style))
+    # Add subtitle with timestamp (one timestamp for the whole report)
+    if generated_at is None:
+        generated_at = datetime.now()
+    timestamp = _format_timestamp(generated_at)
+    story.append(Paragraph(f"Generated: {timestamp}", SUBTITLE_STYLE))
 
     # Add spacer
     story.append(Spacer(1, 0.3 * inch))
 
     # Add executive summary
-    summary_flowables = _build_executive_summary(citations, model_card_id)
+    summary_flowables = _build_executive_summary(citations, model_card_id, generated_at)
     story.extend(summary_flowables)
 
     # Add spacer before table
     story.append(Spacer(1, 0.3 * inch))
 
-    # Build table data
-    # Header row - updated to reflect new content structure
-    headers = ['#', 'Question', 'Answer', 'Source/Details', 'Section', 'Confidence', 'Reasoning']
-    header_row = [Paragraph(_escape_xml(h), header_text_style) for h in headers]
-
-    # Data rows
-    table_data = [header_row]
-    for citation in citations:
-        confidence = citation.get('confidence', '')
-        question_id = citation.get('question_id', '')
-        question_text = citation.get('question_text', '')
-        answer = citation.get('answer', '')
-        source_quote = citation.get('source_quote', '')
-        source_section = citation.get('source_section', '')
-        source_document = citation.get('source_document', '')
-        reasoning = citation.get('reasoning', '')
-
-        # Format Source/Details column based on confidence level
-        if confidence == 'DIRECT':
-            # Build source details with optional document line
-            source_parts = [f"<i>{_escape_xml(source_quote)}</i>"]
-            if source_document:
-                source_parts.append(f"Document: {_escape_xml(source_document)}")
-            source_parts.append(f"Section: {_escape_xml(source_section)}")
-            source_details = "<br/>".join(source_parts)
-        elif confidence == 'INFERRED':
-            source_parts = [f"Related: <i>{_escape_xml(source_quote)}</i>"]
-            if source_document:
-                source_parts.append(f"Document: {_escape_xml(source_document)}")
-            source_parts.append(f"Section: {_escape_xml(source_section)}")
-            source_parts.append(f"Reasoning: {_escape_xml(reasoning)}")
-            source_details = "<br/>".join(source_parts)
-        elif confidence == 'DEFAULT':
-            source_details = f"Standard value applied.<br/><br/>Rationale: {_escape_xml(reasoning)}"
-        elif confidence == 'NOT FOUND':
-            source_details = f"Information not found.<br/><br/>Searched: {_escape_xml(reasoning)}"
-        elif confidence == 'HALLUCINATED':
-            source_details = f"<b>WARNING: No supporting source found.</b><br/><br/>Reasoning: {_escape_xml(reasoning)}"
-        else:
-            # Fallback for unknown confidence levels
-            source_details = _escape_xml(source_quote)
-
-        # Format section column (dash for DEFAULT/NOT FOUND/HALLUCINATED)
-        if confidence in ['DEFAULT', 'NOT FOUND', 'HALLUCINATED']:
-            section_display = '-'
-        else:
-            section_display = source_section
-
-        row = [
-            Paragraph(_escape_xml(question_id), cell_text_style),
-            Paragraph(_escape_xml(question_text), cell_text_style),
-            Paragraph(_escape_xml(answer), cell_text_style),
-            Paragraph(source_details, cell_text_style),
-            Paragraph(_escape_xml(section_display), cell_text_style),
-            Paragraph(_escape_xml(confidence), cell_text_style),
-            Paragraph(_escape_xml(reasoning), cell_text_style),
-        ]
-        table_data.append(row)
-
-    # Create table with column widths
-    col_widths = [
-        0.7 * inch,   # #
-        1.2 * inch,   # Question
-        1.3 * inch,   # Answer
-        1.55 * inch,  # Source/Details
-        0.8 * inch,   # Section (widened to prevent header wrapping)
-        1.0 * inch,   # Confidence (widened to prevent header wrapping)
-        0.95 * inch,  # Reasoning
-    ]
-
-    table = Table(table_data, colWidths=col_widths, repeatRows=1, splitByRow=True)
-
-    # Apply base table style
-    style_commands = [
-        # Header row styling
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4A5568')),  # Dark grey
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-
-        # Data rows styling
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-        ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-
-        # Grid lines
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-
-        # Padding
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]
-
-    # Apply confidence-based row colors
-    for idx, citation in enumerate(citations, start=1):
-        confidence = citation.get('confidence', '')
-        if confidence in CONFIDENCE_COLORS:
-            bg_color = CONFIDENCE_COLORS[confidence]
-            # Row index in table_data is idx (because header is row 0)
-            style_commands.append(('BACKGROUND', (0, idx), (-1, idx), bg_color))
-
-    table.setStyle(TableStyle(style_commands))
-
-    story.append(table)
+    # Add citation table(s); header rows repeat on every page of each table
+    header_row = [Paragraph(_escape_xml(h), HEADER_TEXT_STYLE) for h in TABLE_HEADERS]
+    story.extend(_build_citation_tables(citations, header_row, CELL_TEXT_STYLE, chunk_rows))
 
     # Create footer callback and build PDF
-    footer_fn = _create_footer_callback(model_card_id)
+    footer_fn = _create_footer_callback(model_card_id, generated_at)
     doc.build(story, onFirstPage=footer_fn, onLaterPages=footer_fn)
@@ -0,0 +1,155 @@
+"""In-memory cache of the compliance questions schema (questions.json).
+
+The schema is parsed once into an immutable QuestionSchema and shared by every
+tool and resource that needs it. Each lookup only stats the file: it is
+re-read when its mtime changes, so edits to questions.json are still picked up
+without a restart.
+
+Exports:
+    QUESTIONS_PATH: Default location of the questions file
+    QUESTION_ENCODINGS: Encodings supported by encode_questions
+    QuestionSchema: Parsed, immutable view of the questions
+    get_question_schema: Cached schema lookup with mtime-based reload
+    encode_questions: Cached, optionally filtered and compact, schema text
+"""
+
+import functools
+import json
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+QUESTIONS_PATH = "questions.json"
+
+# Section for questions without a `section` field
+DEFAULT_SECTION = "General"
+
+# full: the file as stored; minified: all fields without whitespace; compact: id and
+# question only; grouped: id -> question, grouped by section
+QUESTION_ENCODINGS = ("full", "minified", "compact", "grouped")
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+@dataclass(frozen=True, eq=False)
+class QuestionSchema:
+    """Immutable view of one version of questions.json.
+
+    Attributes:
+        text: File content exactly as stored (what the prompts embed)
+        questions: Parsed entries as read-only mappings, in file order
+        ids: Question ids in file order
+        id_set: Question ids as a set, for membership checks
+        by_audience: Audience code -> ids of its questions, in file order
+        sections: Section name -> ids of its questions, in order of first appearance
+
+    Instances compare and hash by identity, so they can key caches of values
+    derived from one version of the file.
+    """
+    text: str
+    questions: tuple
+    ids: tuple
+    id_set: frozenset
+    by_audience: MappingProxyType
+    sections: MappingProxyType
+
+    @classmethod
+    def from_json(cls, text: str) -> "QuestionSchema":
+        """Parse the content of a questions file.
+
+        Raises:
+            ValueError: If it isn't a JSON array of objects with an `id`
+        """
+        entries = json.loads(text)
+        if not isinstance(entries, list) or not all(isinstance(q, dict) and "id" in q for q in entries):
+            raise ValueError("questions.json must be a JSON array of objects with an 'id'")
+
+        questions = tuple(MappingProxyType(dict(q)) for q in entries)
+        ids = tuple(q["id"] for q in questions)
+        by_audience = {}
+        sections = {}
+        for q in questions:
+            for audience in q.get("audience", []):
+                by_audience.setdefault(audience, []).append(q["id"])
+            sections.setdefault(q.get("section", DEFAULT_SECTION), []).append(q["id"])
+        return cls(
+            text=text,
+            questions=questions,
+            ids=ids,
+            id_set=frozenset(ids),
+            by_audience=MappingProxyType({audience: tuple(members) for audience, members in by_audience.items()}),
+            sections=MappingProxyType({section: tuple(members) for section, members in sections.items()}),
+        )
+
+
+_schemas: dict[str, tuple[float, QuestionSchema]] = {}
+_schemas_lock = threading.Lock()
+
+
+def get_question_schema(path: str = QUESTIONS_PATH) -> QuestionSchema:
+    """Return the parsed questions file, re-reading it only when its mtime changed.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file isn't a valid questions schema
+    """
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+
+    with _schemas_lock:
+        cached = _schemas.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r") as f:
+        schema = QuestionSchema.from_json(f.read())
+    with _schemas_lock:
+        _schemas[path] = (mtime, schema)
+    return schema
+
+
+@functools.lru_cache(maxsize=64)
+def encode_questions(schema: QuestionSchema, encoding: str = "full", audiences: tuple = (),
+                     section: str | None = None) -> str:
+    """Return the questions as text for a prompt, computed once per schema version and arguments.
+
+    Args:
+        schema: Questions schema
+        encoding: One of QUESTION_ENCODINGS
+        audiences: Only include questions addressed to at least one of these audience
+                   codes; empty includes all questions
+        section: Only include questions of this section; None includes all sections
+
+    Returns:
+        The encoded questions. "full" without filters is the file text verbatim;
+        filtered "full" output is re-serialized with the file's indentation.
+
+    Raises:
+        ValueError: If the encoding or section is unknown
+    """
+    if encoding not in QUESTION_ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}'. Use one of: {', '.join(QUESTION_ENCODINGS)}")
+    if section is not None and section not in schema.sections:
+        raise ValueError(f"Unknown section '{section}'. Sections: {', '.join(schema.sections)}")
+    if encoding == "full" and not audiences and section is None:
+        return schema.text
+
+    selected = [
+        q for q in schema.questions
+        if (not audiences or not set(audiences).isdisjoint(q.get("audience", [])))
+        and (section is None or q.get("section", DEFAULT_SECTION) == section)
+    ]
+    if encoding == "full":
+        return json.dumps([dict(q) for q in selected], indent=4, ensure_ascii=False)
+    if encoding == "minified":
+        return json.dumps([dict(q) for q in selected], separators=COMPACT_SEPARATORS, ensure_ascii=False)
+    if encoding == "compact":
+        return json.dumps([{"id": q["id"], "question": q.get("question", "")} for q in selected],
+                          separators=COMPACT_SEPARATORS, ensure_ascii=False)
+
+    grouped = {}
+    for q in selected:
+        grouped.setdefault(q.get("section", DEFAULT_SECTION), {})[q["id"]] = q.get("question", "")
+    return json.dumps(grouped, separators=COMPACT_SEPARATORS, ensure_ascii=False)
@@ -0,0 +1,156 @@
+"""Verification of citation quotes against the source texts the server fetched.
+
+Every model card and external document fetched by the tools is kept (for a while)
+in a SourceTextCache together with a shingle index: the set of hashes of every run
+of SHINGLE_SIZE consecutive words of its normalized text. Normalization makes the
+match tolerant to the usual extraction noise:
+
+- Unicode compatibility forms (NFKC), so ligatures like "ﬁ" match "fi"
+- words hyphenated across a line break ("docu-\\nment") are joined
+- case, punctuation, quote/dash variants and whitespace are ignored
+
+A quote is only looked up in the text of the document it cites: it is verified
+when at least MATCH_THRESHOLD of its shingles occur in that text, so small
+differences (a dropped word, an OCR glitch) don't fail it. Quotes shorter than
+one shingle must appear verbatim (after normalization). Citations of documents
+that aren't cached can't be checked and are skipped, never flagged.
+Indexing happens once when a text is cached; verifying a quote is a handful of
+set lookups per shingle, independent of the size of the source.
+
+Exports:
+    SHINGLE_SIZE: Words per shingle
+    MATCH_THRESHOLD: Fraction of a quote's shingles that must be found
+    normalize_words: Normalized word list of a text
+    SourceTextCache: Cache of fetched source texts with their shingle indexes
+    verify_citations: Check the DIRECT quotes of a list of citations
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+SHINGLE_SIZE = 5
+MATCH_THRESHOLD = 0.8
+
+DEFAULT_MAX_DOCUMENTS = 64
+DEFAULT_TEXT_TTL = 24 * 60 * 60
+
+# Hyphen (or soft hyphen) at a line break inside a word
+LINE_BREAK_HYPHEN_RE = re.compile(r"(\w)[-\u00ad\u2010]\s*\n\s*(\w)")
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_words(text: str) -> list[str]:
+    """Return the lowercase words of a text after NFKC and de-hyphenation."""
+    text = unicodedata.normalize("NFKC", text).replace("\u00ad", "")
+    text = LINE_BREAK_HYPHEN_RE.sub(r"\1\2", text)
+    return WORD_RE.findall(text.lower())
+
+
+def _shingles(words: list[str]) -> set[int]:
+    """Hashes of all runs of SHINGLE_SIZE consecutive words."""
+    return {hash(tuple(words[i:i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _document_key(key: str) -> str:
+    """Cache key of a document URL; a trailing slash doesn't make a different document."""
+    return key.strip().rstrip("/")
+
+
+class SourceTextCache:
+    """Fetched source texts (model cards, documents) keyed by URL, with their shingle indexes."""
+
+    def __init__(self, max_documents: int = DEFAULT_MAX_DOCUMENTS, ttl: float = DEFAULT_TEXT_TTL):
+        self.max_documents = max_documents
+        self.ttl = ttl
+        # key -> (time added, normalized text padded with spaces, shingle set)
+        self._documents: OrderedDict[str, tuple[float, str, set[int]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str, text: str) -> None:
+        """Index and cache a source text (replacing any previous text under that key)."""
+        words = normalize_words(text)
+        entry = (time.monotonic(), f" {' '.join(words)} ", _shingles(words))
+        key = _document_key(key)
+        with self._lock:
+            self._documents.pop(key, None)
+            self._documents[key] = entry
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def _live(self) -> list[tuple[str, str, set[int]]]:
+        """Unexpired documents as (key, normalized text, shingles); drops expired ones."""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, (added, _, _) in self._documents.items() if now - added > self.ttl]:
+                del self._documents[key]
+            return [(key, text, shingles) for key, (_, text, shingles) in self._documents.items()]
+
+    def clear(self) -> None:
+        """Forget all cached texts."""
+        with self._lock:
+            self._documents.clear()
+
+    def keys(self) -> list[str]:
+        """Return the keys of the cached texts."""
+        return [key for key, _, _ in self._live()]
+
+    def __len__(self) -> int:
+        return len(self._live())
+
+    def match(self, quote: str, key: str) -> float | None:
+        """Return the fraction of a quote found in one cached text, or None if `key` isn't cached."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._documents.get(_document_key(key))
+        if entry is None or now - entry[0] > self.ttl:
+            return None
+        _, text, shingles = entry
+
+        words = normalize_words(quote)
+        if not words:
+            return 0.0
+        if len(words) < SHINGLE_SIZE:
+            return 1.0 if f" {' '.join(words)} " in text else 0.0
+        quote_shingles = _shingles(words)
+        return len(quote_shingles & shingles) / len(quote_shingles)
+
+
+def verify_citations(citations: list[dict], cache: SourceTextCache, threshold: float = MATCH_THRESHOLD,
+                     default_source: str = "") -> tuple[list[dict], int]:
+    """Check that every DIRECT citation's source_quote occurs in the document it cites.
+
+    Args:
+        citations: Validated citation dicts
+        cache: Cache of fetched source texts
+        threshold: Minimum fraction of the quote that must be found
+        default_source: Cache key of the document cited by citations without a source_document
+                        (e.g. the model card)
+
+    Returns:
+        (unverified, checked): one entry per DIRECT quote that was checked and not found,
+        {"question_id", "source_quote", "source_document", "score"}, and the number of DIRECT
+        quotes checked. Quotes citing a document that isn't cached are not checked.
+    """
+    unverified = []
+    checked = 0
+    for citation in citations:
+        quote = citation.get("source_quote", "")
+        if citation.get("confidence") != "DIRECT" or not quote.strip():
+            continue
+        source = citation.get("source_document", "").strip() or default_source
+        score = cache.match(quote, source) if source else None
+        if score is None:
+            continue
+        checked += 1
+        if score < threshold:
+            unverified.append({
+                "question_id": citation["question_id"],
+                "source_quote": quote,
+                "source_document": source,
+                "score": round(score, 2),
+            })
+    return unverified, checked
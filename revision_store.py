@@ -0,0 +1,176 @@
+"""Revision history for generated compliance documents.
+
+Each document produced by `generate_compliance_doc` is stored together with the
+answers that produced it, in a `<document_id>.answers.json` record next to the
+generated files. A revision applies changed answers on top of the stored ones,
+records which keys changed (with their previous values) and appends the new
+file to the document's version chain.
+
+Records are read and written under a lock file in the data directory, so
+processes sharing the directory can revise the same document concurrently:
+a revision first reserves its version number (and file name), and appends
+itself to the record as it is then, not as it was when the revision started.
+
+The store also keeps the most recent rendering of each document in memory, so
+a revision only re-renders the paragraphs whose placeholders changed. A rendering
+is tagged with the answers it was made from and only reused while the record
+still holds them, since another process may have revised the document since.
+
+Exports:
+    REVISION_SUFFIX: File suffix of revision records in the data directory
+    REVISION_LOCK_NAME: File name of the lock serializing record updates
+    RevisionStore: Persistence of answer payloads, version chains and renderings
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: records are only serialized within the process
+    fcntl = None
+
+
+REVISION_SUFFIX = ".answers.json"
+REVISION_LOCK_NAME = ".revisions.lock"
+
+# Document ids are generated file name stems, e.g. "Llama-3_1a2b3c"; model names may contain any
+# Unicode letters and digits (see server.safe_model_name), but never path separators or dots
+DOCUMENT_ID_PATTERN = re.compile(r"^[\w-]{1,64}$")
+
+
+class RevisionStore:
+    """Answer payloads and version chains of generated documents, stored in data_dir."""
+
+    def __init__(self, data_dir: str, cache_size: int = 16):
+        self.data_dir = data_dir
+        self.cache_size = cache_size
+        self._renderings: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._lock_path = os.path.join(data_dir, REVISION_LOCK_NAME)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's lock, within this process and across processes sharing data_dir."""
+        with self._lock:
+            fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _record_path(self, document_id: str) -> str:
+        if not DOCUMENT_ID_PATTERN.match(document_id):
+            raise ValueError(f"Invalid document id '{document_id}'")
+        return os.path.join(self.data_dir, f"{document_id}{REVISION_SUFFIX}")
+
+    def _save(self, record: dict) -> None:
+        path = self._record_path(record["document_id"])
+        partial_path = f"{path}.part"
+        with open(partial_path, "w") as f:
+            json.dump(record, f)
+        os.replace(partial_path, path)
+
+    def load(self, document_id: str) -> dict:
+        """Return the revision record of a document.
+
+        Raises:
+            ValueError: If the document id is malformed
+            KeyError: If no record exists (never generated, or expired)
+        """
+        try:
+            with open(self._record_path(document_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Document '{document_id}' not found or expired")
+
+    def create(self, document_id: str, template_name: str, answers: dict, filename: str) -> dict:
+        """Record version 1 of a newly generated document."""
+        record = {
+            "document_id": document_id,
+            "template_name": template_name,
+            "answers": answers,
+            "versions": [{
+                "version": 1,
+                "filename": filename,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "changes": {},
+            }],
+        }
+        with self._locked():
+            self._save(record)
+        return record
+
+    def reserve_version(self, document_id: str) -> tuple[int, str, dict]:
+        """Reserve the next version number of a document and its file name.
+
+        Concurrent revisions get distinct numbers even before either is added to the chain.
+
+        Returns:
+            (version number, file name of the version, the record as read under the lock)
+
+        Raises:
+            ValueError: If the document id is malformed
+            KeyError: If no record exists (never generated, or expired)
+        """
+        with self._locked():
+            record = self.load(document_id)
+            version = max(record["versions"][-1]["version"], record.get("reserved_version", 1)) + 1
+            record["reserved_version"] = version
+            self._save(record)
+        return version, f"{document_id}_v{version}.docx", record
+
+    def add_version(self, document_id: str, version: int, changes: dict, filename: str) -> dict:
+        """Apply changed answers to the stored record and append a reserved version.
+
+        The record is re-read under the lock, so versions added meanwhile are kept and
+        `from` values are the answers as they are now.
+
+        Args:
+            document_id: Id of the revised document
+            version: Number returned by reserve_version()
+            changes: {key: new value} for the answers that actually changed
+            filename: File name of the newly rendered version
+
+        Returns:
+            The updated record
+        """
+        with self._locked():
+            record = self.load(document_id)
+            record["versions"].append({
+                "version": version,
+                "filename": filename,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "changes": {key: {"from": record["answers"].get(key), "to": value} for key, value in changes.items()},
+            })
+            record["versions"].sort(key=lambda v: v["version"])
+            record["answers"].update(changes)
+            self._save(record)
+        return record
+
+    def cache_rendering(self, document_id: str, compiled, answers: dict, rendered: dict) -> None:
+        """Keep the latest rendering of a document, with the compiled template and answers it came from."""
+        with self._lock:
+            self._renderings[document_id] = (compiled, dict(answers), rendered)
+            self._renderings.move_to_end(document_id)
+            while len(self._renderings) > self.cache_size:
+                self._renderings.popitem(last=False)
+
+    def cached_rendering(self, document_id: str, compiled, answers: dict):
+        """Return the cached rendering of a document if it was made from `compiled` and `answers`, else None.
+
+        Pass the answers of the record the revision starts from: a rendering made before another
+        process revised the document no longer matches them.
+        """
+        with self._lock:
+            cached = self._renderings.get(document_id)
+        if cached is None or cached[0] is not compiled or cached[1] != answers:
+            return None
+        return cached[2]
@@ -2,7 +2,7 @@ import uvicorn
 import os
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Route
-from server import mcp
+from server import mcp, start_cleanup, template_registry
 
 # 1. Get the Streamable HTTP app
 app = mcp.streamable_http_app()
@@ -20,6 +20,10 @@ for route in app.routes:
 
 app.router.routes = new_routes
 
+# Delete expired artifacts. Every worker starts the job, but only the one holding the
+# cleanup lock in the storage directory runs it; the others stand by.
+start_cleanup()
+
 # 2. Add CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +35,8 @@ app.add_middleware(
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
+    # Compile all DOCX templates up front so the first request doesn't pay for it
+    print(f"Loaded templates: {', '.join(template_registry.preload()) or 'none'}")
     print(f"Starting EU AI Act Compliance Server (Streamable HTTP) on port {port}...")
     print("Endpoint: /mcp (Use this path in your URL)")
     uvicorn.run(app, host="0.0.0.0", port=port)
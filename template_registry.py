@@ -0,0 +1,93 @@
+"""Registry of DOCX templates available to the compliance tools.
+
+Every `.docx` file in the templates directory is addressable by its file name
+without extension (e.g. `default_template`). Templates are compiled once into
+the streaming-fill form used by `docx_generator.fill_template_xml` and kept in
+memory; each lookup checks the file's mtime, so an edited template is picked up
+on its next use and new or deleted files are noticed on the next directory scan.
+
+Exports:
+    DEFAULT_TEMPLATE_NAME: Name of the template used when none is requested
+    TemplateRegistry: Name -> compiled template lookup with hot reload
+"""
+
+import os
+import threading
+import time
+
+from docx_generator import CompiledPackage, build_display_data, get_compiled_package, write_compiled_package
+
+
+DEFAULT_TEMPLATE_NAME = "default_template"
+
+# Minimum seconds between directory scans for added/removed templates
+DEFAULT_SCAN_INTERVAL = 5.0
+
+
+class TemplateRegistry:
+    """Name -> compiled template lookup over a templates directory."""
+
+    def __init__(self, template_dir: str, scan_interval: float = DEFAULT_SCAN_INTERVAL):
+        self.template_dir = os.path.abspath(template_dir)
+        self.scan_interval = scan_interval
+        self._paths: dict[str, str] = {}
+        self._last_scan = None
+        self._lock = threading.Lock()
+
+    def _scan(self, force: bool = False) -> dict[str, str]:
+        """Refresh the name -> path map from disk if the scan interval elapsed (or force)."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_scan is not None and now - self._last_scan < self.scan_interval:
+                return self._paths
+            paths = {}
+            if os.path.isdir(self.template_dir):
+                for filename in os.listdir(self.template_dir):
+                    # Skip Word lock files (~$name.docx) and non-docx files
+                    if filename.endswith(".docx") and not filename.startswith("~$"):
+                        paths[filename[:-len(".docx")]] = os.path.join(self.template_dir, filename)
+            self._paths = paths
+            self._last_scan = now
+            return paths
+
+    def names(self) -> list[str]:
+        """Return the sorted names of all available templates."""
+        return sorted(self._scan())
+
+    def path(self, name: str = DEFAULT_TEMPLATE_NAME) -> str:
+        """Return the file path of a template.
+
+        Raises:
+            KeyError: If no template with that name exists, listing the available names
+        """
+        paths = self._scan()
+        if name not in paths or not os.path.exists(paths[name]):
+            # The directory may have changed since the last scan
+            paths = self._scan(force=True)
+        if name not in paths:
+            available = ", ".join(sorted(paths)) or "none"
+            raise KeyError(f"Template '{name}' not found. Available templates: {available}")
+        return paths[name]
+
+    def get(self, name: str = DEFAULT_TEMPLATE_NAME) -> CompiledPackage:
+        """Return the compiled template, recompiling it if the file changed on disk."""
+        return get_compiled_package(self.path(name))
+
+    def preload(self) -> list[str]:
+        """Compile every template now so the first request doesn't pay for it.
+
+        Returns:
+            Names of the templates that were loaded
+        """
+        loaded = []
+        for name, path in sorted(self._scan(force=True).items()):
+            try:
+                get_compiled_package(path)
+                loaded.append(name)
+            except Exception as e:
+                print(f"TEMPLATES: Could not load template {name}: {e}")
+        return loaded
+
+    def fill(self, name: str, output_path, data: dict) -> None:
+        """Fill the named template with data and write the .docx to output_path."""
+        write_compiled_package(self.get(name), output_path, build_display_data(data))
@@ -0,0 +1,29 @@
+"""Shared fixtures."""
+
+import pytest
+
+import server
+from artifact_expiry import ExpiryIndex
+from artifact_storage import LocalStorage
+from download_signing import DownloadSigner
+from revision_store import RevisionStore
+
+
+@pytest.fixture(autouse=True)
+def data_dir(monkeypatch, tmp_path_factory):
+    """Point the server at an empty storage directory for each test and return its path.
+
+    Artifacts, revision records and the expiry index of a test live in a temporary
+    directory (separate from the test's own tmp_path), so nothing is written to, or
+    left behind in, the real generated_docs directory.
+    """
+    directory = str(tmp_path_factory.mktemp("generated_docs"))
+    monkeypatch.setattr(server, "DATA_DIR", directory)
+    monkeypatch.setattr(server, "storage", LocalStorage(directory))
+    monkeypatch.setattr(server, "revision_store", RevisionStore(directory))
+    monkeypatch.setattr(server, "_download_signer", DownloadSigner([b"test-signing-key"]))
+    index = ExpiryIndex(directory, server.ARTIFACT_RETENTION_HOURS * 3600, server.ARTIFACT_SUFFIXES,
+                        remove=server.remove_artifact, list_files=server.list_stored_artifacts)
+    monkeypatch.setattr(server, "_expiry_index", index)
+    yield directory
+    index.close()
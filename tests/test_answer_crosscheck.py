@@ -0,0 +1,126 @@
+"""Tests for cross-checking citation answers against the compliance document."""
+
+import json
+from unittest.mock import patch
+
+import server
+from answer_crosscheck import ComplianceAnswerStore, diff_answers, normalize_answer
+from question_schema import QuestionSchema
+
+
+def citation(question_id, answer):
+    return {"question_id": question_id, "question_text": f"{question_id}?", "answer": answer,
+            "confidence": "NOT FOUND", "reasoning": "Not in the model card"}
+
+
+def test_normalized_comparison():
+    assert normalize_answer("Yes") == normalize_answer(" yes ") == normalize_answer("☑")
+    assert normalize_answer("7,000 GPU hours") == normalize_answer("7000 gpu  hours")
+    assert normalize_answer("ﬁne-tuned") == normalize_answer("Fine-tuned")
+    assert normalize_answer("no") != normalize_answer("yes")
+    # Decimal points and other punctuation are significant
+    assert normalize_answer("1.5B") != normalize_answer("15B")
+    assert normalize_answer("v1.0") != normalize_answer("v10")
+    assert normalize_answer("1,5") != normalize_answer("15")
+
+
+def test_diff_answers_only_compares_shared_questions():
+    answers = {"license": "Apache 2.0", "open_source": "yes", "training_time": "1,000 hours"}
+    citations = [
+        citation("open_source", "Yes"),
+        citation("license", "MIT"),
+        citation("training_time", "1000 hours"),
+        citation("not_in_document", "anything"),
+    ]
+    assert diff_answers(answers, citations) == [{"question_id": "license", "document": "Apache 2.0", "citation": "MIT"}]
+
+
+def test_store_keeps_last_payload_per_model():
+    store = ComplianceAnswerStore(max_payloads=2)
+    store.remember("s1", "Model A", {"q": "1"}, "A_1")
+    store.remember("s1", "Model B", {"q": "2"}, "B_1")
+    store.remember("s1", "model a", {"q": "3"}, "A_2")
+    assert store.lookup("s1", "Model A") == {"model_name": "model a", "document_id": "A_2", "answers": {"q": "3"}}
+    # Without a name, the session's most recent payload
+    assert store.lookup("s1")["document_id"] == "A_2"
+
+    store.remember("s1", "Model C", {}, "C_1")
+    assert store.lookup("s1", "Model B") is None
+
+    with patch("answer_crosscheck.time.monotonic", return_value=1e12):
+        assert store.lookup("s1", "Model C") is None
+
+
+def test_store_never_returns_other_sessions_payloads():
+    store = ComplianceAnswerStore()
+    store.remember("s1", "Model A", {"q": "1"}, "A_1")
+    store.remember("s2", "Model B", {"q": "2"}, "B_1")
+    assert store.lookup("s1")["document_id"] == "A_1"
+    assert store.lookup("s2", "Model A") is None
+    assert store.lookup("s3") is None
+
+    # Requests without a session are neither remembered nor matched
+    store.remember(None, "Model C", {"q": "3"}, "C_1")
+    assert store.lookup(None) is None and store.lookup(None, "Model A") is None
+
+
+class FakeContext:
+    """Context of a tool call over streamable HTTP in the given session."""
+
+    def __init__(self, session_id):
+        class request:
+            headers = {"mcp-session-id": session_id}
+
+        class request_context:
+            pass
+
+        request_context.request = request
+        self.request_context = request_context
+
+
+def test_source_report_lists_mismatches(monkeypatch):
+    monkeypatch.setattr(server, "compliance_answers", ComplianceAnswerStore())
+    schema = QuestionSchema.from_json(json.dumps([{"id": "model_name"}, {"id": "license"}, {"id": "open_source"}]))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+
+    result = server.generate_compliance_doc(json.dumps({"model_name": "Cross Check", "license": "Apache 2.0",
+                                                        "open_source": "yes"}), response_mode="link")
+    document_id = result[0].text.split("DOCUMENT ID: ")[1].split()[0]
+
+    citations = json.dumps({"citations": [
+        citation("model_name", "Cross Check"),
+        citation("license", "MIT"),
+        citation("open_source", "Yes"),
+    ]})
+    text = server.generate_source_report(citations, model_name="Cross Check", response_mode="link",
+                                         verify_quotes=False)[0].text
+    assert f"ANSWER CHECK: 1 of 3 cited answers differ from the compliance document '{document_id}'" in text
+    assert "- license: document 'Apache 2.0', citation 'MIT'" in text
+
+    # Revising the document updates the remembered answers
+    server.revise_compliance_doc(document_id, json.dumps({"license": "MIT"}), response_mode="link")
+    text = server.generate_source_report(citations, response_mode="link", verify_quotes=False)[0].text
+    assert f"ANSWER CHECK: all 3 cited answers match the compliance document '{document_id}'." in text
+
+    text = server.generate_source_report(citations, model_name="Other Model", response_mode="link",
+                                         verify_quotes=False)[0].text
+    assert "ANSWER CHECK: skipped (no compliance document was generated for 'Other Model' in this session recently)." in text
+
+
+def test_source_report_only_checks_the_callers_documents(monkeypatch):
+    monkeypatch.setattr(server, "compliance_answers", ComplianceAnswerStore())
+    schema = QuestionSchema.from_json(json.dumps([{"id": "model_name"}, {"id": "license"}]))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+
+    server.generate_compliance_doc(json.dumps({"model_name": "Client A", "license": "Secret License"}),
+                                   response_mode="link", ctx=FakeContext("session-a"))
+    citations = json.dumps({"citations": [citation("model_name", "Client B"), citation("license", "MIT")]})
+
+    # Another client's report with the default model name isn't compared with client A's document
+    text = server.generate_source_report(citations, response_mode="link", verify_quotes=False,
+                                         ctx=FakeContext("session-b"))[0].text
+    assert "ANSWER CHECK: skipped" in text and "Secret License" not in text
+
+    text = server.generate_source_report(citations, response_mode="link", verify_quotes=False,
+                                         ctx=FakeContext("session-a"))[0].text
+    assert "- license: document 'Secret License', citation 'MIT'" in text
@@ -0,0 +1,158 @@
+"""Tests for the artifact expiry index."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import server
+from artifact_expiry import EXPIRY_INDEX_NAME, CleanupLock, ExpiryIndex
+from artifact_storage import LocalStorage
+
+
+def touch(directory, name, mtime=None):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ExpiryIndex(str(tmp_path), retention=100)
+    yield index
+    index.close()
+
+
+def test_only_due_artifacts_are_deleted(tmp_path, index):
+    for name, created in (("a.docx", 0), ("b.pdf", 50), ("c.zip", 200)):
+        touch(tmp_path, name)
+        index.register(name, now=created)
+    assert index.next_expiry() == 100
+
+    assert index.delete_expired(now=160) == ["a.docx", "b.pdf"]
+    remaining = set(os.listdir(tmp_path))
+    assert "c.zip" in remaining and not {"a.docx", "b.pdf"} & remaining
+    assert index.next_expiry() == 300
+    assert len(index) == 1
+
+
+def test_renewing_postpones_expiry(tmp_path, index):
+    touch(tmp_path, "a.pdf")
+    index.register("a.pdf", now=0)
+    index.register("a.pdf", now=90)
+    assert index.delete_expired(now=150) == []
+    assert index.expires_at("a.pdf") == 190
+
+
+def test_missing_files_are_dropped_from_the_index(index):
+    index.register("gone.docx", now=0)
+    assert index.delete_expired(now=1000) == []
+    assert index.next_expiry() is None
+
+
+def test_index_survives_restart(tmp_path, index):
+    touch(tmp_path, "a.docx")
+    index.register("a.docx", now=0)
+    index.close()
+
+    reopened = ExpiryIndex(str(tmp_path), retention=100, suffixes=(".docx",))
+    assert reopened.expires_at("a.docx") == 100
+    assert reopened.delete_expired(now=100) == ["a.docx"]
+    reopened.close()
+
+
+def test_new_index_is_seeded_from_existing_files(tmp_path):
+    touch(tmp_path, "old.docx", mtime=1000)
+    touch(tmp_path, "report.pdf", mtime=2000)
+    touch(tmp_path, "notes.txt", mtime=1000)
+
+    index = ExpiryIndex(str(tmp_path), retention=100, suffixes=(".docx", ".pdf"))
+    assert len(index) == 2
+    assert index.delete_expired(now=1500) == ["old.docx"]
+    assert os.path.exists(os.path.join(tmp_path, "notes.txt"))
+    index.close()
+
+
+def test_cleanup_work_is_proportional_to_expired_artifacts(tmp_path, index):
+    """Deleting 10 due artifacts among 20,000 doesn't look at the others."""
+    index._db.executemany("INSERT INTO artifacts VALUES (?, ?)",
+                          [(f"live_{i}.pdf", 10_000 + i) for i in range(20_000)])
+    for i in range(10):
+        index.register(touch(tmp_path, f"due_{i}.pdf").rsplit(os.sep, 1)[-1], now=i)
+
+    start = time.perf_counter()
+    assert len(index.delete_expired(now=500)) == 10
+    assert time.perf_counter() - start < 0.05
+    plan = " ".join(row[-1] for row in index._db.execute(
+        "EXPLAIN QUERY PLAN SELECT filename FROM artifacts WHERE expires_at <= ? ORDER BY expires_at LIMIT ?", (0, 1)))
+    assert "artifacts_expires_at" in plan
+
+
+def test_generated_artifacts_are_registered(monkeypatch, tmp_path):
+    index = ExpiryIndex(str(tmp_path), retention=60)
+    monkeypatch.setattr(server, "_expiry_index", index)
+    monkeypatch.setattr(server, "storage", LocalStorage(str(tmp_path)))
+
+    before = time.time()
+    server.write_artifact("report.pdf", lambda f: f.write(b"%PDF"))
+    assert before + 60 <= index.expires_at("report.pdf") <= time.time() + 60
+    assert os.path.exists(os.path.join(tmp_path, "report.pdf"))
+    index.close()
+
+
+def test_cleanup_lock_elects_one_process(tmp_path):
+    leader, standby = CleanupLock(str(tmp_path)), CleanupLock(str(tmp_path))
+    assert leader.acquire() and leader.acquire()
+    assert not standby.acquire()
+    leader.release()
+    assert standby.acquire() and standby.held
+    standby.release()
+
+
+def test_standby_takes_over_when_the_leader_is_gone(monkeypatch, tmp_path):
+    ran = threading.Event()
+    monkeypatch.setattr(server, "cleanup_old_files", ran.set)
+    monkeypatch.setattr(server, "CLEANUP_STANDBY_INTERVAL", 0.01)
+    leader = CleanupLock(str(tmp_path))
+    assert leader.acquire()
+
+    thread = threading.Thread(target=server.run_cleanup, args=(CleanupLock(str(tmp_path)),), daemon=True)
+    thread.start()
+    assert not ran.wait(0.1)
+    leader.release()
+    assert ran.wait(2)
+
+
+def test_importing_the_server_does_not_start_the_cleanup():
+    assert server._cleanup_thread is None
+
+
+def test_importing_the_server_does_not_open_the_index(tmp_path):
+    """The index (and its seeding listing) is only created when first used."""
+    env = {**os.environ, "RAILWAY_VOLUME_MOUNT_PATH": str(tmp_path)}
+    env.pop("DOWNLOAD_SIGNING_KEY", None)
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", "import server"], cwd=repo, env=env, check=True, capture_output=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_index_is_opened_on_first_use(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "_expiry_index", None)
+    index = server.get_expiry_index()
+    assert server.get_expiry_index() is index
+    assert os.path.exists(os.path.join(tmp_path, EXPIRY_INDEX_NAME))
+    index.close()
+
+
+def test_hidden_files_are_not_downloadable():
+    from starlette.testclient import TestClient
+
+    client = TestClient(server.mcp.streamable_http_app())
+    assert client.get(f"/download/{EXPIRY_INDEX_NAME}").status_code == 400
@@ -0,0 +1,95 @@
+"""Integration tests for the generate_audience_reports MCP tool."""
+
+import html
+import json
+import os
+import re
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+from derived_answers import DERIVED_FIELDS
+from server import AUDIENCE_OMITTED_TEXT, generate_audience_reports
+
+
+with open(os.path.join(os.path.dirname(__file__), "..", "questions.json")) as f:
+    QUESTIONS = json.load(f)
+
+ANSWERS = {q["id"]: f"Answer {q['id']}" for q in QUESTIONS}
+
+CITATIONS_JSON = json.dumps({"citations": [
+    {
+        "question_id": q["id"],
+        "question_text": q["question"],
+        "answer": f"Answer {q['id']}",
+        "source_quote": "",
+        "source_section": "",
+        "confidence": "NOT FOUND",
+        "reasoning": "Not in the model card",
+    }
+    for q in QUESTIONS
+]})
+
+
+def _manifest(result) -> dict:
+    """Extract the JSON manifest from the tool's text output."""
+    text = result[0].text
+    return json.loads(text[text.index("MANIFEST:") + len("MANIFEST:"):])
+
+
+def _docx_text(path) -> str:
+    """All text of the document body, including text boxes and content controls."""
+    with zipfile.ZipFile(path) as package:
+        xml = package.read("word/document.xml").decode("utf-8")
+    return html.unescape(re.sub(r"<[^>]+>", "", xml))
+
+
+def test_docx_variants_only_contain_audience_answers(data_dir):
+    """Each audience's Docx keeps its questions' answers and blanks the rest."""
+    manifest = _manifest(generate_audience_reports(json.dumps(ANSWERS), audiences="AIO,DP", model_name="Aud Model"))
+
+    assert manifest["total_files"] == 2 and manifest["failed"] == 0
+    for item in manifest["audiences"]:
+        (entry,) = item["files"]
+        assert entry["filename"].startswith(f"Aud_Model_{item['audience']}_")
+        text = _docx_text(os.path.join(data_dir, entry["filename"]))
+        for q in QUESTIONS:
+            # Check answers that appear as their own placeholder text (derived fields are recomputed)
+            if item["audience"] in q["audience"] and q["id"] not in DERIVED_FIELDS:
+                assert f"Answer {q['id']}" in text
+            elif q["id"] in ("training_time_aio", "data_points_aio"):
+                assert f"Answer {q['id']}" not in text
+        assert AUDIENCE_OMITTED_TEXT in text
+
+
+def test_pdf_variants_share_validation_and_filter_citations(data_dir):
+    """With citations, each audience also gets a PDF with only its questions."""
+    manifest = _manifest(generate_audience_reports(json.dumps(ANSWERS), CITATIONS_JSON, audiences="NCA"))
+
+    (item,) = manifest["audiences"]
+    assert [entry["type"] for entry in item["files"]] == ["docx", "pdf"]
+    pdf_entry = item["files"][1]
+    pdf = PdfReader(os.path.join(data_dir, pdf_entry["filename"]))
+    expected = sum(1 for q in QUESTIONS if "NCA" in q["audience"])
+    assert item["questions"] == expected
+    assert f"Total Questions: {expected}" in " ".join(pdf.pages[0].extract_text().split())
+
+
+def test_invalid_citations_are_rejected_before_rendering(data_dir):
+    """Citations are validated (including coverage) once, before anything is rendered."""
+    before = set(os.listdir(data_dir))
+    partial = json.dumps({"citations": json.loads(CITATIONS_JSON)["citations"][:5]})
+
+    result = generate_audience_reports(json.dumps(ANSWERS), partial)
+
+    assert result[0].text.startswith("Validation Error")
+    assert set(os.listdir(data_dir)) == before
+
+
+@pytest.mark.parametrize("audiences", ["", "AIO,XYZ"])
+def test_unknown_audiences_are_rejected(audiences):
+    """Audience codes must be AIO, NCA or DP."""
+    result = generate_audience_reports(json.dumps(ANSWERS), audiences=audiences)
+
+    assert "Invalid audiences" in result[0].text
@@ -0,0 +1,53 @@
+"""Integration tests for the generate_compliance_docs_batch MCP tool."""
+
+import json
+import os
+
+import pytest
+from docx import Document
+
+from server import generate_compliance_docs_batch
+
+
+def _manifest(result) -> dict:
+    """Extract the JSON manifest from the tool's text output."""
+    text = result[0].text
+    return json.loads(text[text.index("MANIFEST:") + len("MANIFEST:"):])
+
+
+def test_batch_generates_one_document_per_payload(data_dir):
+    """Every valid payload gets a saved document and a download link in the manifest."""
+    payloads = [{"model_name": f"Batch Model {i}", "legal_name": f"Provider {i}"} for i in range(3)]
+    manifest = _manifest(generate_compliance_docs_batch(json.dumps(payloads)))
+
+    assert manifest["total"] == 3
+    assert manifest["succeeded"] == 3
+    for i, item in enumerate(manifest["items"]):
+        assert item["index"] == i
+        assert item["error"] is None
+        assert item["filename"].startswith(f"Batch_Model_{i}_")
+        assert f"/download/{item['filename']}?expires=" in item["download_link"]
+        doc = Document(os.path.join(data_dir, item["filename"]))
+        assert any(f"Provider {i}" in cell.text for table in doc.tables for row in table.rows for cell in row.cells)
+
+
+def test_batch_reports_invalid_items_without_failing_batch():
+    """Non-object payloads are reported per item while the rest still render."""
+    payloads = [{"model_name": "Good"}, "not an object", {"model_name": "Bad\x00Value", "legal_name": "x\x01"}]
+    manifest = _manifest(generate_compliance_docs_batch(json.dumps(payloads)))
+
+    assert manifest["succeeded"] == 1
+    assert manifest["failed"] == 2
+    assert manifest["items"][0]["error"] is None
+    assert "JSON object" in manifest["items"][1]["error"]
+    assert manifest["items"][2]["error"].startswith("Error generating document")
+    assert manifest["items"][2]["filename"] is None
+
+
+@pytest.mark.parametrize("payload", ["not json", json.dumps({"model_name": "x"}), json.dumps([])])
+def test_batch_rejects_non_list_input(payload):
+    """Input must be a non-empty JSON array."""
+    result = generate_compliance_docs_batch(payload)
+
+    assert len(result) == 1
+    assert result[0].text.startswith("Error")
@@ -0,0 +1,94 @@
+"""Tests for compliance bundles: the ZIP writer and the generate_compliance_bundle tool."""
+
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+
+from starlette.testclient import TestClient
+
+from bundle import MANIFEST_NAME, write_bundle
+from server import build_download_link, generate_compliance_bundle, mcp
+
+
+with open(os.path.join(os.path.dirname(__file__), "..", "questions.json")) as f:
+    QUESTIONS = json.load(f)
+
+ANSWERS_JSON = json.dumps({"model_name": "Bundle Model", "legal_name": "Provider"})
+
+CITATIONS_JSON = json.dumps({"citations": [
+    {
+        "question_id": q["id"],
+        "question_text": q["question"],
+        "answer": "N/A",
+        "source_quote": "",
+        "source_section": "",
+        "confidence": "NOT FOUND",
+        "reasoning": "Not in the model card",
+    }
+    for q in QUESTIONS
+]})
+
+
+def test_write_bundle_manifest_hashes(tmp_path):
+    """The manifest lists every file with its SHA-256; compressed formats are stored."""
+    docx = tmp_path / "a.docx"
+    docx.write_bytes(b"PK docx bytes")
+    notes = tmp_path / "notes.txt"
+    notes.write_bytes(b"plain text " * 100)
+
+    buf = io.BytesIO()
+    manifest = write_bundle(buf, [(str(docx), "a.docx", "x/docx"), (str(notes), "notes.txt", "text/plain")], {"model_name": "m"})
+
+    with zipfile.ZipFile(buf) as bundle:
+        assert json.loads(bundle.read(MANIFEST_NAME)) == manifest
+        assert bundle.getinfo("a.docx").compress_type == zipfile.ZIP_STORED
+        assert bundle.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+        for entry in manifest["files"]:
+            content = bundle.read(entry["name"])
+            assert entry["size"] == len(content)
+            assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+    assert manifest["model_name"] == "m"
+
+
+def test_bundle_tool_packages_docx_and_pdf(data_dir):
+    """The bundle contains the Docx, the PDF and a manifest; temporary files are removed."""
+    result = generate_compliance_bundle(ANSWERS_JSON, CITATIONS_JSON, model_card_id="org/model", response_mode="link")
+
+    assert result[1].type == "resource_link" and result[1].mimeType == "application/zip"
+    bundle_path = os.path.join(data_dir, result[1].name)
+    with open(bundle_path, "rb") as f:
+        assert re.search(r"BUNDLE SHA-256: (\w+)", result[0].text).group(1) == hashlib.sha256(f.read()).hexdigest()
+
+    with zipfile.ZipFile(bundle_path) as bundle:
+        assert sorted(bundle.namelist()) == ["Bundle_Model_compliance.docx", "Bundle_Model_sources.pdf", MANIFEST_NAME]
+        assert bundle.read("Bundle_Model_compliance.docx").startswith(b"PK")
+        assert bundle.read("Bundle_Model_sources.pdf").startswith(b"%PDF")
+        manifest = json.loads(bundle.read(MANIFEST_NAME))
+    assert manifest["model_card_id"] == "org/model"
+    assert not any(f.endswith(".part") for f in os.listdir(data_dir))
+
+
+def test_bundle_tool_validates_before_rendering(data_dir):
+    """Incomplete citations are rejected without writing anything."""
+    before = set(os.listdir(data_dir))
+    partial = json.dumps({"citations": json.loads(CITATIONS_JSON)["citations"][:3]})
+
+    result = generate_compliance_bundle(ANSWERS_JSON, partial)
+
+    assert len(result) == 1 and result[0].text.startswith("Validation Error")
+    assert set(os.listdir(data_dir)) == before
+
+
+def test_download_route_streams_bundle():
+    """/download serves the ZIP with its content type."""
+    result = generate_compliance_bundle(ANSWERS_JSON, CITATIONS_JSON, response_mode="link")
+
+    with TestClient(mcp.streamable_http_app()) as client:
+        response = client.get(build_download_link(result[1].name))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert zipfile.ZipFile(io.BytesIO(response.content)).testzip() is None
@@ -8,7 +8,9 @@ from citation_schema import (
     ConfidenceLevel,
     Citation,
     CitationReport,
+    CoverageError,
     validate_citation_json,
+    validate_citation_payload,
 )
 
 
@@ -316,3 +318,67 @@ def test_validate_json_error_message_contains_field_path():
     assert 'citations' in error_message
     assert '0' in error_message
     assert 'confidence' in error_message
+
+
+# Fast path: validate_citation_payload
+
+PAYLOAD_CITATIONS = [
+    {
+        'question_id': 'Q1',
+        'question_text': 'Test?',
+        'confidence': 'NOT FOUND',
+        'reasoning': 'Not in the card',
+        'unknown_field': 'dropped',
+    },
+    {
+        'question_id': 'Q2',
+        'question_text': 'Other?',
+        'answer': 'Yes',
+        'source_quote': 'quote',
+        'source_section': 'Intro',
+        'source_document': 'Model Card',
+        'confidence': 'DIRECT',
+        'reasoning': 'Stated',
+    },
+]
+
+
+def test_payload_matches_model_dump():
+    """The fast path returns exactly what validating and dumping the models returns."""
+    payload = json.dumps({'citations': PAYLOAD_CITATIONS})
+    expected = [c.model_dump() for c in validate_citation_json(payload).citations]
+    assert validate_citation_payload(payload, ['Q1', 'Q2']) == expected
+
+
+@pytest.mark.parametrize('citations', [
+    [],
+    [{'question_id': '', 'question_text': 'Q?', 'confidence': 'DIRECT', 'reasoning': 'r'}],
+    [{'question_id': 'Q1', 'question_text': '   ', 'confidence': 'DIRECT', 'reasoning': 'r'}],
+    [{'question_id': 'Q1', 'question_text': 'Q?', 'confidence': 'SURE', 'reasoning': 'r'}],
+    [{'question_id': 'Q1', 'question_text': 'Q?', 'confidence': 'DIRECT', 'reasoning': ' \n'}],
+    [{'question_id': 'Q1', 'question_text': 'Q?', 'confidence': 'DIRECT', 'reasoning': 'r', 'answer': 5}],
+    [{'question_id': 'Q1', 'confidence': 'DIRECT', 'reasoning': 'r'}],
+])
+def test_payload_rejects_what_the_models_reject(citations):
+    payload = json.dumps({'citations': citations})
+    with pytest.raises(ValueError) as fast_error:
+        validate_citation_payload(payload)
+    with pytest.raises(ValueError) as model_error:
+        validate_citation_json(payload)
+    # Same field paths and messages
+    assert [part.split(' (type:')[0] for part in str(fast_error.value).split('; ')] == \
+        [part.split(' (type:')[0] for part in str(model_error.value).split('; ')]
+
+
+def test_payload_malformed_json():
+    with pytest.raises(ValueError):
+        validate_citation_payload('not valid json')
+
+
+def test_payload_coverage_errors():
+    payload = json.dumps({'citations': PAYLOAD_CITATIONS})
+    with pytest.raises(CoverageError) as exc_info:
+        validate_citation_payload(payload, ['Q1', 'Q3', 'Q2', 'Q4'])
+    assert str(exc_info.value) == 'Missing citations for 2 questions: [Q3, Q4]'
+    # Coverage errors are still ValueErrors, like validate_report_coverage's
+    assert isinstance(exc_info.value, ValueError)
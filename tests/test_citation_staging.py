@@ -0,0 +1,112 @@
+"""Tests for chunked submission of citation reports."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+import server
+from citation_staging import CitationStaging
+from question_schema import QuestionSchema
+
+
+QUESTION_IDS = ["Q1", "Q2", "Q3", "Q4"]
+
+
+def citation(question_id, confidence="NOT FOUND"):
+    return {
+        "question_id": question_id,
+        "question_text": f"Question {question_id}?",
+        "answer": f"Answer {question_id}",
+        "confidence": confidence,
+        "reasoning": "Not in the model card",
+    }
+
+
+def chunk(*citations):
+    return json.dumps({"citations": list(citations)})
+
+
+@pytest.fixture
+def questions():
+    schema = QuestionSchema.from_json(json.dumps([{"id": qid, "question": f"{qid}?"} for qid in QUESTION_IDS]))
+    with patch("server.get_question_schema", return_value=schema):
+        yield
+
+
+def test_chunks_accumulate_and_replace():
+    staging = CitationStaging()
+    staging_id = staging.create("Model", "org/model")
+    assert staging.append(staging_id, chunk(citation("Q1"), citation("Q2"))) == ["Q1", "Q2"]
+    assert staging.append(staging_id, chunk(citation("Q3"), citation("Q1", "DIRECT"))) == ["Q3", "Q1"]
+
+    citations = staging.citations(staging_id)
+    # Order of first staging; restaging replaces the citation
+    assert [c["question_id"] for c in citations] == ["Q1", "Q2", "Q3"]
+    assert citations[0]["confidence"] == "DIRECT"
+    assert staging.missing(staging_id, QUESTION_IDS) == ["Q4"]
+
+
+def test_invalid_chunk_is_rejected_as_a_whole():
+    staging = CitationStaging()
+    staging_id = staging.create("Model", "org/model")
+    bad = dict(citation("Q2"), confidence="SURE")
+    with pytest.raises(ValueError) as exc_info:
+        staging.append(staging_id, chunk(citation("Q1"), bad))
+    assert "citations -> 1 -> confidence" in str(exc_info.value)
+    assert staging.citations(staging_id) == []
+
+
+def test_unknown_and_expired_reports():
+    staging = CitationStaging(ttl=10)
+    with pytest.raises(KeyError):
+        staging.append("nope", chunk(citation("Q1")))
+
+    with patch("citation_staging.time.monotonic", return_value=1000.0):
+        staging_id = staging.create("Model", "org/model")
+    with patch("citation_staging.time.monotonic", return_value=1011.0):
+        with pytest.raises(KeyError):
+            staging.missing(staging_id, QUESTION_IDS)
+
+
+def test_number_of_reports_is_bounded():
+    staging = CitationStaging(max_reports=2)
+    first = staging.create("A", "a")
+    staging.create("B", "b")
+    staging.create("C", "c")
+    with pytest.raises(KeyError):
+        staging.info(first)
+
+
+def test_staged_report_tools(questions, data_dir):
+    text = server.start_source_report(model_name="Staged Model", model_card_id="org/staged")
+    staging_id = text.split("STAGING ID: ")[1].split()[0]
+
+    text = server.append_source_citations(staging_id, chunk(citation("Q1"), citation("Q2")))
+    assert "STAGED: 2 citations in this chunk, 2 in total." in text
+    assert "MISSING (2): Q3, Q4" in text
+
+    # A malformed entry only costs this chunk
+    text = server.append_source_citations(staging_id, chunk(citation("Q3"), {"question_id": "Q4"}))
+    assert text.startswith("Validation Error (chunk rejected, nothing staged)")
+    assert server.get_missing_citations(staging_id) == "MISSING (2): Q3, Q4"
+
+    result = server.finalize_source_report(staging_id, response_mode="link")
+    assert result[0].text.startswith("Coverage Validation Error: Missing citations for 2 questions: [Q3, Q4]")
+
+    text = server.append_source_citations(staging_id, chunk(citation("Q3"), citation("Q4")))
+    assert "MISSING: none" in text
+
+    result = server.finalize_source_report(staging_id, response_mode="link", generated_at="2025-01-02T03:04:00")
+    assert "SUCCESS" in result[0].text
+    filename = str(result[1].uri).rsplit("/", 1)[-1]
+    assert filename.startswith("Staged_Model_sources_")
+    assert os.path.exists(os.path.join(data_dir, filename))
+
+    # Same report as sending everything at once; the staged report is gone
+    direct = server.generate_source_report(
+        chunk(*(citation(qid) for qid in QUESTION_IDS)), model_name="Staged Model", model_card_id="org/staged",
+        response_mode="link", generated_at="2025-01-02T03:04:00")
+    assert str(direct[1].uri) == str(result[1].uri)
+    assert server.get_missing_citations(staging_id).startswith("Error:")
@@ -0,0 +1,40 @@
+"""Integration tests for the generate_compliance_doc MCP tool."""
+
+import base64
+import json
+import os
+
+from server import generate_compliance_doc
+
+
+COMPLIANCE_JSON = json.dumps({"model_name": "Tool Test Model", "legal_name": "Provider", "input_modalities_text_check": "yes"})
+
+
+def test_embedded_mode_returns_docx_blob(data_dir):
+    """Default mode embeds the saved document as base64."""
+    result = generate_compliance_doc(COMPLIANCE_JSON, response_mode="embedded")
+
+    assert result[1].type == "resource"
+    doc_bytes = base64.b64decode(result[1].resource.blob)
+    assert doc_bytes.startswith(b"PK")
+    filename = str(result[1].resource.uri).rsplit("/", 1)[-1]
+    with open(os.path.join(data_dir, filename), "rb") as f:
+        assert f.read() == doc_bytes
+
+
+def test_link_mode_returns_resource_link(data_dir):
+    """Link mode streams the document to the storage directory and returns only a resource link."""
+    result = generate_compliance_doc(COMPLIANCE_JSON, response_mode="link")
+
+    assert result[1].type == "resource_link"
+    assert result[1].name.startswith("Tool_Test_Model_")
+    assert result[1].size == os.path.getsize(os.path.join(data_dir, result[1].name))
+    assert f"/download/{result[1].name}" in result[0].text
+
+
+def test_invalid_response_mode_is_rejected():
+    """Unknown response modes return an error."""
+    result = generate_compliance_doc(COMPLIANCE_JSON, response_mode="inline")
+
+    assert len(result) == 1
+    assert "Invalid response_mode" in result[0].text
@@ -0,0 +1,140 @@
+"""Tests for server-side derivation of dependent compliance answers."""
+
+import json
+import os
+
+import pytest
+
+from derived_answers import DERIVED_FIELDS, SIZE_BRACKETS, derive_answers, parse_parameter_count
+from server import generate_compliance_doc, revise_compliance_doc
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("7.3*10^10 parameters", 7.3e10),
+    ("7.3 × 10^10", 7.3e10),
+    ("7.3e10", 7.3e10),
+    ("70B", 70e9),
+    ("70 billion parameters", 70e9),
+    ("124M parameters", 124e6),
+    ("~1.7 trillion", 1.7e12),
+    ("7,000,000,000", 7e9),
+    ("Llama 3.1 8B", 8e9),
+    ("Not disclosed", None),
+    ("", None),
+    # Several different counts are ambiguous
+    ("46.7B total parameters, 12.9B active", None),
+    ("8x7B (46.7B total)", None),
+    # Mixture-of-experts notation is not multiplied out
+    ("8x7B", None),
+    ("Mixtral 8 × 22B", None),
+])
+def test_parse_parameter_count(text, expected):
+    assert parse_parameter_count(text) == expected
+
+
+def brackets(answers):
+    return [target for target, _, _ in SIZE_BRACKETS if answers[target] == "yes"]
+
+
+@pytest.mark.parametrize("size, bracket", [
+    ("500M", "total_model_size_500m"),
+    ("500000001", "total_model_size_5b"),
+    ("7B", "total_model_size_15b"),
+    ("7.3*10^10", "total_model_size_100b"),
+    ("1T", "total_model_size_1t"),
+    ("1.8T", "total_model_size_max"),
+])
+def test_size_brackets(size, bracket):
+    """Exactly one bracket is yes; upper bounds are inclusive."""
+    answers = derive_answers({"total_model_size": size}).answers
+    assert brackets(answers) == [bracket]
+    assert all(answers[target] == "no" for target, _, _ in SIZE_BRACKETS if target != bracket)
+
+
+def test_modality_checks():
+    result = derive_answers({
+        "input_modalities_text_max": "128k tokens",
+        "input_modalities_images_max": "N/A",
+        "output_modalities_other_max": "n/a",
+        "input_modalities_other_max": "3D point clouds up to 1M points",
+    })
+    assert result.derived == {
+        "input_modalities_text_check": "yes",
+        "input_modalities_images_check": "no",
+        "output_modalities_other_check": "N/A",
+    }
+    # The "other" check names the modality, which can't be derived
+    assert "input_modalities_other_check" not in result.answers
+
+
+def test_missing_or_unparseable_sources_leave_answers_untouched():
+    answers = {"total_model_size": "Not disclosed", "total_model_size_15b": "yes", "input_modalities_text_check": "yes"}
+    result = derive_answers(answers)
+    assert result.answers == answers
+    assert result.derived == {} and result.conflicts == []
+
+
+def test_conflicts_are_reported_and_derived_value_wins():
+    answers = {
+        "total_model_size": "70B",
+        "total_model_size_50b": "yes",
+        "total_model_size_100b": "Yes",
+        "input_modalities_images_max": "N/A",
+        "input_modalities_images_check": "yes",
+        "output_modalities_other_max": "N/A",
+        "output_modalities_other_check": "no",
+    }
+    result = derive_answers(answers)
+    assert result.conflicts == [
+        {"question_id": "total_model_size_50b", "given": "yes", "derived": "no", "source": "total_model_size"},
+        {"question_id": "input_modalities_images_check", "given": "yes", "derived": "no",
+         "source": "input_modalities_images_max"},
+    ]
+    assert result.answers["total_model_size_50b"] == "no"
+    assert result.answers["input_modalities_images_check"] == "no"
+    # Input is not modified
+    assert answers["total_model_size_50b"] == "yes"
+
+
+def test_derived_fields_exist_in_questions():
+    with open(os.path.join(os.path.dirname(__file__), "..", "questions.json")) as f:
+        ids = {q["id"] for q in json.load(f)}
+    assert set(DERIVED_FIELDS) <= ids
+
+
+def test_generate_compliance_doc_derives_and_reports_conflicts(data_dir):
+    result = generate_compliance_doc(json.dumps({
+        "model_name": "Derived Model",
+        "total_model_size": "7.3*10^10 parameters",
+        "total_model_size_50b": "yes",
+        "input_modalities_text_max": "8192 tokens",
+    }), response_mode="link")
+    text = result[0].text
+    assert "DERIVED ANSWERS: 9 fields" in text
+    assert "- total_model_size_50b: sent 'yes', derived 'no' from total_model_size" in text
+
+    document_id = text.split("DOCUMENT ID: ")[1].split()[0]
+    with open(os.path.join(data_dir, f"{document_id}.answers.json")) as f:
+        answers = json.load(f)["answers"]
+    assert brackets(answers) == ["total_model_size_100b"]
+    assert answers["input_modalities_text_check"] == "yes"
+
+
+def test_generate_compliance_doc_rejects_non_object():
+    result = generate_compliance_doc(json.dumps(["not", "an", "object"]))
+    assert result[0].text.startswith("Error:")
+
+
+def test_revision_rederives_dependent_answers():
+    text = generate_compliance_doc(json.dumps({"model_name": "Derived Rev", "total_model_size": "7B"}),
+                                   response_mode="link")[0].text
+    document_id = text.split("DOCUMENT ID: ")[1].split()[0]
+
+    revised = revise_compliance_doc(document_id, json.dumps({"total_model_size": "70B"}), response_mode="link")[0].text
+    changed = revised.split("CHANGED ANSWERS: ")[1].splitlines()[0].split(", ")
+    assert sorted(changed) == ["total_model_size", "total_model_size_100b", "total_model_size_15b"]
+    # The brackets derived for version 1 aren't reported as conflicting with the new size
+    assert "CONFLICTS" not in revised
+
+    revised = revise_compliance_doc(document_id, json.dumps({"total_model_size_15b": "yes"}), response_mode="link")[0].text
+    assert "- total_model_size_15b: sent 'yes', derived 'no'" in revised
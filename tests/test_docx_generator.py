@@ -0,0 +1,184 @@
+"""Unit tests for DOCX template filling and the compiled placeholder index."""
+
+import io
+import os
+import shutil
+import zipfile
+
+import pytest
+from docx import Document
+from docx.text.paragraph import Paragraph
+
+from docx_generator import (
+    compile_template,
+    fill_template,
+    fill_template_xml,
+    get_compiled_template,
+    iter_paragraph_elements,
+)
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "default_template.docx")
+
+
+def _all_text(docx_bytes: bytes) -> list[str]:
+    """Return the text of every paragraph (including table cells) in document order."""
+    doc = Document(io.BytesIO(docx_bytes))
+    return [Paragraph(p, None).text for p in iter_paragraph_elements(doc)]
+
+
+@pytest.fixture
+def small_template(tmp_path):
+    """Template with body placeholders, a table and a nested table."""
+    doc = Document()
+    doc.add_paragraph("Name: {{model_name}}")
+    doc.add_paragraph("Unknown: {{not_provided}}")
+    table = doc.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Text input: {{input_check}}"
+    nested = table.rows[0].cells[1].add_table(rows=1, cols=1)
+    nested.rows[0].cells[0].text = "{{model_name}} / {{size}}"
+    path = tmp_path / "template.docx"
+    doc.save(path)
+    return str(path)
+
+
+def test_compile_template_indexes_nested_tables(small_template):
+    """Compiled index covers body paragraphs, table cells and nested table cells."""
+    compiled = compile_template(Document(small_template))
+
+    assert compiled.keys == {"model_name", "not_provided", "input_check", "size"}
+    assert [keys for _, keys in compiled.slots] == [
+        ("model_name",), ("not_provided",), ("input_check",), ("model_name", "size")
+    ]
+
+
+def test_compiled_slot_paths_address_their_paragraphs(small_template):
+    """Each slot's path leads from the body straight to the paragraph holding its keys."""
+    doc = Document(small_template)
+    for path, keys in compile_template(doc).slots:
+        element = doc.element.body
+        for index in path:
+            element = element[index]
+        text = Paragraph(element, None).text
+        assert all(f"{{{{{key}}}}}" in text for key in keys)
+
+
+def test_fill_template_replaces_placeholders(small_template):
+    """Values are substituted everywhere and yes/no become checkboxes."""
+    buf = io.BytesIO()
+    fill_template(small_template, buf, {"model_name": "Llama", "input_check": "Yes", "size": "7B"})
+
+    text = _all_text(buf.getvalue())
+    assert "Name: Llama" in text
+    assert "Text input: ☑" in text
+    assert "Llama / 7B" in text
+
+
+def test_fill_template_leaves_unknown_placeholders(small_template):
+    """Placeholders without a matching key are left untouched."""
+    buf = io.BytesIO()
+    fill_template(small_template, buf, {"model_name": "Llama"})
+
+    assert "Unknown: {{not_provided}}" in _all_text(buf.getvalue())
+
+
+def test_fill_template_accepts_file_like_template(small_template):
+    """A file-like template is compiled per call instead of cached."""
+    with open(small_template, "rb") as f:
+        template_stream = io.BytesIO(f.read())
+    buf = io.BytesIO()
+    fill_template(template_stream, buf, {"model_name": "Mistral"})
+
+    assert "Name: Mistral" in _all_text(buf.getvalue())
+
+
+def test_compiled_template_cached_until_mtime_changes(small_template, tmp_path):
+    """The index is reused for an unchanged file and recompiled when it is modified."""
+    first = get_compiled_template(small_template)
+    assert get_compiled_template(small_template) is first
+
+    doc = Document(small_template)
+    doc.add_paragraph("Added: {{license_link}}")
+    doc.save(small_template)
+    stat = os.stat(small_template)
+    os.utime(small_template, (stat.st_atime, stat.st_mtime + 10))
+
+    second = get_compiled_template(small_template)
+    assert second is not first
+    assert "license_link" in second.keys
+
+
+def test_default_template_fills_every_placeholder(tmp_path):
+    """Filling the shipped template with every question id leaves no placeholders behind."""
+    template_copy = tmp_path / "default_template.docx"
+    shutil.copy(TEMPLATE_PATH, template_copy)
+    compiled = get_compiled_template(str(template_copy))
+    data = {key: "answer" for key in compiled.keys}
+
+    buf = io.BytesIO()
+    fill_template(str(template_copy), buf, data)
+
+    assert not any("{{" in t for t in _all_text(buf.getvalue()))
+
+
+# XML streaming fast path
+
+def _split_run_template(path):
+    """Template whose placeholder is split over three runs with distinct formatting."""
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    paragraph.add_run("Size: ")
+    paragraph.add_run("{{")
+    bold = paragraph.add_run("total_model_size")
+    bold.bold = True
+    paragraph.add_run("}} params")
+    doc.sections[0].header.paragraphs[0].text = "Header {{model_name}}"
+    doc.save(path)
+
+
+def test_fill_template_xml_matches_python_docx_path(tmp_path):
+    """Both fill paths produce the same text for the shipped template."""
+    template_copy = tmp_path / "default_template.docx"
+    shutil.copy(TEMPLATE_PATH, template_copy)
+    keys = sorted(get_compiled_template(str(template_copy)).keys)
+    data = {key: ["yes", "no", f"Value <{key}> & more\nsecond line"][i % 3] for i, key in enumerate(keys)}
+
+    docx_buf = io.BytesIO()
+    fill_template(str(template_copy), docx_buf, data)
+    xml_buf = io.BytesIO()
+    fill_template_xml(str(template_copy), xml_buf, data)
+
+    assert _all_text(xml_buf.getvalue()) == _all_text(docx_buf.getvalue())
+
+
+def test_fill_template_xml_copies_untouched_parts(tmp_path):
+    """Only the document body is rewritten; every other part is byte-identical."""
+    template_copy = tmp_path / "default_template.docx"
+    shutil.copy(TEMPLATE_PATH, template_copy)
+    buf = io.BytesIO()
+    fill_template_xml(str(template_copy), buf, {"model_name": "Llama"})
+
+    with zipfile.ZipFile(template_copy) as original, zipfile.ZipFile(buf) as filled:
+        assert filled.namelist() == original.namelist()
+        changed = [n for n in original.namelist() if original.read(n) != filled.read(n)]
+    assert changed == ["word/document.xml"]
+
+
+def test_fill_template_xml_handles_split_runs(tmp_path):
+    """A placeholder split across runs is replaced and the first run keeps its formatting."""
+    path = tmp_path / "split.docx"
+    _split_run_template(path)
+    buf = io.BytesIO()
+    fill_template_xml(str(path), buf, {"total_model_size": "7.3*10^10", "model_name": "Llama"})
+
+    doc = Document(io.BytesIO(buf.getvalue()))
+    paragraph = doc.paragraphs[0]
+    assert paragraph.text == "Size: 7.3*10^10 params"
+    assert [r.text for r in paragraph.runs] == ["Size: ", "7.3*10^10", "", " params"]
+    assert doc.sections[0].header.paragraphs[0].text == "Header Llama"
+
+
+def test_fill_template_xml_rejects_control_characters(small_template):
+    """Values that cannot be stored in XML raise like the python-docx path."""
+    with pytest.raises(ValueError):
+        fill_template_xml(small_template, io.BytesIO(), {"model_name": "bad\x00value"})
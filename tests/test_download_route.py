@@ -0,0 +1,104 @@
+"""Tests for conditional, ranged and precompressed downloads."""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+import pytest
+from starlette.testclient import TestClient
+
+import server
+from question_schema import QuestionSchema
+
+
+CITATIONS = json.dumps({"citations": [
+    {"question_id": f"Q{i}", "question_text": f"Question {i}?", "answer": f"Answer {i} " * 20,
+     "confidence": "NOT FOUND", "reasoning": "Not in the model card " * 5}
+    for i in range(30)
+]})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    schema = QuestionSchema.from_json(json.dumps([{"id": f"Q{i}"} for i in range(30)]))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+    return TestClient(server.mcp.streamable_http_app())
+
+
+def make_report(model_name="Download Test"):
+    result = server.generate_source_report(CITATIONS, model_name=model_name, response_mode="link", verify_quotes=False)
+    filename = result[1].name
+    with open(os.path.join(server.DATA_DIR, filename), "rb") as f:
+        return server.build_download_link(filename), f.read()
+
+
+def test_strong_etag_and_304(client):
+    link, content = make_report()
+    response = client.get(link)
+    assert response.status_code == 200 and response.content == content
+    etag = response.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(link, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    response = client.get(link, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200 and response.content == content
+
+
+def test_content_addressed_names_are_immutable(client):
+    link, _ = make_report()
+    cache_control = client.get(link).headers["cache-control"]
+    max_age = int(re.search(r"max-age=(\d+)", cache_control).group(1))
+    assert cache_control.startswith("public") and cache_control.endswith("immutable")
+    assert server.get_expiry_index().retention - 60 <= max_age <= server.get_expiry_index().retention
+
+    # Randomly named documents are revalidated instead
+    server.write_artifact("Download_Test_abc123.docx", lambda f: f.write(b"docx"))
+    link = server.build_download_link("Download_Test_abc123.docx")
+    assert client.get(link).headers["cache-control"] == "no-cache"
+
+
+def test_range_requests(client):
+    link, content = make_report()
+    response = client.get(link, headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 0-99/{len(content)}"
+    assert response.content == content[:100]
+
+    # Resuming: the rest of the file, as long as it is still the same file
+    etag = response.headers["etag"]
+    response = client.get(link, headers={"Range": "bytes=100-", "If-Range": etag})
+    assert response.status_code == 206 and response.content == content[100:]
+
+    response = client.get(link, headers={"Range": "bytes=100-", "If-Range": '"stale"'})
+    assert response.status_code == 200 and response.content == content
+
+    assert client.get(link, headers={"Range": f"bytes={len(content) + 10}-"}).status_code == 416
+
+
+def test_precompressed_variant(client, monkeypatch, data_dir):
+    monkeypatch.setattr(server, "PRECOMPRESS_ARTIFACTS", True)
+    link, content = make_report("Precompressed Test")
+    filename = link.split("/download/")[1].split("?")[0]
+    gzip_path = os.path.join(data_dir, f"{filename}.gz")
+    with open(gzip_path, "rb") as f:
+        compressed = f.read()
+    assert gzip.decompress(compressed) == content and len(compressed) < len(content)
+    assert server.get_expiry_index().expires_at(f"{filename}.gz") is not None
+
+    response = client.get(link, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(compressed)
+    assert response.content == content
+
+    response = client.get(link, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == content
@@ -0,0 +1,88 @@
+"""Tests for signed download links."""
+
+import os
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+import server
+from download_signing import DownloadSigner, InvalidSignature, LinkExpired, load_or_create_key, signer_from_env
+
+
+def parse(query: str) -> tuple[str, str]:
+    params = dict(part.split("=", 1) for part in query.split("&"))
+    return params["expires"], params["signature"]
+
+
+def test_sign_and_verify():
+    signer = DownloadSigner([b"secret"])
+    expires, signature = parse(signer.sign("report.pdf", 2000))
+    assert expires == "2000"
+    signer.verify("report.pdf", expires, signature, now=1000)
+
+    with pytest.raises(InvalidSignature):
+        signer.verify("other.pdf", expires, signature, now=1000)
+    with pytest.raises(InvalidSignature):
+        signer.verify("report.pdf", "3000", signature, now=1000)
+    with pytest.raises(InvalidSignature):
+        DownloadSigner([b"other"]).verify("report.pdf", expires, signature, now=1000)
+    with pytest.raises(InvalidSignature):
+        signer.verify("report.pdf", None, None, now=1000)
+    with pytest.raises(LinkExpired):
+        signer.verify("report.pdf", expires, signature, now=2001)
+
+
+def test_key_rotation():
+    old = DownloadSigner([b"old"])
+    rotated = DownloadSigner([b"new", b"old"])
+    # Links signed with the old key still verify; new links use the new key
+    rotated.verify("a.pdf", *parse(old.sign("a.pdf", 2000)), now=1000)
+    with pytest.raises(InvalidSignature):
+        old.verify("a.pdf", *parse(rotated.sign("a.pdf", 2000)), now=1000)
+
+
+def test_generated_key_is_kept(tmp_path, monkeypatch):
+    key = load_or_create_key(str(tmp_path))
+    assert len(key) == 64 and load_or_create_key(str(tmp_path)) == key
+    assert os.listdir(tmp_path) == [".download_signing_key"]
+
+    monkeypatch.delenv("DOWNLOAD_SIGNING_KEY", raising=False)
+    assert signer_from_env(str(tmp_path)).keys == [key]
+    monkeypatch.setenv("DOWNLOAD_SIGNING_KEY", "new, old")
+    assert signer_from_env(str(tmp_path)).keys == [b"new", b"old"]
+
+
+@pytest.fixture
+def signed_doc():
+    filename = "Signed_abc123.docx"
+    server.write_artifact(filename, lambda f: f.write(b"docx"))
+    return filename
+
+
+def test_server_creates_the_key_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.delenv("DOWNLOAD_SIGNING_KEY", raising=False)
+    monkeypatch.setattr(server, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "_download_signer", None)
+    assert os.listdir(tmp_path) == []
+    assert server.get_download_signer().keys == [load_or_create_key(str(tmp_path))]
+
+
+def test_non_ascii_digits_are_not_a_valid_expiry():
+    signer = DownloadSigner([b"secret"])
+    with pytest.raises(InvalidSignature):
+        signer.verify("report.pdf", "²", "x", now=1000)
+
+
+def test_download_route_checks_signature(signed_doc):
+    client = TestClient(server.mcp.streamable_http_app())
+
+    link = server.build_download_link(signed_doc)
+    assert client.get(link).content == b"docx"
+    assert client.get(f"/download/{signed_doc}").status_code == 403
+    assert client.get(link.replace("signature=", "signature=x")).status_code == 403
+    assert client.get(f"/download/{signed_doc}?expires=%C2%B2&signature=x").status_code == 403
+
+    # Expired links are refused before the storage is looked at
+    query = server.get_download_signer().sign("Missing_abc123.docx", time.time() - 1)
+    assert client.get(f"/download/Missing_abc123.docx?{query}").status_code == 410
@@ -0,0 +1,272 @@
+"""Tests for prefilling compliance answers from Hub metadata and safetensors headers.
+
+The Hub is replaced by a local HTTP server serving files from a temporary directory
+with HTTP range support, which records how many bytes it sent.
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import server
+from citation_schema import validate_citation_json
+from derived_answers import parse_parameter_count
+from quote_verifier import SourceTextCache
+from hub_prefill import (
+    HEADER_PREFETCH_BYTES,
+    count_safetensors_parameters,
+    prefill_from_hub,
+    read_safetensors_header,
+    repo_file_url,
+)
+
+
+REPO_ID = "org/model"
+
+QUESTION_TEXTS = {
+    "license_link": "What is the link to the license?",
+    "model_dependencies": "What are the model dependencies?",
+    "total_model_size": "What is the size of the text model?",
+    **{f"{direction}_modalities_{modality}_check": f"{direction} {modality}?"
+       for direction in ("input", "output") for modality in ("text", "images", "audio", "video")},
+}
+
+
+def write_safetensors(path, tensors: dict, data_bytes: int = 0):
+    """Write a safetensors file with the given tensor shapes; the data section is sparse."""
+    header = {"__metadata__": {"format": "pt"}}
+    offset = 0
+    for name, (dtype, shape) in tensors.items():
+        size = 2
+        for dim in shape:
+            size *= dim
+        header[name] = {"dtype": dtype, "shape": shape, "data_offsets": [offset, offset + size]}
+        offset += size
+    encoded = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        f.truncate(8 + len(encoded) + max(offset, data_bytes))
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves files below the server's root with (single) byte range support."""
+
+    def do_GET(self):
+        match = re.match(r"^/([^/]+/[^/]+)/resolve/[^/]+/(.+)$", self.path)
+        path = os.path.join(self.server.root, match.group(2)) if match else ""
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.server.ranges:
+            first, last = re.match(r"bytes=(\d+)-(\d*)", range_header).groups()
+            start, end = int(first), min(int(last or size - 1), size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            try:
+                while remaining:
+                    chunk = f.read(min(64 * 1024, remaining))
+                    self.wfile.write(chunk)
+                    self.server.bytes_sent += len(chunk)
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        self.server.requests.append(self.path)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hub(tmp_path):
+    """Local stand-in for the Hub; yields the server (root, endpoint, counters)."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.root = str(tmp_path)
+    httpd.ranges = True
+    httpd.bytes_sent = 0
+    httpd.requests = []
+    httpd.endpoint = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_header_read_with_ranges_only(hub):
+    """A 32 MB shard is sized from its header without downloading the weights."""
+    write_safetensors(os.path.join(hub.root, "model.safetensors"),
+                      {"embed": ("BF16", [4096, 4096]), "norm": ("F32", [4096])}, data_bytes=32 * 1024 * 1024)
+    counts = count_safetensors_parameters([repo_file_url(REPO_ID, "model.safetensors", endpoint=hub.endpoint)])
+    assert counts == {"BF16": 4096 * 4096, "F32": 4096}
+    assert hub.bytes_sent <= HEADER_PREFETCH_BYTES
+    assert len(hub.requests) == 1
+
+
+def test_large_header_takes_second_request(hub):
+    tensors = {f"model.layers.{i}.mlp.very_long_projection_name.weight": ("BF16", [64, 64]) for i in range(3000)}
+    write_safetensors(os.path.join(hub.root, "big.safetensors"), tensors)
+    header = read_safetensors_header(repo_file_url(REPO_ID, "big.safetensors", endpoint=hub.endpoint))
+    assert len(header) == 3001
+    assert len(hub.requests) == 2
+
+
+def test_server_without_range_support(hub):
+    """If the server ignores Range, reading stops after the header anyway."""
+    hub.ranges = False
+    write_safetensors(os.path.join(hub.root, "model.safetensors"), {"w": ("F16", [10, 10])}, data_bytes=32 * 1024 * 1024)
+    header = read_safetensors_header(repo_file_url(REPO_ID, "model.safetensors", endpoint=hub.endpoint))
+    assert header["w"]["shape"] == [10, 10]
+
+
+def test_invalid_file_rejected(hub):
+    with open(os.path.join(hub.root, "bad.safetensors"), "wb") as f:
+        f.write(b"\xff" * 16)
+    with pytest.raises(ValueError):
+        read_safetensors_header(repo_file_url(REPO_ID, "bad.safetensors", endpoint=hub.endpoint))
+
+
+def test_prefill_from_metadata_and_sharded_weights(hub):
+    # Two indexed shards plus a consolidated copy of the same weights that must not be counted
+    write_safetensors(os.path.join(hub.root, "model-00001-of-00002.safetensors"), {"a": ("BF16", [1000, 1000])})
+    write_safetensors(os.path.join(hub.root, "model-00002-of-00002.safetensors"), {"b": ("BF16", [1000, 2000])})
+    write_safetensors(os.path.join(hub.root, "consolidated.safetensors"), {"a": ("BF16", [1000, 3000])})
+    with open(os.path.join(hub.root, "model.safetensors.index.json"), "w") as f:
+        json.dump({"weight_map": {"a": "model-00001-of-00002.safetensors", "b": "model-00002-of-00002.safetensors"}}, f)
+    files = ["README.md", "model.safetensors.index.json", "consolidated.safetensors",
+             "model-00001-of-00002.safetensors", "model-00002-of-00002.safetensors"]
+    card_data = {"license": "other", "license_link": "LICENSE.txt", "base_model": ["org/base-7b"],
+                 "pipeline_tag": "image-text-to-text"}
+
+    prefill = prefill_from_hub(REPO_ID, card_data, files, QUESTION_TEXTS, endpoint=hub.endpoint)
+
+    answers = prefill["answers"]
+    assert prefill["errors"] == []
+    assert answers["license_link"] == f"{hub.endpoint}/{REPO_ID}/blob/main/LICENSE.txt"
+    assert answers["model_dependencies"] == "org/base-7b"
+    assert answers["total_model_size"] == "3.00*10^6 parameters"
+    assert parse_parameter_count(answers["total_model_size"]) == 3e6
+    assert answers["input_modalities_images_check"] == "yes"
+    assert answers["input_modalities_audio_check"] == "no"
+    assert answers["output_modalities_text_check"] == "yes"
+    assert answers["output_modalities_images_check"] == "no"
+
+    # Citations validate against the report schema; metadata reads are DIRECT
+    report = validate_citation_json(json.dumps({"citations": prefill["citations"]}))
+    confidence = {c.question_id: c.confidence.value for c in report.citations}
+    assert confidence["total_model_size"] == "DIRECT"
+    assert confidence["model_dependencies"] == "DIRECT"
+    assert confidence["input_modalities_audio_check"] == "INFERRED"
+    size_citation = next(c for c in prefill["citations"] if c["question_id"] == "total_model_size")
+    assert "3,000,000 parameters in 2 safetensors file(s)" in size_citation["source_quote"]
+
+
+def test_prefill_only_answers_known_questions_and_reports_errors(hub):
+    files = ["LICENSE", "model.safetensors"]  # the shard is missing on the server
+    prefill = prefill_from_hub(REPO_ID, {"base_model": "org/base"}, files, {"license_link": "Link?"},
+                               endpoint=hub.endpoint)
+    assert prefill["answers"] == {"license_link": f"{hub.endpoint}/{REPO_ID}/blob/main/LICENSE"}
+    assert prefill["errors"] == []
+
+    prefill = prefill_from_hub(REPO_ID, {}, files, {"total_model_size": "Size?"}, endpoint=hub.endpoint)
+    assert prefill["answers"] == {}
+    assert prefill["errors"] and "safetensors" in prefill["errors"][0]
+
+
+def write_raw_safetensors(path, header):
+    encoded = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(encoded)) + encoded)
+
+
+def test_malformed_metadata_is_ignored(hub):
+    card_data = {"license_link": ["LICENSE.txt"], "base_model": {"name": "org/base"}, "pipeline_tag": ["text-generation"]}
+    prefill = prefill_from_hub(REPO_ID, card_data, ["LICENSE"], QUESTION_TEXTS, endpoint=hub.endpoint)
+    assert prefill["answers"] == {"license_link": f"{hub.endpoint}/{REPO_ID}/blob/main/LICENSE"}
+
+    assert prefill_from_hub(REPO_ID, ["not", "a", "dict"], [], QUESTION_TEXTS, endpoint=hub.endpoint)["answers"] == {}
+
+
+@pytest.mark.parametrize("header", [
+    [1, 2, 3],
+    {"w": ["F16", [10]]},
+    {"w": {"dtype": "F16", "shape": ["10"]}},
+    {"w": {"dtype": "F16", "shape": [2.5]}},
+    {"w": {"dtype": None, "shape": [10]}},
+])
+def test_invalid_headers_are_reported_as_errors(hub, header):
+    write_raw_safetensors(os.path.join(hub.root, "model.safetensors"), header)
+    prefill = prefill_from_hub(REPO_ID, {}, ["model.safetensors"], QUESTION_TEXTS, endpoint=hub.endpoint)
+    assert "total_model_size" not in prefill["answers"]
+    assert prefill["errors"] and "safetensors" in prefill["errors"][0]
+
+
+def test_packed_quantized_weights_are_not_counted(hub):
+    """GPTQ stores 8 4-bit weights per I32 element, so the shapes undercount the parameters."""
+    write_safetensors(os.path.join(hub.root, "model.safetensors"),
+                      {"qweight": ("I32", [512, 4096]), "scales": ("F16", [32, 4096])})
+    prefill = prefill_from_hub(REPO_ID, {}, ["model.safetensors"], QUESTION_TEXTS, endpoint=hub.endpoint)
+    assert "total_model_size" not in prefill["answers"]
+    assert prefill["errors"] and "packed quantized tensors (I32)" in prefill["errors"][0]
+
+
+def test_model_card_tool_survives_prefill_failures(monkeypatch):
+    class FakeCard:
+        text = "# Model\nA model."
+        content = text
+
+        class data:
+            @staticmethod
+            def to_dict():
+                return {}
+
+    def fail(*args, **kwargs):
+        raise AttributeError("'list' object has no attribute 'lstrip'")
+
+    monkeypatch.setattr(server.ModelCard, "load", lambda model_id: FakeCard)
+    monkeypatch.setattr(server, "list_repo_files", lambda model_id: ["README.md"])
+    monkeypatch.setattr(server, "prefill_from_hub", fail)
+    monkeypatch.setattr(server, "source_texts", SourceTextCache())
+
+    text = server.fetch_hf_model_card(REPO_ID)
+    assert "A model." in text and "PREFILLED ANSWERS" not in text and not text.startswith("Error")
+
+
+def test_model_card_tool_includes_prefill(hub, monkeypatch):
+    """fetch_hf_model_card appends the prefilled answers and citations."""
+    write_safetensors(os.path.join(hub.root, "model.safetensors"), {"w": ("BF16", [7000, 1000])})
+
+    class FakeCard:
+        text = "# Model\nA model."
+        content = f"---\nbase_model: org/base\npipeline_tag: text-generation\n---\n{text}"
+
+        class data:
+            @staticmethod
+            def to_dict():
+                return {"base_model": "org/base", "pipeline_tag": "text-generation"}
+
+    monkeypatch.setattr(server.ModelCard, "load", lambda model_id: FakeCard)
+    monkeypatch.setattr(server, "list_repo_files", lambda model_id: ["README.md", "model.safetensors"])
+    monkeypatch.setattr("hub_prefill.HF_ENDPOINT", hub.endpoint)
+    monkeypatch.setattr(server, "source_texts", SourceTextCache())
+
+    text = server.fetch_hf_model_card(REPO_ID)
+    assert "PREFILLED ANSWERS" in text
+    prefill = json.loads(text[text.index("{", text.index("PREFILLED ANSWERS")):])
+    assert prefill["answers"]["total_model_size"] == "7.00*10^6 parameters"
+    assert prefill["answers"]["model_dependencies"] == "org/base"
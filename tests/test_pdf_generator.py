@@ -715,3 +715,96 @@ def test_pdf_column_widths_sum_to_page_width():
     col_widths = [0.7, 1.2, 1.3, 1.55, 0.8, 1.0, 0.95]
     total = sum(col_widths)
     assert abs(total - 7.5) < 0.001, f"Column widths sum to {total}, expected 7.5"
+
+
+def test_pdf_chunked_tables_keep_every_citation(many_citations):
+    """Reports larger than chunk_rows are split into several tables without losing rows."""
+    buf = BytesIO()
+    generate_source_report_pdf(buf, many_citations, chunk_rows=7)
+    buf.seek(0)
+
+    pdf = PdfReader(buf)
+    all_text = ' '.join(' '.join(page.extract_text().split()) for page in pdf.pages)
+    for citation in many_citations:
+        assert f"Question {citation['question_id'][1:]}:" in all_text
+
+
+def test_pdf_chunking_builds_long_tables(many_citations):
+    """Chunked mode builds one LongTable per chunk; small reports stay a single Table."""
+    from reportlab.platypus import LongTable, Table
+    from reportlab.lib.styles import ParagraphStyle
+    from pdf_generator import _build_citation_tables, _ensure_fonts_registered
+
+    # Paragraphs need the font registered; generate_source_report_pdf normally does this
+    _ensure_fonts_registered()
+    style = ParagraphStyle('Test', fontName='DejaVuSans')
+    chunked = _build_citation_tables(many_citations, ['h'] * 7, style, chunk_rows=7)
+    assert len(chunked) == 5
+    assert all(isinstance(t, LongTable) for t in chunked)
+    assert sum(len(t._cellvalues) - 1 for t in chunked) == len(many_citations)
+
+    single = _build_citation_tables(many_citations, ['h'] * 7, style, chunk_rows=0)
+    assert len(single) == 1 and type(single[0]) is Table
+
+
+def test_pdf_confidence_colors_batched_by_run():
+    """Consecutive rows with the same confidence share one BACKGROUND command."""
+    from pdf_generator import _confidence_style_commands
+
+    levels = ['DIRECT', 'DIRECT', 'DIRECT', 'INFERRED', 'UNKNOWN', 'DIRECT']
+    commands = _confidence_style_commands([{'confidence': level} for level in levels])
+
+    assert commands == [
+        ('BACKGROUND', (0, 1), (-1, 3), CONFIDENCE_COLORS['DIRECT']),
+        ('BACKGROUND', (0, 4), (-1, 4), CONFIDENCE_COLORS['INFERRED']),
+        ('BACKGROUND', (0, 6), (-1, 6), CONFIDENCE_COLORS['DIRECT']),
+    ]
+
+
+def test_pdf_fonts_registered_lazily():
+    """Importing the module doesn't load the TTF fonts; the first report does."""
+    import subprocess
+    import sys
+
+    code = (
+        "from reportlab.pdfbase import pdfmetrics\n"
+        "import pdf_generator\n"
+        "print('DejaVuSans' in pdfmetrics.getRegisteredFontNames())\n"
+        "pdf_generator.generate_source_report_pdf(__import__('io').BytesIO(), [])\n"
+        "print('DejaVuSans' in pdfmetrics.getRegisteredFontNames())\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+
+    assert out.split() == ['False', 'True']
+
+
+def test_pdf_concurrent_reports_share_styles(many_citations):
+    """Reports rendered from several threads at once (sharing module styles) are identical in content."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def render(_):
+        buf = BytesIO()
+        generate_source_report_pdf(buf, many_citations)
+        buf.seek(0)
+        return [page.extract_text() for page in PdfReader(buf).pages]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(render, range(4)))
+
+    assert all(r == results[0] for r in results)
+
+
+def test_pdf_deterministic_with_fixed_timestamp(many_citations):
+    """With generated_at the output is byte-identical across renders and shows that timestamp."""
+    from datetime import datetime
+
+    generated_at = datetime(2025, 1, 2, 3, 4)
+    first, second = BytesIO(), BytesIO()
+    generate_source_report_pdf(first, many_citations, generated_at=generated_at)
+    generate_source_report_pdf(second, many_citations, generated_at=generated_at)
+
+    assert first.getvalue() == second.getvalue()
+    first.seek(0)
+    pdf = PdfReader(first)
+    assert all('2025-01-02 03:04' in page.extract_text() for page in pdf.pages)
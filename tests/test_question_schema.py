@@ -0,0 +1,159 @@
+"""Tests for the cached questions schema and the prompts built from it."""
+
+import json
+import os
+
+import pytest
+
+import server
+from question_schema import DEFAULT_SECTION, QUESTION_ENCODINGS, QuestionSchema, encode_questions, get_question_schema
+
+
+QUESTIONS = [
+    {"id": "Q1", "question": "Name?", "description": "desc", "audience": ["AIO", "NCA"]},
+    {"id": "Q2", "question": "Size?", "description": "desc", "audience": ["AIO"]},
+    {"id": "Q3", "question": "License?", "description": "desc", "audience": ["DP", "AIO"]},
+]
+
+
+@pytest.fixture
+def questions_file(tmp_path):
+    path = tmp_path / "questions.json"
+    path.write_text(json.dumps(QUESTIONS, indent=4))
+    return path
+
+
+def test_schema_indexes(questions_file):
+    """Ids keep file order; the audience index lists each audience's ids."""
+    schema = get_question_schema(str(questions_file))
+    assert schema.ids == ("Q1", "Q2", "Q3")
+    assert schema.id_set == {"Q1", "Q2", "Q3"}
+    assert schema.by_audience == {"AIO": ("Q1", "Q2", "Q3"), "NCA": ("Q1",), "DP": ("Q3",)}
+    assert schema.text == questions_file.read_text()
+
+
+def test_schema_is_immutable(questions_file):
+    schema = get_question_schema(str(questions_file))
+    with pytest.raises(AttributeError):
+        schema.ids = ()
+    with pytest.raises(TypeError):
+        schema.questions[0]["id"] = "changed"
+    with pytest.raises(TypeError):
+        schema.by_audience["AIO"] = ()
+
+
+def test_schema_is_cached_until_file_changes(questions_file):
+    first = get_question_schema(str(questions_file))
+    assert get_question_schema(str(questions_file)) is first
+
+    questions_file.write_text(json.dumps(QUESTIONS[:1]))
+    stat = os.stat(questions_file)
+    os.utime(questions_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = get_question_schema(str(questions_file))
+    assert reloaded is not first
+    assert reloaded.ids == ("Q1",)
+
+
+def test_invalid_schema_rejected():
+    with pytest.raises(ValueError):
+        QuestionSchema.from_json(json.dumps({"id": "Q1"}))
+    with pytest.raises(ValueError):
+        QuestionSchema.from_json(json.dumps([{"question": "no id"}]))
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        get_question_schema(str(tmp_path / "missing.json"))
+
+
+def test_prompts_embed_schema_text_and_are_reused(monkeypatch):
+    """Both question prompts embed the file verbatim and are built once per schema version."""
+    schema = QuestionSchema.from_json(json.dumps(QUESTIONS))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+
+    requirements = server.get_compliance_requirements()
+    assert schema.text in requirements
+    assert "generate_compliance_doc" in requirements
+    assert server.get_compliance_requirements() is requirements
+
+    resource = server.get_compliance_questions()
+    assert schema.text in resource
+    assert resource != requirements
+    assert server.get_compliance_questions() is resource
+
+
+def test_prompts_match_questions_file():
+    """The default schema is the repository's questions.json."""
+    with open("questions.json") as f:
+        text = f.read()
+    assert get_question_schema().text == text
+    assert text in server.get_compliance_requirements()
+
+
+SECTIONED = [
+    {"id": "Q1", "section": "General", "question": "Name?", "description": "desc", "audience": ["AIO", "DP"]},
+    {"id": "Q2", "section": "Data", "question": "Sources?", "description": "desc", "audience": ["AIO"]},
+    {"id": "Q3", "section": "General", "question": "Version?", "description": "desc", "audience": ["NCA"]},
+]
+
+
+def test_sections_index():
+    schema = QuestionSchema.from_json(json.dumps(SECTIONED))
+    assert schema.sections == {"General": ("Q1", "Q3"), "Data": ("Q2",)}
+    # Questions without a section share a default group
+    assert list(QuestionSchema.from_json(json.dumps(QUESTIONS)).sections) == ["General"]
+
+
+@pytest.mark.parametrize("encoding", QUESTION_ENCODINGS)
+def test_encodings_keep_every_question(encoding):
+    schema = QuestionSchema.from_json(json.dumps(SECTIONED, indent=4))
+    encoded = encode_questions(schema, encoding)
+    for q in SECTIONED:
+        assert q["id"] in encoded and q["question"] in encoded
+    if encoding != "full":
+        assert len(encoded) < len(schema.text)
+
+
+def test_compact_and_grouped_encodings():
+    schema = QuestionSchema.from_json(json.dumps(SECTIONED))
+    assert json.loads(encode_questions(schema, "compact")) == [
+        {"id": "Q1", "question": "Name?"}, {"id": "Q2", "question": "Sources?"}, {"id": "Q3", "question": "Version?"}]
+    assert json.loads(encode_questions(schema, "grouped")) == {
+        "General": {"Q1": "Name?", "Q3": "Version?"}, "Data": {"Q2": "Sources?"}}
+    assert json.loads(encode_questions(schema, "minified")) == SECTIONED
+
+
+def test_encoding_filters():
+    schema = QuestionSchema.from_json(json.dumps(SECTIONED))
+    assert [q["id"] for q in json.loads(encode_questions(schema, "full", ("DP", "NCA")))] == ["Q1", "Q3"]
+    assert json.loads(encode_questions(schema, "grouped", ("AIO",), "General")) == {"General": {"Q1": "Name?"}}
+    assert encode_questions(schema, "compact") is encode_questions(schema, "compact")
+    with pytest.raises(ValueError):
+        encode_questions(schema, "yaml")
+    with pytest.raises(ValueError):
+        encode_questions(schema, "full", (), "Unknown")
+
+
+def test_requirements_tool_compact_audience_and_pages(monkeypatch):
+    schema = QuestionSchema.from_json(json.dumps(SECTIONED))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+
+    text = server.get_compliance_requirements(encoding="compact", audience="nca")
+    assert '"Q3"' in text and '"Q1"' not in text and "description" not in text
+
+    first = server.get_compliance_requirements(encoding="grouped", page=1)
+    assert '"Q1"' in first and '"Q2"' not in first
+    assert "PAGE 1 of 2: General" in first and "page=2" in first
+    last = server.get_compliance_requirements(encoding="grouped", page=2)
+    assert '"Q2"' in last and "PAGE 2 of 2: Data" in last and "page=3" not in last
+
+    assert server.get_compliance_requirements(page=3).startswith("Error:")
+    assert server.get_compliance_requirements(encoding="yaml").startswith("Error:")
+    assert server.get_compliance_requirements(audience="XX").startswith("Error:")
+
+
+def test_repository_questions_have_sections():
+    schema = get_question_schema()
+    assert DEFAULT_SECTION not in schema.sections
+    assert len(server.get_compliance_requirements(encoding="compact", audience="DP")) < len(server.get_compliance_requirements()) / 2
@@ -0,0 +1,149 @@
+"""Tests for verifying citation quotes against fetched source texts."""
+
+import json
+import time
+
+import pytest
+
+import server
+from quote_verifier import SourceTextCache, normalize_words, verify_citations
+
+
+CARD = """# Model Card
+The model was trained on 2 trillion tokens of publicly available data.
+We use grouped-query attention and a context length of 8192 tokens.
+The model is released under the Apache 2.0 license.
+"""
+
+PAPER = """Section 3: Training
+Our ﬁne-tuning data consists of instruc-
+tion following examples collected from    volunteers,
+and was ﬁltered for personally identiﬁable information.
+"""
+
+
+def citation(question_id, quote, confidence="DIRECT", document=""):
+    return {"question_id": question_id, "question_text": f"{question_id}?", "answer": "a", "source_quote": quote,
+            "source_section": "", "source_document": document, "confidence": confidence, "reasoning": "Quoted"}
+
+
+@pytest.fixture
+def cache():
+    cache = SourceTextCache()
+    cache.add("https://huggingface.co/org/model", CARD)
+    cache.add("https://arxiv.org/abs/1234.5678", PAPER)
+    return cache
+
+
+def test_normalization():
+    assert normalize_words("ﬁne-tuning on instruc-\ntion “data”") == ["fine", "tuning", "on", "instruction", "data"]
+
+
+CARD_URL = "https://huggingface.co/org/model"
+PAPER_URL = "https://arxiv.org/abs/1234.5678"
+
+
+def test_exact_and_noisy_quotes_are_found(cache):
+    assert cache.match("trained on 2 trillion tokens of publicly available data", CARD_URL) == 1.0
+    # Ligatures, line-break hyphenation and whitespace differ between quote and extracted text
+    assert cache.match("Our fine-tuning data consists of instruction following examples collected from volunteers",
+                       PAPER_URL) == 1.0
+    # A trailing word the source doesn't have still matches well enough
+    score = cache.match("We use grouped-query attention and a context length of 8192 tokens overall.", CARD_URL)
+    assert 0.8 <= score < 1.0
+
+
+def test_quotes_are_only_matched_against_their_document(cache):
+    assert cache.match("trained on 2 trillion tokens of publicly available data", PAPER_URL) == 0.0
+    assert cache.match("trained on 2 trillion tokens of publicly available data", "https://example.com/other") is None
+    assert cache.match("Apache 2.0 license", f"{CARD_URL}/") == 1.0
+
+
+def test_short_quotes_must_match_verbatim(cache):
+    assert cache.match("Apache 2.0 license", CARD_URL) == 1.0
+    assert cache.match("MIT license", CARD_URL) == 0.0
+
+
+def test_verify_citations_flags_only_unverifiable_direct_quotes(cache):
+    citations = [
+        citation("found", "released under the Apache 2.0 license"),
+        citation("fabricated", "The model was trained on 15 trillion tokens of proprietary web data"),
+        citation("other_document", "released under the Apache 2.0 license", document=PAPER_URL),
+        citation("not_fetched", "The model was trained on 15 trillion tokens", document="https://example.com/blog"),
+        citation("inferred", "made up but not claimed as a direct quote", confidence="INFERRED"),
+        citation("empty", ""),
+    ]
+    unverified, checked = verify_citations(citations, cache, default_source=CARD_URL)
+    assert [entry["question_id"] for entry in unverified] == ["fabricated", "other_document"]
+    assert unverified[0]["score"] < 0.8 and unverified[0]["source_document"] == CARD_URL
+    assert checked == 3
+
+    # Without a default source, citations without a source_document aren't checked
+    unverified, checked = verify_citations(citations, cache)
+    assert [entry["question_id"] for entry in unverified] == ["other_document"] and checked == 1
+
+
+def test_cache_is_bounded_and_expires():
+    cache = SourceTextCache(max_documents=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.add(key, f"text of document {key}")
+    assert cache.keys() == ["b", "c"]
+
+    cache = SourceTextCache(ttl=0)
+    cache.add("a", "text")
+    time.sleep(0.01)
+    assert len(cache) == 0
+
+
+def test_source_report_marks_unverified_quotes(monkeypatch, cache):
+    monkeypatch.setattr(server, "source_texts", cache)
+    schema = server.QuestionSchema.from_json(json.dumps([{"id": "Q1"}, {"id": "Q2"}]))
+    monkeypatch.setattr(server, "get_question_schema", lambda: schema)
+    payload = json.dumps({"citations": [
+        citation("Q1", "released under the Apache 2.0 license"),
+        citation("Q2", "The model was trained on 15 trillion tokens of proprietary web data"),
+    ]})
+
+    result = server.generate_source_report(payload, model_name="Quote Check", model_card_id="org/model",
+                                           response_mode="link")
+    text = result[0].text
+    assert "QUOTE CHECK: 1 of 2 DIRECT quotes found in their source documents." in text
+    assert '- Q2: "The model was trained on 15 trillion tokens' in text
+
+    citations, _ = server.check_source_quotes(json.loads(payload)["citations"], "org/model")
+    assert [c["confidence"] for c in citations] == ["DIRECT", "HALLUCINATED"]
+    assert citations[1]["reasoning"].startswith(server.UNVERIFIED_QUOTE_NOTE)
+
+    # A report for a model whose card wasn't fetched isn't checked against other models' texts
+    citations, summary = server.check_source_quotes(json.loads(payload)["citations"], "other/model")
+    assert [c["confidence"] for c in citations] == ["DIRECT", "DIRECT"]
+    assert summary.startswith("QUOTE CHECK: skipped")
+
+    skipped = server.generate_source_report(payload, model_name="Quote Check", model_card_id="org/model",
+                                            response_mode="link", verify_quotes=False)
+    assert "QUOTE CHECK" not in skipped[0].text
+
+
+def test_fetched_card_is_cached(monkeypatch):
+    cache = SourceTextCache()
+    monkeypatch.setattr(server, "source_texts", cache)
+
+    class FakeCard:
+        text = CARD
+        content = f"---\nlicense: apache-2.0\npipeline_tag: text-generation\n---\n{CARD}"
+
+        class data:
+            @staticmethod
+            def to_dict():
+                return {"pipeline_tag": "text-generation"}
+
+    monkeypatch.setattr(server.ModelCard, "load", lambda model_id: FakeCard)
+    monkeypatch.setattr(server, "list_repo_files", lambda model_id: ["README.md", "LICENSE"])
+    text = server.fetch_hf_model_card("org/model")
+    assert cache.keys() == ["https://huggingface.co/org/model"]
+
+    # Quotes of the YAML metadata and the server's own prefill citations verify against the card
+    prefill = json.loads(text[text.index("{", text.index("PREFILLED ANSWERS")):])
+    assert {c["source_quote"] for c in prefill["citations"]} == {"pipeline_tag: text-generation", "Repository file: LICENSE"}
+    citations = prefill["citations"] + [citation("license", "license: apache-2.0")]
+    assert verify_citations(citations, cache, default_source=server.model_card_url("org/model"))[0] == []
@@ -0,0 +1,162 @@
+"""Tests for revision records and incremental regeneration of compliance documents."""
+
+import json
+import os
+import re
+
+import pytest
+from docx import Document
+
+import server
+from docx_generator import build_display_data, get_compiled_package, render_compiled_package, write_rendered_package
+from revision_store import RevisionStore
+from server import generate_compliance_doc, revise_compliance_doc
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "..", "templates", "default_template.docx")
+
+ANSWERS = {"model_name": "Revision Model", "legal_name": "Provider One", "input_modalities_text_check": "yes"}
+
+
+def document_text(path):
+    """Return all paragraph text of a .docx, including tables."""
+    doc = Document(path)
+    texts = [p.text for p in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                texts.extend(p.text for p in cell.paragraphs)
+    return "\n".join(texts)
+
+
+def test_store_records_version_chain(tmp_path):
+    """Each revision records the changed keys with their previous values."""
+    store = RevisionStore(str(tmp_path))
+    store.create("doc_1", "default_template", dict(ANSWERS), "doc_1.docx")
+    version, filename, record = store.reserve_version("doc_1")
+    assert (version, filename) == (2, "doc_1_v2.docx")
+    assert record["answers"] == ANSWERS
+    store.add_version("doc_1", version, {"legal_name": "Provider Two"}, filename)
+
+    loaded = store.load("doc_1")
+    assert loaded["answers"]["legal_name"] == "Provider Two"
+    assert [v["version"] for v in loaded["versions"]] == [1, 2]
+    assert loaded["versions"][1]["changes"] == {"legal_name": {"from": "Provider One", "to": "Provider Two"}}
+
+
+def test_concurrent_revisions_keep_both_versions(tmp_path):
+    """Revisions started from the same record get distinct versions and both are kept."""
+    store = RevisionStore(str(tmp_path))
+    other_worker = RevisionStore(str(tmp_path))
+    store.create("doc_1", "default_template", dict(ANSWERS), "doc_1.docx")
+
+    first = store.reserve_version("doc_1")
+    second = other_worker.reserve_version("doc_1")
+    assert first != second
+    other_worker.add_version("doc_1", second[0], {"legal_name": "Provider Three"}, second[1])
+    store.add_version("doc_1", first[0], {"model_name": "Renamed"}, first[1])
+
+    loaded = store.load("doc_1")
+    assert [(v["version"], v["filename"]) for v in loaded["versions"]] == [(1, "doc_1.docx"), (2, "doc_1_v2.docx"), (3, "doc_1_v3.docx")]
+    assert loaded["answers"]["legal_name"] == "Provider Three" and loaded["answers"]["model_name"] == "Renamed"
+
+
+def test_store_rejects_unknown_and_malformed_ids(tmp_path):
+    """Missing documents raise KeyError, ids that could escape data_dir raise ValueError."""
+    store = RevisionStore(str(tmp_path))
+    with pytest.raises(KeyError):
+        store.load("missing")
+    for document_id in ["../server", "a/b", "doc.docx", ""]:
+        with pytest.raises(ValueError):
+            store.load(document_id)
+    # Model names may contain non-ASCII letters
+    store.create("Modèle_Français_3815c2", "default_template", {}, "Modèle_Français_3815c2.docx")
+    assert store.load("Modèle_Français_3815c2")["versions"][0]["version"] == 1
+
+
+def test_cached_rendering_requires_matching_answers(tmp_path):
+    """A rendering is only reused for the answers it was made from."""
+    store = RevisionStore(str(tmp_path))
+    compiled = object()
+    store.cache_rendering("doc_1", compiled, ANSWERS, {"part": []})
+    assert store.cached_rendering("doc_1", compiled, dict(ANSWERS)) == {"part": []}
+    assert store.cached_rendering("doc_1", compiled, {**ANSWERS, "legal_name": "NEWCO"}) is None
+    assert store.cached_rendering("doc_1", object(), ANSWERS) is None
+
+
+def test_incremental_render_matches_full_render(tmp_path):
+    """Re-rendering only changed placeholders produces the same package as a full render."""
+    compiled = get_compiled_package(TEMPLATE_PATH)
+    first = render_compiled_package(compiled, build_display_data(ANSWERS))
+    changed = {**ANSWERS, "legal_name": "Provider Two"}
+
+    incremental = render_compiled_package(compiled, build_display_data(changed), first, {"legal_name"})
+    full = render_compiled_package(compiled, build_display_data(changed))
+
+    assert incremental == full
+    # Paragraphs without the changed key are reused as-is
+    reused = sum(a is b for part in first for a, b in zip(first[part], incremental[part]))
+    assert reused > 0
+
+    write_rendered_package(compiled, incremental, str(tmp_path / "out.docx"))
+    assert "Provider Two" in document_text(str(tmp_path / "out.docx"))
+
+
+def test_revise_tool_creates_new_version(data_dir):
+    """revise_compliance_doc applies changed answers to the stored document."""
+    result = generate_compliance_doc(json.dumps(ANSWERS), response_mode="link")
+    document_id = re.search(r"DOCUMENT ID: (\S+)", result[0].text).group(1)
+
+    revised = revise_compliance_doc(document_id, json.dumps({"legal_name": "Provider Two", "model_name": "Revision Model"}), response_mode="link")
+
+    assert revised[1].name == f"{document_id}_v2.docx"
+    assert "CHANGED ANSWERS: legal_name" in revised[0].text
+    text = document_text(os.path.join(data_dir, revised[1].name))
+    assert "Provider Two" in text and "Provider One" not in text
+
+    record = server.revision_store.load(document_id)
+    assert record["versions"][-1]["changes"] == {"legal_name": {"from": "Provider One", "to": "Provider Two"}}
+
+
+def test_revise_tool_without_cached_rendering(data_dir):
+    """After a restart (no in-memory rendering) the revision falls back to a full render."""
+    result = generate_compliance_doc(json.dumps(ANSWERS), response_mode="link")
+    document_id = re.search(r"DOCUMENT ID: (\S+)", result[0].text).group(1)
+    server.revision_store._renderings.clear()
+
+    revised = revise_compliance_doc(document_id, json.dumps({"legal_name": "Provider Three"}), response_mode="link")
+
+    assert "Provider Three" in document_text(os.path.join(data_dir, revised[1].name))
+
+
+def test_revise_tool_includes_revisions_of_other_workers(data_dir):
+    """A revision made by another process isn't undone by a stale in-memory rendering."""
+    result = generate_compliance_doc(json.dumps(ANSWERS), response_mode="link")
+    document_id = re.search(r"DOCUMENT ID: (\S+)", result[0].text).group(1)
+
+    other_worker = RevisionStore(data_dir)
+    version, filename, _ = other_worker.reserve_version(document_id)
+    other_worker.add_version(document_id, version, {"legal_name": "NEWCO"}, filename)
+
+    revised = revise_compliance_doc(document_id, json.dumps({"model_name": "Revision Model 2"}), response_mode="link")
+
+    assert revised[1].name == f"{document_id}_v3.docx"
+    text = document_text(os.path.join(data_dir, revised[1].name))
+    assert "NEWCO" in text and "Provider One" not in text and "Revision Model 2" in text
+
+
+def test_generate_tool_accepts_non_ascii_model_names(data_dir):
+    result = generate_compliance_doc(json.dumps({**ANSWERS, "model_name": "Modèle Français"}), response_mode="link")
+    document_id = re.search(r"DOCUMENT ID: (\S+)", result[0].text).group(1)
+    assert document_id.startswith("Modèle_Français_")
+
+    revised = revise_compliance_doc(document_id, json.dumps({"legal_name": "Fournisseur"}), response_mode="link")
+    assert "Fournisseur" in document_text(os.path.join(data_dir, revised[1].name))
+
+
+def test_revise_tool_unknown_document():
+    """Unknown or expired document ids return an error."""
+    result = revise_compliance_doc("does_not_exist", json.dumps({"legal_name": "X"}))
+
+    assert len(result) == 1
+    assert "not found or expired" in result[0].text
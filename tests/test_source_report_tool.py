@@ -5,7 +5,7 @@ Tests verify all Phase 2 requirements:
 - TOOL-02: Validates JSON before generation
 - TOOL-03: Returns TextContent + EmbeddedResource
 - TOOL-04: Filename includes model_name and _sources_ suffix
-- FILE-01: PDF saved to DATA_DIR
+- FILE-01: PDF saved to the storage directory
 - FILE-02: Cleanup thread handles .pdf files
 - FILE-03: PDFs served with correct Content-Type
 
@@ -15,12 +15,12 @@ Uses fixtures for test data and automatic cleanup of generated files.
 import json
 import os
 import base64
-import inspect
 import mimetypes
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 import pytest
 
-from server import generate_source_report, cleanup_old_files, DATA_DIR
+from question_schema import QuestionSchema
+from server import generate_source_report, ARTIFACT_SUFFIXES
 
 
 # Test fixtures
@@ -59,33 +59,15 @@ MULTI_CITATION_JSON = VALID_CITATION_JSON # Already has Q1 and Q2
 
 @pytest.fixture(autouse=True)
 def mock_questions_json():
-    """Mock open('questions.json') to return only Q1 and Q2 for tests."""
-    # We only want to mock when it's exactly 'questions.json'
-    original_open = open
-    def side_effect(file, *args, **kwargs):
-        if file == "questions.json":
-            return mock_open(read_data=MOCK_QUESTIONS).return_value
-        return original_open(file, *args, **kwargs)
-    
-    with patch("builtins.open", side_effect=side_effect):
+    """Serve a questions schema with only Q1 and Q2 for tests."""
+    schema = QuestionSchema.from_json(MOCK_QUESTIONS)
+    with patch("server.get_question_schema", return_value=schema):
         yield
 
 
-@pytest.fixture
-def cleanup_pdfs():
-    """Remove test-generated PDFs after test."""
-    yield
-    for f in os.listdir(DATA_DIR):
-        if f.endswith('.pdf') and 'sources' in f:
-            try:
-                os.remove(os.path.join(DATA_DIR, f))
-            except Exception:
-                pass
-
-
 # Basic functionality tests
 
-def test_tool_returns_list_on_valid_input(cleanup_pdfs):
+def test_tool_returns_list_on_valid_input():
     """Call generate_source_report with valid input, verify result is a list with length 2."""
     result = generate_source_report(VALID_CITATION_JSON)
 
@@ -93,7 +75,7 @@ def test_tool_returns_list_on_valid_input(cleanup_pdfs):
     assert len(result) == 2
 
 
-def test_tool_returns_text_content_with_download_link(cleanup_pdfs):
+def test_tool_returns_text_content_with_download_link():
     """Verify result[0] is TextContent with type='text' and text containing 'download'."""
     result = generate_source_report(VALID_CITATION_JSON)
 
@@ -104,7 +86,7 @@ def test_tool_returns_text_content_with_download_link(cleanup_pdfs):
     assert 'download' in result[0].text.lower()
 
 
-def test_tool_returns_embedded_resource_with_pdf(cleanup_pdfs):
+def test_tool_returns_embedded_resource_with_pdf():
     """Verify result[1] is EmbeddedResource with mimeType='application/pdf' and non-empty blob."""
     result = generate_source_report(VALID_CITATION_JSON)
 
@@ -122,7 +104,7 @@ def test_tool_returns_embedded_resource_with_pdf(cleanup_pdfs):
     assert len(result[1].resource.blob) > 0
 
 
-def test_tool_validates_base64_encoding(cleanup_pdfs):
+def test_tool_validates_base64_encoding():
     """Verify result[1].resource.blob can be decoded and contains PDF magic bytes."""
     result = generate_source_report(VALID_CITATION_JSON)
 
@@ -137,22 +119,22 @@ def test_tool_validates_base64_encoding(cleanup_pdfs):
 
 # File persistence tests
 
-def test_tool_saves_pdf_to_data_dir(cleanup_pdfs):
-    """After calling the tool, verify a .pdf file exists in DATA_DIR."""
+def test_tool_saves_pdf_to_data_dir(data_dir):
+    """After calling the tool, verify a .pdf file exists in the storage directory."""
     result = generate_source_report(VALID_CITATION_JSON, model_name="TestModel")
 
     # Find PDF files with 'sources' in name
-    pdf_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.pdf') and 'sources' in f]
+    pdf_files = [f for f in os.listdir(data_dir) if f.endswith('.pdf') and 'sources' in f]
 
-    assert len(pdf_files) > 0, "Expected at least one PDF file in DATA_DIR"
+    assert len(pdf_files) > 0, "Expected at least one PDF file in the storage directory"
 
 
-def test_tool_filename_includes_model_name_and_sources(cleanup_pdfs):
+def test_tool_filename_includes_model_name_and_sources(data_dir):
     """Call with model_name='MyTestModel', verify filename starts with 'MyTestModel_sources_' and ends with '.pdf'."""
     result = generate_source_report(VALID_CITATION_JSON, model_name="MyTestModel")
 
     # Find the generated file
-    pdf_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.pdf') and 'sources' in f]
+    pdf_files = [f for f in os.listdir(data_dir) if f.endswith('.pdf') and 'sources' in f]
 
     assert len(pdf_files) > 0
     # Check most recently created file
@@ -161,24 +143,24 @@ def test_tool_filename_includes_model_name_and_sources(cleanup_pdfs):
     assert latest_file.endswith('.pdf')
 
 
-def test_tool_filename_default_model_name(cleanup_pdfs):
+def test_tool_filename_default_model_name(data_dir):
     """Call without model_name parameter, verify filename starts with 'model_sources_'."""
     result = generate_source_report(VALID_CITATION_JSON)
 
     # Find the generated file
-    pdf_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.pdf') and 'sources' in f]
+    pdf_files = [f for f in os.listdir(data_dir) if f.endswith('.pdf') and 'sources' in f]
 
     assert len(pdf_files) > 0
     latest_file = pdf_files[-1]
     assert latest_file.startswith('model_sources_')
 
 
-def test_tool_sanitizes_model_name(cleanup_pdfs):
+def test_tool_sanitizes_model_name(data_dir):
     """Call with model_name containing special characters, verify filename only contains safe characters."""
     result = generate_source_report(VALID_CITATION_JSON, model_name="Bad/Name\\With..Chars!")
 
     # Find the generated file
-    pdf_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.pdf') and 'sources' in f]
+    pdf_files = [f for f in os.listdir(data_dir) if f.endswith('.pdf') and 'sources' in f]
 
     assert len(pdf_files) > 0
     latest_file = pdf_files[-1]
@@ -194,7 +176,7 @@ def test_tool_sanitizes_model_name(cleanup_pdfs):
 
 # Error handling tests
 
-def test_tool_returns_list_on_invalid_json(cleanup_pdfs):
+def test_tool_returns_list_on_invalid_json():
     """Call with invalid JSON, verify result is a list with TextContent containing error message."""
     result = generate_source_report("not valid json")
 
@@ -205,7 +187,7 @@ def test_tool_returns_list_on_invalid_json(cleanup_pdfs):
     assert 'Validation Error' in result[0].text or 'Error' in result[0].text
 
 
-def test_tool_returns_list_on_schema_error(cleanup_pdfs):
+def test_tool_returns_list_on_schema_error():
     """Call with empty citations list, verify result is list with TextContent containing error message."""
     invalid_json = json.dumps({"citations": []})
     result = generate_source_report(invalid_json)
@@ -220,13 +202,9 @@ def test_tool_returns_list_on_schema_error(cleanup_pdfs):
 # Infrastructure validation tests
 
 def test_cleanup_handles_pdf_extension():
-    """Verify cleanup_old_files source code contains '.pdf' in the endswith check."""
-    source = inspect.getsource(cleanup_old_files)
-
-    # Verify .pdf is included in the cleanup logic
-    assert '.pdf' in source
-    # Verify it's in the context of file extension checking
-    assert 'endswith' in source or '.pdf' in source
+    """Verify PDFs are among the artifacts the expiry index picks up from disk."""
+    # Existing files are registered by suffix when a new index is seeded
+    assert '.pdf' in ARTIFACT_SUFFIXES
 
 
 def test_pdf_content_type_detection():
@@ -238,7 +216,7 @@ def test_pdf_content_type_detection():
 
 # Edge case tests
 
-def test_tool_handles_multi_citation_report(cleanup_pdfs):
+def test_tool_handles_multi_citation_report():
     """Call with MULTI_CITATION_JSON (2 citations including NOT FOUND), verify result structure and PDF size."""
     result = generate_source_report(MULTI_CITATION_JSON)
 
@@ -260,7 +238,7 @@ def test_tool_handles_multi_citation_report(cleanup_pdfs):
     assert len(decoded_bytes) > 1000, "Multi-citation PDF should have substantial content"
 
 
-def test_tool_handles_unicode_in_citations(cleanup_pdfs):
+def test_tool_handles_unicode_in_citations():
     """Create citation with Unicode characters, verify tool returns success without encoding crash."""
     unicode_json = json.dumps({
         "citations": [
@@ -299,7 +277,7 @@ def test_tool_handles_unicode_in_citations(cleanup_pdfs):
     assert decoded_bytes.startswith(b'%PDF')
 
 
-def test_tool_handles_long_text_in_citations(cleanup_pdfs):
+def test_tool_handles_long_text_in_citations():
     """Create citation with 500+ character answer and source_quote, verify tool returns success."""
     long_text = "This is a very long answer that exceeds 500 characters. " * 10  # ~570 chars
     long_quote = "This is a very long source quote that also exceeds 500 characters. " * 8  # ~536 chars
@@ -341,7 +319,7 @@ def test_tool_handles_long_text_in_citations(cleanup_pdfs):
     assert decoded_bytes.startswith(b'%PDF')
 
 
-def test_tool_embedded_resource_uri_format(cleanup_pdfs):
+def test_tool_embedded_resource_uri_format():
     """Verify result[1].resource.uri starts with 'file:///' and ends with '.pdf'."""
     result = generate_source_report(VALID_CITATION_JSON)
 
@@ -349,3 +327,91 @@ def test_tool_embedded_resource_uri_format(cleanup_pdfs):
     uri = str(result[1].resource.uri)
     assert uri.startswith('file:///'), "URI should start with file:///"
     assert uri.endswith('.pdf'), "URI should end with .pdf"
+
+
+# Response mode tests
+
+def test_tool_link_mode_returns_resource_link_only(data_dir):
+    """In link mode the PDF is written to the storage directory and only a resource link is returned."""
+    result = generate_source_report(VALID_CITATION_JSON, model_name="LinkModel", response_mode="link")
+
+    assert len(result) == 2
+    assert result[1].type == 'resource_link'
+    assert result[1].mimeType == 'application/pdf'
+    assert result[1].name.startswith('LinkModel_sources_')
+
+    output_path = os.path.join(data_dir, result[1].name)
+    assert result[1].size == os.path.getsize(output_path)
+    with open(output_path, 'rb') as f:
+        assert f.read(4) == b'%PDF'
+    assert not any(f.endswith('.part') for f in os.listdir(data_dir))
+
+
+def test_tool_uses_server_default_response_mode(monkeypatch):
+    """Without response_mode the server-wide RESPONSE_MODE setting applies."""
+    monkeypatch.setattr("server.DEFAULT_RESPONSE_MODE", "link")
+
+    result = generate_source_report(VALID_CITATION_JSON)
+
+    assert result[1].type == 'resource_link'
+
+
+def test_tool_rejects_invalid_response_mode():
+    """Unknown response modes return an error without generating anything."""
+    result = generate_source_report(VALID_CITATION_JSON, response_mode="inline")
+
+    assert len(result) == 1
+    assert "Invalid response_mode" in result[0].text
+
+
+# Deterministic report cache tests
+
+def test_tool_retry_returns_stored_pdf_without_rerendering():
+    """Repeating a call with the same citations returns the stored PDF; the renderer runs once."""
+    import server
+
+    with patch("server.generate_source_report_pdf", wraps=server.generate_source_report_pdf) as render:
+        first = generate_source_report(VALID_CITATION_JSON, model_name="RetryModel", model_card_id="org/model")
+        second = generate_source_report(VALID_CITATION_JSON, model_name="RetryModel", model_card_id="org/model")
+
+    assert render.call_count == 1
+    assert str(first[1].resource.uri) == str(second[1].resource.uri)
+    assert first[1].resource.blob == second[1].resource.blob
+
+
+def test_tool_different_content_gets_different_report():
+    """The cache key covers the model card id (and citations)."""
+    first = generate_source_report(VALID_CITATION_JSON, model_card_id="org/model-a", response_mode="link")
+    second = generate_source_report(VALID_CITATION_JSON, model_card_id="org/model-b", response_mode="link")
+
+    assert first[1].name != second[1].name
+
+
+def test_tool_rerenders_expired_report(data_dir):
+    """If the stored PDF was cleaned up, the report is rendered again under the same name."""
+    first = generate_source_report(VALID_CITATION_JSON, response_mode="link")
+    os.remove(os.path.join(data_dir, first[1].name))
+
+    second = generate_source_report(VALID_CITATION_JSON, response_mode="link")
+
+    assert second[1].name == first[1].name
+    assert os.path.exists(os.path.join(data_dir, second[1].name))
+
+
+def test_tool_caller_timestamp_is_printed():
+    """A caller-provided generated_at timestamp appears in the report."""
+    from io import BytesIO
+    from pypdf import PdfReader
+
+    result = generate_source_report(VALID_CITATION_JSON, generated_at="2025-03-04T05:06:00")
+
+    pdf = PdfReader(BytesIO(base64.b64decode(result[1].resource.blob)))
+    assert "2025-03-04 05:06" in pdf.pages[0].extract_text()
+
+
+def test_tool_rejects_invalid_timestamp():
+    """generated_at must be ISO 8601."""
+    result = generate_source_report(VALID_CITATION_JSON, generated_at="yesterday")
+
+    assert len(result) == 1
+    assert result[0].text.startswith("Error:")
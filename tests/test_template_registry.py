@@ -0,0 +1,109 @@
+"""Unit tests for the DOCX template registry."""
+
+import io
+import os
+import shutil
+
+import pytest
+from docx import Document
+
+from template_registry import TemplateRegistry
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "default_template.docx")
+
+
+def _make_template(path, text):
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    """Templates directory with the default template and one custom template."""
+    shutil.copy(TEMPLATE_PATH, tmp_path / "default_template.docx")
+    _make_template(tmp_path / "short_form.docx", "Model: {{model_name}}")
+    (tmp_path / "~$short_form.docx").write_bytes(b"lock file")
+    (tmp_path / "notes.txt").write_text("not a template")
+    return tmp_path
+
+
+def test_registry_lists_docx_templates_by_name(template_dir):
+    """Only .docx files (excluding Word lock files) are listed, by name without extension."""
+    registry = TemplateRegistry(str(template_dir))
+
+    assert registry.names() == ["default_template", "short_form"]
+
+
+def test_registry_unknown_template_raises(template_dir):
+    """Unknown names raise KeyError listing the available templates."""
+    registry = TemplateRegistry(str(template_dir))
+
+    with pytest.raises(KeyError) as excinfo:
+        registry.path("missing")
+    assert "default_template, short_form" in str(excinfo.value)
+
+
+def test_registry_returns_cached_template(template_dir):
+    """Repeated lookups of an unchanged template reuse the compiled copy."""
+    registry = TemplateRegistry(str(template_dir))
+
+    assert registry.get("short_form") is registry.get("short_form")
+
+
+def test_registry_hot_reloads_modified_template(template_dir):
+    """Editing a template on disk is picked up on the next lookup."""
+    registry = TemplateRegistry(str(template_dir))
+    first = registry.get("short_form")
+
+    path = template_dir / "short_form.docx"
+    _make_template(path, "Provider: {{legal_name}}")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    second = registry.get("short_form")
+    assert second is not first
+    assert second.keys == {"legal_name"}
+
+
+def test_registry_finds_templates_added_after_scan(template_dir):
+    """A new file is found even within the scan interval when it's requested by name."""
+    registry = TemplateRegistry(str(template_dir), scan_interval=3600)
+    registry.names()
+
+    _make_template(template_dir / "added.docx", "{{model_name}}")
+
+    assert registry.get("added").keys == {"model_name"}
+
+
+def test_registry_preload_and_fill(template_dir):
+    """preload compiles every template and fill renders the named one."""
+    registry = TemplateRegistry(str(template_dir))
+
+    assert registry.preload() == ["default_template", "short_form"]
+
+    buf = io.BytesIO()
+    registry.fill("short_form", buf, {"model_name": "Llama"})
+    assert Document(io.BytesIO(buf.getvalue())).paragraphs[0].text == "Model: Llama"
+
+
+def test_generate_compliance_doc_rejects_unknown_template():
+    """The tool reports unknown template names instead of failing."""
+    from server import generate_compliance_doc
+
+    result = generate_compliance_doc('{"model_name": "x"}', template_name="does_not_exist")
+
+    assert len(result) == 1
+    assert "Template 'does_not_exist' not found" in result[0].text
+
+
+def test_generate_compliance_doc_uses_named_template(template_dir, monkeypatch):
+    """A template selected by name is filled and saved."""
+    import server
+
+    monkeypatch.setattr(server, "template_registry", TemplateRegistry(str(template_dir)))
+    result = server.generate_compliance_doc('{"model_name": "Registry Test"}', template_name="short_form")
+
+    filename = str(result[1].resource.uri).rsplit("/", 1)[-1]
+    assert Document(os.path.join(server.DATA_DIR, filename)).paragraphs[0].text == "Model: Registry Test"